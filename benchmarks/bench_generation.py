@@ -0,0 +1,145 @@
+"""
+Benchmark de la génération des configurations sur des intentions synthétiques.
+
+Pour chaque taille, l'intention est générée puis `generate_configs` est lancé
+avec un PipelineProfiler: temps et mémoire de chaque étape et de bout en bout.
+Les résultats sont enregistrés dans benchmarks/results/ et comparés à la
+référence (baseline.json) pour détecter les régressions.
+
+Usage:
+    python -m benchmarks.bench_generation --sizes 10 100 1000
+    python -m benchmarks.bench_generation --sizes 10 100 1000 10000 --backend process --save-baseline
+"""
+import argparse
+import copy
+import json
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List
+
+from benchmarks.topology_generator import scaled_intention
+from lib.pipelineProfiler import PipelineProfiler
+from tools.generate_config import generate_configs
+
+
+RESULTS_DIR = Path(__file__).parent.resolve() / "results"
+BASELINE_FILE = RESULTS_DIR / "baseline.json"
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+def bench_size(routers: int, backend: str, workers: int, repeat: int, trace_memory: bool) -> Dict[str, Any]:
+    """
+    Mesure la génération d'une intention d'environ `routers` routeurs.
+    Garde la meilleure des `repeat` exécutions.
+    """
+    start = perf_counter()
+    intention = scaled_intention(routers)
+    generation_s = perf_counter() - start
+
+    best = None
+    for _ in range(repeat):
+        # generate_configs modifie l'intention en place
+        data = copy.deepcopy(intention)
+        profiler = PipelineProfiler(trace_memory=trace_memory)
+        with tempfile.TemporaryDirectory() as out_dir:
+            start = perf_counter()
+            config_files = generate_configs(
+                data,
+                reset_ipam=True,
+                render_backend=backend,
+                render_workers=workers,
+                profiler=profiler,
+                config_dir=Path(out_dir)
+            )
+            end_to_end = perf_counter() - start
+        profiler.close()
+        report = profiler.report()
+        if best is None or end_to_end < best['end_to_end_s']:
+            best = {
+                'routers': len(config_files),
+                'intention_generation_s': generation_s,
+                'end_to_end_s': end_to_end,
+                'stages': {s['stage']: s for s in report['stages']},
+                'peak_mem_mb': report['total'].get('peak_mem_mb'),
+            }
+    return best
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Liste les étapes plus lentes que la référence de plus de `threshold` (ratio).
+    Les étapes très courtes (< 10 ms) sont ignorées, trop bruitées.
+    """
+    regressions = []
+    for size, run in results['runs'].items():
+        ref = baseline.get('runs', {}).get(size)
+        if not ref:
+            continue
+        pairs = [('end-to-end', run['end_to_end_s'], ref['end_to_end_s'])]
+        pairs += [
+            (stage, s['wall_s'], ref['stages'][stage]['wall_s'])
+            for stage, s in run['stages'].items() if stage in ref['stages']
+        ]
+        for stage, current, previous in pairs:
+            if previous >= 0.01 and current > previous * (1 + threshold):
+                regressions.append(
+                    f"{size} routers - {stage}: {current:.3f}s vs {previous:.3f}s (+{100 * (current / previous - 1):.0f}%)"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark configuration generation on synthetic topologies")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Approximate router counts")
+    parser.add_argument("--backend", choices=["thread", "process", "inline"], default="thread", help="Render backend")
+    parser.add_argument("--workers", type=int, default=None, help="Render workers (default: CPU count)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size, the best one is kept")
+    parser.add_argument("--no-memory", action="store_true", help="Disable tracemalloc (faster, no memory figures)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'backend': args.backend,
+        'runs': {},
+    }
+    for size in args.sizes:
+        run = bench_size(size, args.backend, args.workers, args.repeat, not args.no_memory)
+        results['runs'][str(size)] = run
+        memory = f", peak {run['peak_mem_mb']:.1f} MB" if run['peak_mem_mb'] is not None else ""
+        print(f"{run['routers']:>6} routers: {run['end_to_end_s']:.3f}s end-to-end{memory}")
+        for stage, s in run['stages'].items():
+            print(f"    {stage:<24}{s['wall_s']:>9.3f}s")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out = RESULTS_DIR / f"bench_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(out, 'w') as f:
+        json.dump(results, f, indent=4)
+    print(f"Results saved to {out}.")
+
+    status = 0
+    if BASELINE_FILE.exists():
+        with open(BASELINE_FILE, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("Regressions against baseline:")
+            print("\n".join(f"  {r}" for r in regressions))
+            status = 1
+        else:
+            print("No regression against baseline.")
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Baseline saved to {BASELINE_FILE}.")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Benchmark du push des configurations sur des consoles IOS simulées.
+
+Les configurations d'une intention synthétique sont générées puis poussées
+par le SessionManager sur une ferme de consoles locales (ios_simulator),
+pour chaque réglage du moteur (pacing, fenêtre, concurrence). Le temps
+total et le débit en lignes/seconde sont rapportés et enregistrés dans
+benchmarks/results/.
+
+Usage:
+    python -m benchmarks.bench_push --nodes 100 --latency 0.005 --windows 1 8
+    python -m benchmarks.bench_push --nodes 20 --pacing fixed prompt --max-lines 50
+"""
+import argparse
+import json
+import sys
+import tempfile
+from datetime import datetime
+from itertools import product
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any, Dict, List
+
+from benchmarks.ios_simulator import ConsoleFarm
+from benchmarks.topology_generator import scaled_intention
+from lib.telnetClient import SessionManager
+from tools.generate_config import generate_configs
+
+
+RESULTS_DIR = Path(__file__).parent.resolve() / "results"
+
+
+def rendered_configs(nodes: int, max_lines: int = 0) -> List[str]:
+    """
+    Configurations rendues pour une intention synthétique d'environ `nodes`
+    routeurs, éventuellement tronquées à `max_lines` lignes.
+    """
+    with tempfile.TemporaryDirectory() as out_dir:
+        files = generate_configs(scaled_intention(nodes), reset_ipam=True, render_backend="inline", config_dir=Path(out_dir))
+        configs = [path.read_text() for _, path in sorted(files.items())]
+    if max_lines:
+        configs = ["\n".join(config.splitlines()[:max_lines]) for config in configs]
+    return configs[:nodes]
+
+
+def bench_setting(
+    farm: ConsoleFarm,
+    configs: List[str],
+    pacing: str,
+    window: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """
+    Pousse une configuration sur chaque console et mesure le temps total.
+    """
+    lines = sum(len(config.splitlines()) for config in configs)
+    received_before = sum(c.lines_received for c in farm.consoles.values())
+
+    manager = SessionManager(concurrency=concurrency, pacing=pacing, window=window)
+    start = perf_counter()
+    for (name, port), config in zip(farm.ports.items(), configs):
+        manager.push_configuration(name, farm.host, port, config)
+    while not manager.all_done():
+        sleep(0.01)
+    elapsed = perf_counter() - start
+    manager.close()
+
+    return {
+        'pacing': pacing,
+        'window': window,
+        'concurrency': concurrency,
+        'nodes': len(configs),
+        'config_lines': lines,
+        'lines_received': sum(c.lines_received for c in farm.consoles.values()) - received_before,
+        'push_s': elapsed,
+        'lines_per_s': lines / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark configuration pushes against simulated IOS consoles")
+    parser.add_argument("--nodes", type=int, default=50, help="Number of simulated consoles")
+    parser.add_argument("--latency", type=float, default=0.005, help="Per-line console latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum extra random latency per line")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Probability of a console dropping a line")
+    parser.add_argument("--pacing", nargs="+", choices=["prompt", "fixed"], default=["prompt"], help="Pacing modes to test")
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 8], help="Window sizes to test")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[64], help="Session limits to test")
+    parser.add_argument("--max-lines", type=int, default=0, help="Truncate configs to this many lines (0: full configs)")
+    args = parser.parse_args(argv)
+
+    configs = rendered_configs(args.nodes, args.max_lines)
+    farm = ConsoleFarm(len(configs), latency=args.latency, jitter=args.jitter, drop_rate=args.drop_rate)
+
+    runs = []
+    try:
+        for pacing, window, concurrency in product(args.pacing, args.windows, args.concurrency):
+            if pacing == "fixed" and window != args.windows[0]:
+                continue  # la fenêtre n'a pas d'effet en pacing fixe
+            run = bench_setting(farm, configs, pacing, window, concurrency)
+            runs.append(run)
+            print(
+                f"pacing={pacing:<6} window={window:<3} concurrency={concurrency:<4} "
+                f"{run['push_s']:>8.2f}s {run['lines_per_s']:>9.0f} lines/s"
+            )
+    finally:
+        farm.stop()
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    out = RESULTS_DIR / f"bench_push_{datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(out, 'w') as f:
+        json.dump({
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'drop_rate': args.drop_rate,
+            'runs': runs,
+        }, f, indent=4)
+    print(f"Results saved to {out}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Serveur HTTP local imitant le sous-ensemble de l'API REST GNS3 v2 utilisé
+par DyNASty (projets, noeuds, démarrage, arrêt, fichiers des noeuds),
+adossé à des consoles IOS simulées.
+
+Les noeuds sont arrêtés au départ: leur console ne répond qu'une fois le
+noeud démarré et le délai de boot écoulé, comme un routeur qui démarre.
+Au démarrage la startup-config du noeud est chargée dans la console, à
+l'arrêt la configuration courante est sauvegardée par-dessus, comme GNS3
+le fait depuis la NVRAM des routeurs Dynamips.
+
+Usage:
+    python -m benchmarks.gns3_stub --count 20 --port 3080 --boot-delay 5
+"""
+import argparse
+import json
+import random
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Dict, List, Optional
+
+from benchmarks.ios_simulator import ConsoleFarm
+
+
+class Gns3Stub:
+    """
+    Un projet GNS3 factice dont chaque noeud est une console de la ferme.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        names: Optional[List[str]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        boot_delay: float = 0.0,
+        boot_jitter: float = 0.0,
+        start_latency: float = 0.0,
+        **console_args
+    ):
+        self.farm = ConsoleFarm(count, host, **console_args)
+        self.project_id = str(uuid.uuid4())
+        self.project_name = "stub"
+        self.project_status = "closed"
+        self.boot_delay = boot_delay
+        self.boot_jitter = boot_jitter
+        self.start_latency = start_latency
+        self.requests: List[str] = []
+        self.max_parallel_starts = 0
+        self._starting = 0
+        self._lock = Lock()
+
+        names = names or list(self.farm.ports)
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.consoles = {}
+        # Fichiers des noeuds: node_id -> chemin -> contenu
+        self.files: Dict[str, Dict[str, str]] = {}
+        for name, (console_name, console_port) in zip(names, self.farm.ports.items()):
+            node_id = str(uuid.uuid4())
+            self.consoles[node_id] = self.farm.consoles[console_name]
+            self.consoles[node_id].ready_at = float("inf")
+            self.consoles[node_id].hostname = name
+            self.nodes[node_id] = {
+                'name': name,
+                'node_id': node_id,
+                'project_id': self.project_id,
+                'node_type': "dynamips",
+                'console': console_port,
+                'console_host': "0.0.0.0",
+                'console_type': "telnet",
+                'status': "stopped",
+                'properties': {'dynamips_id': len(self.nodes) + 1},
+            }
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def start(self, node_id: str) -> Dict[str, Any]:
+        with self._lock:
+            self._starting += 1
+            self.max_parallel_starts = max(self.max_parallel_starts, self._starting)
+        try:
+            if self.start_latency:
+                time.sleep(self.start_latency)
+            node = self.nodes[node_id]
+            if node['status'] != "started":
+                node['status'] = "started"
+                self._load_startup_config(node)
+                delay = self.boot_delay + (random.uniform(0, self.boot_jitter) if self.boot_jitter else 0)
+                self.consoles[node_id].ready_at = time.monotonic() + delay
+            return node
+        finally:
+            with self._lock:
+                self._starting -= 1
+
+    def startup_path(self, node: Dict[str, Any]) -> str:
+        return f"configs/i{node['properties']['dynamips_id']}_startup-config.cfg"
+
+    def _load_startup_config(self, node: Dict[str, Any]) -> None:
+        console = self.consoles[node['node_id']]
+        text = self.files.get(node['node_id'], {}).get(self.startup_path(node))
+        if text is None:
+            return
+        console.running.clear()
+        console.mode, console.path = 'config', []
+        for line in text.splitlines():
+            if line.strip() and not line.strip().startswith("!") and console.mode != 'exec':
+                console.execute(line)
+        console.mode, console.path = 'user', []
+
+    def stop(self, node_id: str) -> Dict[str, Any]:
+        node = self.nodes[node_id]
+        if node['status'] == "started":
+            console = self.consoles[node_id]
+            # Sauvegarde de la NVRAM dans la startup-config
+            self.files.setdefault(node_id, {})[self.startup_path(node)] = "\n".join(console.running_config()[3:])
+            console.ready_at = float("inf")
+            node['status'] = "stopped"
+        return node
+
+    def route(self, method: str, path: str, body: bytes = b"") -> Any:
+        """
+        Réponse JSON d'une requête, None si la route est inconnue.
+        """
+        self.requests.append(f"{method} {path}")
+        project = {'name': self.project_name, 'project_id': self.project_id, 'status': self.project_status}
+        if method == "GET" and path == "/v2/projects":
+            return [project]
+        match = re.fullmatch(r"/v2/projects/([\w-]+)(/.*)?", path)
+        if not match or match.group(1) != self.project_id:
+            return None
+        rest = match.group(2) or ""
+        if method == "GET" and rest == "":
+            return project
+        if method == "POST" and rest == "/open":
+            self.project_status = "opened"
+            return dict(project, status="opened")
+        if method == "GET" and rest == "/nodes":
+            return list(self.nodes.values())
+        match = re.fullmatch(r"/nodes/([\w-]+)(/start|/stop|/files/.+)?", rest)
+        if match and match.group(1) in self.nodes:
+            node_id, action = match.groups()
+            if method == "POST" and action == "/start":
+                return self.start(node_id)
+            if method == "POST" and action == "/stop":
+                return self.stop(node_id)
+            if action and action.startswith("/files/"):
+                files = self.files.setdefault(node_id, {})
+                if method == "POST":
+                    files[action[len("/files/"):]] = body.decode('utf-8')
+                    return {}
+                return files.get(action[len("/files/"):])
+            if method == "GET" and not action:
+                return self.nodes[node_id]
+        return None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # connexions persistantes
+
+            def _reply(self, method: str) -> None:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = stub.route(method, self.path, self.rfile.read(length) if length else b"")
+                data = json.dumps(body if body is not None else {'message': "Not found"}).encode()
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_POST(self):
+                self._reply("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def shutdown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.farm.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a stub GNS3 server backed by simulated IOS consoles")
+    parser.add_argument("--count", type=int, default=10, help="Number of nodes")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3080, help="HTTP port of the stub server")
+    parser.add_argument("--boot-delay", type=float, default=0.0, help="Seconds before a started node answers")
+    parser.add_argument("--boot-jitter", type=float, default=0.0, help="Maximum extra random boot delay")
+    parser.add_argument("--start-latency", type=float, default=0.0, help="Duration of a start request")
+    parser.add_argument("--latency", type=float, default=0.0, help="Per-line console latency in seconds")
+    args = parser.parse_args()
+
+    stub = Gns3Stub(
+        args.count, host=args.host, port=args.port, boot_delay=args.boot_delay,
+        boot_jitter=args.boot_jitter, start_latency=args.start_latency, latency=args.latency
+    )
+    print(f"Stub GNS3 server on {stub.url}, project \"{stub.project_name}\" ({stub.project_id})")
+    for node in stub.nodes.values():
+        print(f"{node['name']}: telnet {args.host} {node['console']}")
+    try:
+        stub._thread.join()
+    except KeyboardInterrupt:
+        stub.shutdown()
@@ -0,0 +1,275 @@
+"""
+Simulateur local de consoles IOS, pour tester et mesurer le push sans GNS3.
+
+Chaque console est un serveur telnet asyncio qui émule la machine à états
+du CLI IOS (exec, conf t, sous-modes interface / router / address-family /
+vrf, write memory, show running-config) avec une latence par ligne, une
+gigue et des pertes de lignes configurables. Des centaines de consoles
+peuvent tourner sur des ports différents dans une même boucle.
+
+Usage:
+    python -m benchmarks.ios_simulator --count 100 --base-port 5000 --latency 0.01
+"""
+import argparse
+import asyncio
+import random
+from threading import Thread
+import time
+from typing import Dict, List, Optional
+
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+ECHO, SGA = 1, 3
+PAGE_LINES = 24
+
+# Commandes ouvrant un sous-mode, par mode courant
+SUBMODES = {
+    'config': [
+        ("interface ", 'config-if'),
+        ("router ", 'config-router'),
+        ("vrf definition ", 'config-vrf'),
+    ],
+    'config-router': [("address-family ", 'config-router-af')],
+    'config-vrf': [("address-family ", 'config-vrf-af')],
+}
+
+
+class FakeConsole:
+    """
+    Une console IOS simulée: état du CLI et configuration courante.
+    """
+
+    def __init__(self, hostname: str = "Router", latency: float = 0.0, jitter: float = 0.0, drop_rate: float = 0.0):
+        self.hostname = hostname
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        # Configuration courante: ligne -> sous-arbre
+        self.running: Dict[str, dict] = {}
+        self.saved: Optional[Dict[str, dict]] = None
+        self.lines_received = 0
+        self.lines_dropped = 0
+        self.mode = 'user'
+        self.path: List[str] = []
+        self.paged = True
+        # Sorties des commandes show / ping, fournies par le banc de test
+        self.show_outputs: Dict[str, str] = {}
+        # Instant (time.monotonic) à partir duquel la console répond: routeur démarré
+        self.ready_at = 0.0
+
+    def prompt(self) -> str:
+        if self.mode == 'user':
+            return f"{self.hostname}>"
+        if self.mode == 'exec':
+            return f"{self.hostname}#"
+        return f"{self.hostname}({self.mode})#"
+
+    def _section(self) -> Dict[str, dict]:
+        node = self.running
+        for header in self.path:
+            node = node.setdefault(header, {})
+        return node
+
+    def _exit(self) -> None:
+        if self.path:
+            self.path.pop()
+        if self.mode in ('config-router-af', 'config-vrf-af'):
+            self.mode = 'config-router' if self.mode == 'config-router-af' else 'config-vrf'
+        elif self.mode == 'config':
+            self.mode = 'exec'
+        elif self.mode.startswith('config'):
+            self.mode = 'config'
+
+    def running_config(self) -> List[str]:
+        lines = ["Building configuration...", "", f"Current configuration : {len(str(self.running))} bytes", "!"]
+
+        def dump(node: Dict[str, dict], depth: int) -> None:
+            for line, children in node.items():
+                lines.append(" " * depth + line)
+                dump(children, depth + 1)
+                if line.startswith("address-family"):
+                    lines.append(" " * depth + "exit-address-family")
+                if depth == 0:
+                    lines.append("!")
+
+        dump(self.running, 0)
+        lines.append("end")
+        return lines
+
+    def execute(self, command: str) -> List[str]:
+        """
+        Exécute une ligne et retourne les lignes de sortie (sans le prompt).
+        """
+        cmd = " ".join(command.split())
+        if not cmd:
+            return []
+        if self.mode == 'user':
+            if cmd == "enable":
+                self.mode = 'exec'
+            return []
+        if self.mode == 'exec':
+            if cmd in self.show_outputs:
+                return self.show_outputs[cmd].splitlines()
+            if cmd in ("conf t", "configure terminal"):
+                self.mode = 'config'
+                return ["Enter configuration commands, one per line.  End with CNTL/Z."]
+            if cmd == "terminal length 0":
+                self.paged = False
+            elif cmd in ("show running-config", "show run"):
+                return self.running_config()
+            elif cmd in ("write memory", "wr"):
+                self.saved = {k: dict(v) for k, v in self.running.items()}
+                return ["Building configuration...", "[OK]"]
+            elif cmd == "disable":
+                self.mode = 'user'
+            return []
+
+        # Modes de configuration
+        if cmd == "end":
+            self.mode, self.path = 'exec', []
+            return []
+        if cmd in ("exit", "exit-address-family"):
+            self._exit()
+            return []
+        if cmd.startswith("hostname ") and self.mode == 'config':
+            self.hostname = cmd.split()[1]
+            for line in [line for line in self.running if line.startswith("hostname ")]:
+                del self.running[line]
+        for prefix, submode in SUBMODES.get(self.mode, []):
+            if cmd.startswith(prefix):
+                self._section().setdefault(cmd, {})
+                self.path.append(cmd)
+                self.mode = submode
+                return []
+        section = self._section()
+        if cmd.startswith("no "):
+            negated = cmd[3:]
+            removed = [line for line in section if line == negated or line.startswith(negated + " ")]
+            for line in removed:
+                del section[line]
+            if removed or negated == "shutdown":
+                return []
+        section[cmd] = {}
+        return []
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(bytes((IAC, WILL, ECHO, IAC, WILL, SGA)) + b"\r\n")
+        pending = bytearray()
+        try:
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                pending += _strip_telnet(chunk)
+                while True:
+                    idx = min((i for i in (pending.find(b"\r"), pending.find(b"\n")) if i >= 0), default=-1)
+                    if idx < 0 or (idx == len(pending) - 1 and pending[idx] == ord("\r")):
+                        break  # ligne incomplète, ou \r dont le \n n'est pas encore arrivé
+                    line = pending[:idx].decode('ascii', errors='replace')
+                    # \r\n compte pour un seul retour
+                    del pending[:idx + (2 if pending[idx:idx + 2] == b"\r\n" else 1)]
+                    await self._process(line, writer, reader)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _process(self, line: str, writer: asyncio.StreamWriter, reader: asyncio.StreamReader) -> None:
+        if time.monotonic() < self.ready_at:
+            return  # IOS encore en cours de démarrage
+        self.lines_received += 1
+        if self.drop_rate and random.random() < self.drop_rate:
+            self.lines_dropped += 1
+            return
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+        output = self.execute(line)
+        writer.write(line.encode('ascii') + b"\r\n")
+        if self.paged and len(output) > PAGE_LINES:
+            for start in range(0, len(output), PAGE_LINES):
+                writer.write("\r\n".join(output[start:start + PAGE_LINES]).encode() + b"\r\n")
+                if start + PAGE_LINES < len(output):
+                    writer.write(b" --More-- ")
+                    await writer.drain()
+                    await reader.read(1)
+        elif output:
+            writer.write("\r\n".join(output).encode() + b"\r\n")
+        writer.write(self.prompt().encode())
+        await writer.drain()
+
+
+def _strip_telnet(data: bytes) -> bytes:
+    """
+    Retire les commandes telnet (négociations) des données reçues.
+    """
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        if data[i] != IAC:
+            out.append(data[i])
+            i += 1
+        elif i + 1 < len(data) and data[i + 1] in (DO, DONT, WILL, WONT):
+            i += 3
+        else:
+            i += 2
+    return bytes(out)
+
+
+class ConsoleFarm:
+    """
+    Ensemble de consoles simulées servies par une boucle asyncio dans un thread.
+    """
+
+    def __init__(self, count: int, host: str = "127.0.0.1", base_port: int = 0, **console_args):
+        self.host = host
+        self.consoles: Dict[str, FakeConsole] = {}
+        self.ports: Dict[str, int] = {}
+        self.loop = asyncio.new_event_loop()
+        self._servers = []
+        self._thread = Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(count, base_port, console_args), self.loop).result()
+
+    async def _start(self, count: int, base_port: int, console_args: dict) -> None:
+        for i in range(count):
+            name = f"R{i + 1}"
+            console = FakeConsole(**console_args)
+            server = await asyncio.start_server(console.handle, self.host, base_port + i if base_port else 0)
+            self.consoles[name] = console
+            self.ports[name] = server.sockets[0].getsockname()[1]
+            self._servers.append(server)
+
+    def stop(self) -> None:
+        async def close():
+            for server in self._servers:
+                server.close()
+            # Sessions encore ouvertes par les clients
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run simulated IOS consoles")
+    parser.add_argument("--count", type=int, default=10, help="Number of consoles")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--base-port", type=int, default=5000, help="Port of the first console")
+    parser.add_argument("--latency", type=float, default=0.0, help="Per-line latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Maximum extra random latency per line")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Probability of dropping a line")
+    args = parser.parse_args()
+
+    farm = ConsoleFarm(
+        args.count, args.host, args.base_port,
+        latency=args.latency, jitter=args.jitter, drop_rate=args.drop_rate
+    )
+    for name, port in farm.ports.items():
+        print(f"{name}: telnet {args.host} {port}")
+    try:
+        farm._thread.join()
+    except KeyboardInterrupt:
+        farm.stop()
@@ -0,0 +1,150 @@
+"""
+Génération d'intentions synthétiques au format du fichier d'intention
+(`provider` / `clients` / `global`), pour mesurer le pipeline à l'échelle.
+
+Topologie générée:
+    - un coeur de routeurs P en anneau avec des cordes,
+    - des PE raccordés chacun à deux P,
+    - des CE répartis sur les PE, les clients (VRF) étant attribués à tour de rôle,
+    - des route reflectors choisis parmi les P.
+
+Usage:
+    python -m benchmarks.topology_generator 1000 -o intention_1k.json
+"""
+import argparse
+import json
+from ipaddress import IPv4Network
+from typing import Any, Dict, Optional
+
+# Plages utilisées par les intentions générées, assez larges pour 10k routeurs
+PROVIDER_RANGE = "100.64.0.0/10"
+LOOPBACK_RANGE = "192.168.0.0/16"
+CLIENT_RANGE = "172.16.0.0/12"
+LAN_RANGE = "10.0.0.0/8"
+
+
+def _asn(index: int) -> int:
+    # ASN privés 16 bits puis 32 bits
+    return 64512 + index if index < 1023 else 4200000000 + index
+
+
+def generate_intention(
+    p_count: int,
+    pe_count: int,
+    ce_per_pe: int,
+    client_count: int,
+    networks_per_ce: int = 1,
+    rr_count: int = 2,
+    provider_asn: int = 100,
+) -> Dict[str, Any]:
+    """
+    Génère une intention avec `p_count` P, `pe_count` PE, `ce_per_pe` CE par PE
+    répartis sur `client_count` clients, chaque CE annonçant `networks_per_ce`
+    réseaux, et `rr_count` route reflectors.
+    """
+    if p_count < 1 or pe_count < 1:
+        raise ValueError("At least one P and one PE router are required")
+
+    provider: Dict[str, Dict[str, Any]] = {}
+    ports: Dict[str, int] = {}
+
+    def connect(a: str, b: str, routers: Dict[str, Dict[str, Any]], other: Optional[Dict[str, Dict[str, Any]]] = None):
+        # Une interface de chaque côté du lien
+        for dev, nbr, table in ((a, b, routers), (b, a, other if other is not None else routers)):
+            ports[dev] = ports.get(dev, 0) + 1
+            table[dev]['interfaces'][f"GigabitEthernet{ports[dev]}/0"] = nbr
+
+    p_names = [f"P{i + 1}" for i in range(p_count)]
+    pe_names = [f"PE{i + 1}" for i in range(pe_count)]
+    for name in p_names + pe_names:
+        provider[name] = {'interfaces': {}}
+
+    # Coeur: anneau + cordes vers le P situé à mi-distance
+    links = set()
+    for i in range(p_count):
+        for j in (i + 1, i + p_count // 2):
+            a, b = p_names[i % p_count], p_names[j % p_count]
+            if a != b and frozenset((a, b)) not in links:
+                links.add(frozenset((a, b)))
+                connect(a, b, provider)
+
+    # PE raccordés à deux P consécutifs
+    for i, pe in enumerate(pe_names):
+        for j in {i % p_count, (i + 1) % p_count}:
+            connect(pe, p_names[j], provider)
+
+    # Clients et CE
+    clients: Dict[str, Any] = {'global': {'ip_range': CLIENT_RANGE}}
+    client_names = [f"C{i + 1}" for i in range(max(1, client_count))]
+    for name in client_names:
+        clients[name] = {'routers': {}}
+    lans = IPv4Network(LAN_RANGE).subnets(new_prefix=24)
+
+    ce_index = 0
+    for pe in pe_names:
+        for _ in range(ce_per_pe):
+            ce = f"CE{ce_index + 1}"
+            routers = clients[client_names[ce_index % len(client_names)]]['routers']
+            networks = [next(lans) for _ in range(networks_per_ce)]
+            routers[ce] = {
+                'BGP_asn': _asn(ce_index),
+                'interfaces': {},
+                'unmanaged_interfaces': {
+                    f"GigabitEthernet{k + 2}/0": f"{net.network_address + 1}/24"
+                    for k, net in enumerate(networks)
+                },
+                'BGP_advertized_networks': [str(net) for net in networks],
+            }
+            ports[ce] = 0
+            connect(ce, pe, routers, provider)
+            ce_index += 1
+
+    return {
+        'provider': {
+            'BGP_asn': provider_asn,
+            'loopback_range': LOOPBACK_RANGE,
+            'ip_range': PROVIDER_RANGE,
+            'route_reflectors': p_names[:max(0, min(rr_count, p_count))],
+            'routers': provider,
+        },
+        'clients': clients,
+    }
+
+
+def scaled_intention(routers: int, **overrides) -> Dict[str, Any]:
+    """
+    Intention d'environ `routers` routeurs: 5% de P, 20% de PE, le reste en CE.
+    """
+    p_count = max(2, routers // 20)
+    pe_count = max(2, routers // 5)
+    ce_per_pe = max(1, round((routers - p_count - pe_count) / pe_count))
+    params = {
+        'p_count': p_count,
+        'pe_count': pe_count,
+        'ce_per_pe': ce_per_pe,
+        'client_count': max(2, pe_count // 4),
+        'rr_count': 2,
+    }
+    params.update(overrides)
+    return generate_intention(**params)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic intention file")
+    parser.add_argument("routers", type=int, help="Approximate number of routers")
+    parser.add_argument("-o", "--output", type=str, default=None, help="Output file (default: stdout)")
+    parser.add_argument("--p", dest="p_count", type=int, help="Number of P routers")
+    parser.add_argument("--pe", dest="pe_count", type=int, help="Number of PE routers")
+    parser.add_argument("--ce-per-pe", dest="ce_per_pe", type=int, help="Number of CE routers per PE")
+    parser.add_argument("--clients", dest="client_count", type=int, help="Number of clients (VRFs)")
+    parser.add_argument("--networks", dest="networks_per_ce", type=int, help="Advertised networks per CE")
+    parser.add_argument("--rr", dest="rr_count", type=int, help="Number of route reflectors")
+    args = parser.parse_args()
+
+    overrides = {k: v for k, v in vars(args).items() if k not in ("routers", "output") and v is not None}
+    intention = scaled_intention(args.routers, **overrides)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(intention, f, indent=4)
+    else:
+        print(json.dumps(intention, indent=4))
@@ -0,0 +1,112 @@
+from functools import lru_cache
+from socket import AF_INET, inet_pton
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# Netmask and hostmask of each prefix length, as ints and dotted strings
+NETMASKS: List[int] = [(0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF for length in range(33)]
+HOSTMASKS: List[int] = [(1 << (32 - length)) - 1 for length in range(33)]
+
+
+def _dotted(address: int) -> str:
+    return f"{address >> 24}.{(address >> 16) & 255}.{(address >> 8) & 255}.{address & 255}"
+
+
+MASKS: List[str] = [_dotted(mask) for mask in NETMASKS]
+WILDCARDS: List[str] = [_dotted(mask) for mask in HOSTMASKS]
+MASK_LENGTHS: Dict[str, int] = {mask: length for length, mask in enumerate(MASKS)}
+
+
+@lru_cache(maxsize=1 << 16)
+def _format(address: int) -> str:
+    return _dotted(address)
+
+
+def format_address(address: Optional[int]) -> Optional[str]:
+    """
+    Dotted form of an address. Recent results are cached, as the same
+    addresses (loopbacks, PE links) are formatted for many devices.
+    """
+    return None if address is None else _format(address)
+
+
+def format_mask(length: Optional[int]) -> Optional[str]:
+    return None if length is None else MASKS[length]
+
+
+def parse_address(text: str) -> int:
+    try:
+        return int.from_bytes(inet_pton(AF_INET, text), "big")
+    except OSError:
+        raise ValueError(f"Invalid IPv4 address: {text}") from None
+
+
+def parse_mask(mask: str) -> int:
+    """
+    Prefix length of a dotted netmask.
+    """
+    try:
+        return MASK_LENGTHS[mask.strip()]
+    except KeyError:
+        raise ValueError(f"Invalid netmask: {mask}") from None
+
+
+class Prefix(NamedTuple):
+    """
+    An address and a prefix length ("10.1.1.1/24"), host bits kept.
+    """
+    address: int
+    length: int
+
+    @property
+    def network(self) -> int:
+        return self.address & NETMASKS[self.length]
+
+    @property
+    def is_network(self) -> bool:
+        return not self.address & HOSTMASKS[self.length]
+
+    @property
+    def mask(self) -> str:
+        return MASKS[self.length]
+
+    @property
+    def wildcard(self) -> str:
+        return WILDCARDS[self.length]
+
+    def __str__(self) -> str:
+        return f"{format_address(self.address)}/{self.length}"
+
+
+def parse_prefix(cidr: str) -> Prefix:
+    """
+    Prefix of an "address/length" string.
+    """
+    address, sep, length = cidr.partition("/")
+    if not sep or not (length.isascii() and length.isdigit()) or int(length) > 32:
+        raise ValueError(f"Invalid CIDR notation: {cidr}")
+    try:
+        return Prefix(parse_address(address), int(length))
+    except ValueError as e:
+        raise ValueError(f"Invalid CIDR notation: {cidr}") from e
+
+
+def collapse_prefixes(prefixes: Iterable[Prefix]) -> List[Prefix]:
+    """
+    Smallest list of networks covering exactly the given prefixes, like
+    ipaddress.collapse_addresses: covered prefixes are dropped and sibling
+    networks merged into their parent.
+    """
+    collapsed: List[Prefix] = []
+    for prefix in sorted({Prefix(prefix.network, prefix.length) for prefix in prefixes}):
+        if collapsed:
+            last = collapsed[-1]
+            if prefix.length >= last.length and prefix.address & NETMASKS[last.length] == last.address:
+                continue
+        collapsed.append(prefix)
+        while len(collapsed) > 1:
+            a, b = collapsed[-2], collapsed[-1]
+            size = 1 << (32 - a.length)
+            if a.length != b.length or not a.length or a.address & size or b.address != a.address + size:
+                break
+            collapsed[-2:] = [Prefix(a.address, a.length - 1)]
+    return collapsed
@@ -17,6 +17,58 @@ def parse_args():
     )
     parser.add_argument("--nopush", dest="push", action="store_false", help="Do not push configurations (do not show the dialog).")
 
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum number of console sessions open at once (default: 64)")
+    parser.add_argument(
+        "--pacing",
+        choices=["prompt", "fixed"],
+        default="prompt",
+        help="Send each line as soon as the prompt returns (prompt) or wait 100 ms per line (fixed)"
+    )
+    parser.add_argument("--window", type=int, default=1, help="Number of config lines sent per prompt round-trip (default: 1)")
+    parser.add_argument(
+        "--delivery",
+        choices=["console", "upload"],
+        default="console",
+        help="Type the configurations over the consoles, or upload them as startup-configs and reload the nodes (Dynamips/IOU, console fallback)"
+    )
+    parser.add_argument("--start-batch", type=int, default=16, help="Number of GNS3 node start requests sent concurrently (default: 16)")
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=300,
+        help="Seconds to wait for each console to show a prompt before pushing, 0 to push right away (default: 300)"
+    )
+    parser.add_argument(
+        "--wave-overlap",
+        type=float,
+        default=1.0,
+        help="Fraction of a push wave (core, then edges, then clients) that must complete before the next one starts (default: 1.0)"
+    )
+    parser.add_argument("--no-waves", action="store_true", help="Push every node at once instead of in dependency-ordered waves")
+    parser.add_argument("--resume", action="store_true", help="Skip nodes already pushed and continue interrupted pushes from the last checkpoint")
+    parser.add_argument("--delta", action="store_true", help="Only push the commands differing from each node's running-config")
+    parser.add_argument("--verify", action="store_true", help="After the push, check OSPF, LDP, BGP, VRF prefixes and CE pings on every node")
+    parser.add_argument("--verify-timeout", type=float, default=300, help="Seconds to wait for the network to converge when verifying (default: 300)")
+    parser.add_argument("--stream", action="store_true", help="Read the intention file router by router instead of loading it whole (large files)")
+    parser.add_argument("--incremental", action="store_true", help="Only render and push devices whose generated configuration changed")
+    parser.add_argument("--reset-ipam", action="store_true", help="Forget the persisted IPAM state and re-allocate every address")
+    parser.add_argument(
+        "--render-backend",
+        choices=["thread", "process", "inline"],
+        default="thread",
+        help="Executor used to render the configurations (process scales across CPU cores)"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Number of render workers (default: CPU count)")
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=True,
+        default=None,
+        help="Print per-stage timing and memory of the generation and write a JSON report (optionally to REPORT)",
+        metavar="REPORT"
+    )
+    parser.add_argument("--cprofile", type=str, default=None, help="Also dump one cProfile file per stage in this directory", metavar="DIR")
+
     parser.set_defaults(push=True)
 
     return parser.parse_args()
@@ -0,0 +1,292 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from lib.addressing import HOSTMASKS, MASKS, WILDCARDS, Prefix, format_address, format_mask
+
+
+@dataclass(slots=True)
+class Interface:
+    name: str
+    neighbors: Tuple[int, ...] = ()     # device ids
+    type: Optional[str] = None          # 'backbone' | 'client' | 'provider' | 'loopback'
+    subnet_id: Optional[int] = None     # -1 for an unmanaged interface
+    address: Optional[int] = None
+    prefixlen: Optional[int] = None
+    client: Optional[str] = None        # client reached through a provider 'client' interface
+
+
+@dataclass(slots=True)
+class Subnet:
+    id: int
+    network: int
+    prefixlen: int
+    zone: str
+
+    @property
+    def hostmask(self) -> int:
+        return HOSTMASKS[self.prefixlen]
+
+    @property
+    def prefix(self) -> Prefix:
+        return Prefix(self.network, self.prefixlen)
+
+    def __str__(self) -> str:
+        return f"{format_address(self.network)}/{self.prefixlen}"
+
+
+@dataclass(slots=True)
+class Link:
+    """
+    Point to point L2 link between two devices, `a` and `b` being the hosts
+    of its subnet in address order once allocated.
+    """
+    a: int
+    b: int
+    zone: str
+    subnet: Optional[Subnet] = None
+
+
+@dataclass(slots=True)
+class VRF:
+    name: str
+    rd: int
+    asn: int        # ASN of the client
+
+
+@dataclass(slots=True)
+class ReflectorCluster:
+    """
+    Route reflectors and the iBGP speakers they reflect to. The clients of
+    an upper level cluster are the reflectors of the clusters below it.
+    """
+    id: Optional[int]               # BGP cluster-id, None for the flat legacy cluster
+    reflectors: List[int]
+    clients: List[int] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class Device:
+    id: int
+    name: str
+    role: str = ""                      # 'backbone' | 'edge' | 'client'
+    BGP_asn: Optional[int] = None
+    client: Optional[str] = None
+    is_route_reflector: bool = False
+    cluster_id: Optional[int] = None
+    interfaces: List[Interface] = field(default_factory=list)
+    # Client: networks announced over eBGP
+    advertised_networks: List[Prefix] = field(default_factory=list)
+    # Provider: OSPF network statements (prefix, area), area ranges of an ABR
+    # (area, summary), MPLS interfaces,
+    # iBGP peers -> whether the peer is a route reflector client of the device
+    ospf_networks: List[Tuple[Prefix, int]] = field(default_factory=list)
+    ospf_ranges: List[Tuple[int, Prefix]] = field(default_factory=list)
+    mpls_interfaces: List[str] = field(default_factory=list)
+    ibgp_peers: Dict[int, bool] = field(default_factory=dict)
+    # Edge: VRF of each client ASN and eBGP neighbor address -> VRF
+    vrfs: Dict[int, VRF] = field(default_factory=dict)
+    ebgp_neighbors: Dict[int, VRF] = field(default_factory=dict)
+    # Client: address of the PE
+    ebgp_peer: Optional[int] = None
+
+    def interface(self, name: str) -> Optional[Interface]:
+        return next((interface for interface in self.interfaces if interface.name == name), None)
+
+    def set_interface(self, interface: Interface) -> None:
+        """
+        Add an interface, replacing the one of the same name if any.
+        """
+        for i, current in enumerate(self.interfaces):
+            if current.name == interface.name:
+                self.interfaces[i] = interface
+                return
+        self.interfaces.append(interface)
+
+    @property
+    def loopback(self) -> Optional[int]:
+        # loopback0 is added after the interfaces of the intention
+        for interface in reversed(self.interfaces):
+            if interface.name == 'loopback0':
+                return interface.address
+        return None
+
+
+class Topology:
+    """
+    Every device of the intention, addressed by an integer id. Neighbor
+    names are given an id when first seen, so routers can be added in any
+    order; `names[id]` maps them back. Devices are iterated in the order of
+    the intention, provider routers first.
+
+    The model is internal to the pipeline: `export()` builds the
+    devices.json / template dict of a device on demand.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self.devices: List[Optional[Device]] = []
+        # Ids of the defined devices, in definition order
+        self.provider_ids: List[int] = []
+        self.client_ids: List[int] = []
+        self.links: List[Link] = []
+        self.provider_asn: Optional[int] = None
+
+    def id_of(self, name: str) -> int:
+        device_id = self.ids.get(name)
+        if device_id is None:
+            device_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self.devices.append(None)
+        return device_id
+
+    def add(self, name: str, **fields) -> Device:
+        device_id = self.id_of(name)
+        device = Device(device_id, name, **fields)
+        if self.devices[device_id] is None:
+            (self.client_ids if device.role == 'client' else self.provider_ids).append(device_id)
+        self.devices[device_id] = device
+        return device
+
+    def __contains__(self, name: str) -> bool:
+        device_id = self.ids.get(name)
+        return device_id is not None and self.devices[device_id] is not None
+
+    def __getitem__(self, name: str) -> Device:
+        device = self.devices[self.ids[name]]
+        if device is None:
+            raise KeyError(name)
+        return device
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self.provider_devices + self.client_devices)
+
+    def __len__(self) -> int:
+        return len(self.provider_ids) + len(self.client_ids)
+
+    def is_provider(self, device_id: int) -> bool:
+        device = self.devices[device_id]
+        return device is not None and device.role != 'client'
+
+    def is_client(self, device_id: int) -> bool:
+        device = self.devices[device_id]
+        return device is not None and device.role == 'client'
+
+    @property
+    def provider_devices(self) -> List[Device]:
+        return [self.devices[device_id] for device_id in self.provider_ids]
+
+    @property
+    def client_devices(self) -> List[Device]:
+        return [self.devices[device_id] for device_id in self.client_ids]
+
+    def _export_interface(self, interface: Interface) -> Dict[str, Any]:
+        conf = {
+            'neighbors': [self.names[nbr] for nbr in interface.neighbors],
+            'subnet_id': interface.subnet_id,
+            'ip_address': format_address(interface.address),
+            'subnet_mask': format_mask(interface.prefixlen),
+        }
+        if interface.type is not None:
+            conf['type'] = interface.type
+        if interface.client is not None:
+            conf['client'] = interface.client
+        return conf
+
+    def export(self, device: Device) -> Dict[str, Any]:
+        """
+        devices.json form of a device, which is also its template context.
+        """
+        interfaces = {interface.name: self._export_interface(interface) for interface in device.interfaces}
+        if device.role == 'client':
+            networks = [
+                {'address': format_address(prefix.address), 'mask': MASKS[prefix.length]}
+                for prefix in device.advertised_networks
+            ]
+            details = {
+                'BGP_asn': device.BGP_asn,
+                'interfaces': interfaces,
+                'unmanaged_interfaces': {
+                    interface.name: str(Prefix(interface.address, interface.prefixlen))
+                    for interface in device.interfaces if interface.subnet_id == -1
+                },
+                'BGP_advertized_networks': [
+                    dict(network, cidr=str(prefix)) for network, prefix in zip(networks, device.advertised_networks)
+                ],
+                'role': device.role,
+                'hostname': device.name,
+                'client': device.client,
+                'bgp_advertise': networks,
+            }
+            if device.ebgp_peer is not None:
+                details['eBGP_peer'] = {'ip_address': format_address(device.ebgp_peer), 'BGP_asn': self.provider_asn}
+            return details
+
+        details = {
+            'interfaces': interfaces,
+            'role': device.role,
+            'hostname': device.name,
+            'BGP_asn': device.BGP_asn,
+            'is_route_reflector': device.is_route_reflector,
+            'cluster_id': device.cluster_id,
+            'ospf_subnets': [
+                {'address': format_address(prefix.address), 'wildcard_mask': WILDCARDS[prefix.length], 'area': area}
+                for prefix, area in device.ospf_networks
+            ],
+            'ospf_ranges': [
+                {'area': area, 'address': format_address(prefix.address), 'mask': MASKS[prefix.length]}
+                for area, prefix in device.ospf_ranges
+            ],
+            'mpls_interfaces': device.mpls_interfaces,
+        }
+        details['iBGP_neighbors'] = {
+            format_address(self.devices[peer].loopback): {
+                'remote_as': device.BGP_asn,
+                'update_source': 'Loopback0',
+                'route_reflector_client': client,
+            }
+            for peer, client in device.ibgp_peers.items()
+        }
+        if device.role == 'edge':
+            details['VRF'] = {vrf.asn: {'name': vrf.name, 'rd': vrf.rd} for vrf in device.vrfs.values()}
+            details['eBGP_neighbors'] = {
+                format_address(address): {'BGP_asn': vrf.asn, 'VRF': vrf.name}
+                for address, vrf in device.ebgp_neighbors.items()
+            }
+        return details
+
+    def export_links(self) -> List[Tuple[str, str, str, str, int]]:
+        """
+        Allocated links as (dev1, dev2, zone, subnet, id).
+        """
+        return [
+            (self.names[link.a], self.names[link.b], link.zone, str(link.subnet), link.subnet.id)
+            for link in self.links if link.subnet is not None
+        ]
+
+    def contexts(self) -> "DeviceContexts":
+        return DeviceContexts(self)
+
+
+class DeviceContexts(Mapping):
+    """
+    Read-only mapping name -> exported device, each device being exported
+    when looked up so that the dicts of the whole topology never coexist.
+    """
+
+    def __init__(self, topology: Topology, names: Optional[List[str]] = None):
+        self.topology = topology
+        self.names = names if names is not None else [device.name for device in topology]
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        return self.topology.export(self.topology[name])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def subset(self, names: List[str]) -> "DeviceContexts":
+        return DeviceContexts(self.topology, names)
@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Console hosts meaning "every interface of the GNS3 server"
+WILDCARD_HOSTS = ("", "0.0.0.0", "::", "0:0:0:0:0:0:0:0")
+
+
+class Gns3Client:
+    """
+    Thin client for the GNS3 v2 REST API, over a pooled HTTP session so that
+    concurrent requests (node starts, file uploads) reuse their connections.
+    """
+
+    def __init__(self, url: str = "http://localhost:3080", user: Optional[str] = None, cred: Optional[str] = None,
+                 pool_size: int = 32, timeout: float = 60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        if user:
+            self.session.auth = (user, cred or "")
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, path: str, **kwargs) -> Any:
+        response = self.session.request(method, f"{self.url}/v2{path}", timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    def project(self, project_id: str) -> Dict[str, Any]:
+        return self.request("GET", f"/projects/{project_id}")
+
+    def open_project(self, project_id: str) -> Dict[str, Any]:
+        return self.request("POST", f"/projects/{project_id}/open")
+
+    def nodes(self, project_id: str) -> List[Dict[str, Any]]:
+        return self.request("GET", f"/projects/{project_id}/nodes")
+
+    def start_node(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        return self.request("POST", f"/projects/{project_id}/nodes/{node_id}/start", json={})
+
+    def stop_node(self, project_id: str, node_id: str) -> Dict[str, Any]:
+        return self.request("POST", f"/projects/{project_id}/nodes/{node_id}/stop", json={})
+
+    def write_node_file(self, project_id: str, node_id: str, path: str, content: str) -> None:
+        self.request("POST", f"/projects/{project_id}/nodes/{node_id}/files/{path}", data=content.encode('utf-8'))
+
+    def _in_batches(self, action, nodes: List[Dict[str, Any]], batch_size: int) -> Dict[str, str]:
+        """
+        Call `action(node)` for every node, `batch_size` at a time. Returns
+        the error message of each node whose request failed.
+        """
+        errors = {}
+        if not nodes:
+            return errors
+        with ThreadPoolExecutor(max_workers=max(1, batch_size)) as pool:
+            futures = {pool.submit(action, node): node['name'] for node in nodes}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except requests.RequestException as e:
+                    errors[futures[future]] = str(e)
+        return errors
+
+    def start_nodes(self, project_id: str, nodes: List[Dict[str, Any]], batch_size: int = 16) -> Dict[str, str]:
+        """
+        Start the nodes that are not running yet, `batch_size` requests at a
+        time. Returns the error message of each node that failed to start.
+        """
+        pending = [node for node in nodes if node.get('status') != 'started']
+        return self._in_batches(lambda node: self.start_node(project_id, node['node_id']), pending, batch_size)
+
+    @staticmethod
+    def startup_config_path(node: Dict[str, Any]) -> Optional[str]:
+        """
+        Path of the startup-config file in the node directory, None for node
+        types which do not boot from such a file.
+        """
+        if node.get('node_type') == 'dynamips':
+            return f"configs/i{node['properties']['dynamips_id']}_startup-config.cfg"
+        if node.get('node_type') == 'iou':
+            return "startup-config.cfg"
+        return None
+
+    def deploy_startup_configs(
+        self,
+        project_id: str,
+        nodes: List[Dict[str, Any]],
+        configs: Dict[str, str],
+        batch_size: int = 16
+    ) -> Dict[str, str]:
+        """
+        Reload `nodes` with the startup-config of `configs` (node name ->
+        content): running nodes are stopped first, as GNS3 saves their NVRAM
+        over the startup-config file on stop, then every file is uploaded and
+        the nodes are started. Returns the error message of each node left
+        without its configuration.
+        """
+        errors = self._in_batches(
+            lambda node: self.stop_node(project_id, node['node_id']),
+            [node for node in nodes if node.get('status') == 'started'],
+            batch_size
+        )
+        nodes = [node for node in nodes if node['name'] not in errors]
+        errors.update(self._in_batches(
+            lambda node: self.write_node_file(
+                project_id, node['node_id'], self.startup_config_path(node), configs[node['name']]
+            ),
+            nodes,
+            batch_size
+        ))
+        nodes = [dict(node, status='stopped') for node in nodes if node['name'] not in errors]
+        errors.update(self.start_nodes(project_id, nodes, batch_size))
+        return errors
+
+    def console_address(self, node: Dict[str, Any]) -> Tuple[str, Optional[int]]:
+        """
+        (host, port) of a node console, the server host standing in for a
+        console bound to every interface.
+        """
+        host = node.get('console_host') or ""
+        if host in WILDCARD_HOSTS:
+            host = urlparse(self.url).hostname
+        return host, node.get('console')
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "Gns3Client":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+from sys import intern
+from typing import Any, Iterator, List, Tuple, Union
+
+# Events produced while reading an intention:
+#   ('provider', key, value)             provider setting (BGP_asn, ranges, ...)
+#   ('provider_router', name, router)
+#   ('global', settings)                 clients.global
+#   ('client_router', client, name, router)
+IntentionEvent = Tuple[Any, ...]
+
+WHITESPACE = " \t\n\r"
+
+
+def _intern_pairs(pairs: List[Tuple[str, Any]]) -> dict:
+    # Interface and neighbor names repeat across thousands of routers
+    return {
+        intern(key): intern(value) if isinstance(value, str)
+        else [intern(item) if isinstance(item, str) else item for item in value] if isinstance(value, list)
+        else value
+        for key, value in pairs
+    }
+
+
+class JsonStream:
+    """
+    Incremental reader of a JSON document: the text is read by chunks,
+    objects can be walked member by member and any value decoded on its
+    own, so that only the value being decoded is held in memory.
+    """
+
+    def __init__(self, file, chunk_size: int = 1 << 20):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder(object_pairs_hook=_intern_pairs)
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Next significant character, '' at the end of the document.
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode the next value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number or literal ending with the buffer may go on in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """
+        Walk an object: yields each key, the caller then consumes its value
+        (with `value()`, `members()` or `skip()`) before asking the next one.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self.buffer, self.pos)
+            self.expect(":")
+            yield intern(key)
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+    def skip(self) -> None:
+        if self.peek() == "{":
+            for _ in self.members():
+                self.skip()
+        else:
+            self.value()
+
+
+def iter_intention(source: Union[str, Path], chunk_size: int = 1 << 20) -> Iterator[IntentionEvent]:
+    """
+    Read an intention file router by router, see IntentionEvent.
+    Unknown sections are skipped.
+    """
+    with open(source, "r") as f:
+        stream = JsonStream(f, chunk_size)
+        for section in stream.members():
+            if section == "provider":
+                for key in stream.members():
+                    if key == "routers":
+                        for name in stream.members():
+                            yield ('provider_router', name, stream.value())
+                    else:
+                        yield ('provider', key, stream.value())
+            elif section == "clients":
+                for client in stream.members():
+                    if client == "global":
+                        yield ('global', stream.value())
+                        continue
+                    for key in stream.members():
+                        if key == "routers":
+                            for name in stream.members():
+                                yield ('client_router', client, name, stream.value())
+                        else:
+                            stream.skip()
+            else:
+                stream.skip()
+        if stream.peek():
+            raise json.JSONDecodeError("Extra data", stream.buffer, stream.pos)
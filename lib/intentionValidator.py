@@ -0,0 +1,290 @@
+from ipaddress import IPv4Interface, IPv4Network
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel, StrictStr, ValidationError, conint
+
+ASN = conint(ge=1, le=4294967295)
+
+
+class InterfaceModel(BaseModel):
+    neighbors: Union[StrictStr, List[StrictStr]] = []
+    subnet_id: Optional[int] = None
+    ip_address: Optional[str] = None
+    subnet_mask: Optional[str] = None
+
+
+# An interface is given as a neighbor name, a list of neighbors or a dict
+Interface = Union[StrictStr, List[StrictStr], InterfaceModel]
+
+
+class ProviderRouterModel(BaseModel):
+    interfaces: Dict[str, Interface] = {}
+
+
+class ClientRouterModel(BaseModel):
+    BGP_asn: ASN
+    interfaces: Dict[str, Interface] = {}
+    unmanaged_interfaces: Dict[str, IPv4Interface] = {}
+    BGP_advertized_networks: List[IPv4Network] = []
+
+
+class ReflectorClusterModel(BaseModel):
+    reflectors: Union[StrictStr, List[StrictStr]]
+    clients: List[StrictStr] = []
+    cluster_id: Optional[ASN] = None
+    # cluster_id of the cluster whose reflectors reflect to this one's
+    parent: Optional[ASN] = None
+
+
+class RouteReflectorsModel(BaseModel):
+    clusters: List[ReflectorClusterModel] = []
+    fanout: Optional[conint(ge=2)] = None
+    redundancy: Optional[conint(ge=1)] = None
+
+
+class OspfModel(BaseModel):
+    # Routers of each area, the other ones being in area 0
+    areas: Dict[conint(ge=0, le=4294967295), List[StrictStr]] = {}
+    # Automatic partitioning in areas of at most area_size routers
+    area_size: Optional[conint(ge=2)] = None
+
+
+class ProviderModel(BaseModel):
+    BGP_asn: ASN
+    loopback_range: IPv4Network
+    ip_range: IPv4Network
+    # A list of reflectors shared by every PE, or clusters and placement settings
+    route_reflectors: Union[StrictStr, List[StrictStr], RouteReflectorsModel, None] = None
+    ospf: Optional[OspfModel] = None
+
+
+class GlobalModel(BaseModel):
+    ip_range: IPv4Network
+
+
+class IntentionError(Exception):
+    """
+    Raised with every problem found in an intention file.
+    """
+
+    def __init__(self, errors: List[str]):
+        super().__init__(f"{len(errors)} error(s) in the intention file")
+        self.errors = errors
+
+
+def _neighbors(interface: Any) -> List[str]:
+    if isinstance(interface, InterfaceModel):
+        interface = interface.neighbors
+    elif isinstance(interface, dict):
+        interface = interface.get('neighbors', [])
+    return [name for name in (interface if isinstance(interface, list) else [interface]) if isinstance(name, str)]
+
+
+def _interfaces(model: Optional[BaseModel], router: Any) -> Dict[str, Any]:
+    # Interfaces of an invalid router are still used to resolve its links
+    if model:
+        return model.interfaces
+    interfaces = router.get('interfaces') if isinstance(router, dict) else None
+    return interfaces if isinstance(interfaces, dict) else {}
+
+
+class IntentionValidator:
+    """
+    Validates an intention in a single pass: each section and router is
+    checked against its model as it is added, and the cross-references
+    (neighbors, link symmetry, ASNs, route reflectors) are resolved by
+    `finish()`. Every error is collected instead of stopping at the first.
+
+    Routers can be fed one at a time, so the intention does not need to be
+    fully loaded to be validated.
+    """
+
+    def __init__(self):
+        self.errors: List[str] = []
+        self.provider: Optional[ProviderModel] = None
+        self.routers: Dict[str, Optional[str]] = {}  # router -> client, None for the provider
+        # Interfaces from a to b minus interfaces from b to a, for each (a, b) with a < b.
+        # Balanced links are dropped, only the unresolved ones are kept
+        self.links: Dict[Tuple[str, str], int] = {}
+        self.asn_clients: Dict[int, str] = {}
+        self.shared_asns: Dict[int, set] = {}
+        self.has_global = False
+
+    def _check(self, model, data: Any, location: str):
+        try:
+            return model.parse_obj(data)
+        except ValidationError as e:
+            for error in e.errors():
+                path = ".".join(str(part) for part in (location, *error['loc']) if part != "__root__")
+                self.errors.append(f"{path}: {error['msg']}")
+            return None
+
+    def _location(self, name: str) -> str:
+        client = self.routers[name]
+        return f"provider.routers.{name}" if client is None else f"clients.{client}.routers.{name}"
+
+    def _add_router(self, name: str, client: Optional[str], interfaces: Dict[str, Any]) -> None:
+        if name in self.routers:
+            location = f"provider.routers.{name}" if client is None else f"clients.{client}.routers.{name}"
+            self.errors.append(f"{location}: router {name} already defined in {self._location(name)}")
+            return
+        self.routers[name] = client
+        for interface in interfaces.values():
+            for neighbor in _neighbors(interface):
+                if neighbor == name:
+                    self.errors.append(f"{self._location(name)}: interface connected to the router itself")
+                    continue
+                key, step = ((name, neighbor), 1) if name < neighbor else ((neighbor, name), -1)
+                balance = self.links.get(key, 0) + step
+                if balance:
+                    self.links[key] = balance
+                else:
+                    del self.links[key]
+
+    def add_provider(self, provider: Dict[str, Any]) -> None:
+        """
+        Provider settings, `routers` excepted.
+        """
+        settings = {key: value for key, value in provider.items() if key != 'routers'}
+        self.provider = self._check(ProviderModel, settings, "provider")
+
+    def add_provider_router(self, name: str, router: Dict[str, Any]) -> None:
+        location = f"provider.routers.{name}"
+        model = self._check(ProviderRouterModel, router, location)
+        self._add_router(name, None, _interfaces(model, router))
+
+    def add_global(self, settings: Dict[str, Any]) -> None:
+        self._check(GlobalModel, settings, "clients.global")
+        self.has_global = True
+
+    def add_client_router(self, client: str, name: str, router: Dict[str, Any]) -> None:
+        location = f"clients.{client}.routers.{name}"
+        model = self._check(ClientRouterModel, router, location)
+        self._add_router(name, client, _interfaces(model, router))
+        asn = model.BGP_asn if model else router.get('BGP_asn') if isinstance(router, dict) else None
+        if isinstance(asn, int):
+            owner = self.asn_clients.setdefault(asn, client)
+            if owner != client:
+                self.shared_asns.setdefault(asn, {owner}).add(client)
+
+    def add_intention(self, intention: Any) -> None:
+        """
+        Feed a whole intention dictionary.
+        """
+        if not isinstance(intention, dict):
+            self.errors.append("intention: must be a JSON object")
+            return
+        for section in ('provider', 'clients'):
+            if not isinstance(intention.get(section), dict):
+                self.errors.append(f"{section}: field required (object)")
+        provider = intention.get('provider')
+        if isinstance(provider, dict):
+            self.add_provider(provider)
+            routers = provider.get('routers')
+            if not isinstance(routers, dict):
+                self.errors.append("provider.routers: field required (object)")
+            else:
+                for name, router in routers.items():
+                    self.add_provider_router(name, router)
+        clients = intention.get('clients')
+        if isinstance(clients, dict):
+            for client, data in clients.items():
+                if client == 'global':
+                    self.add_global(data)
+                elif not isinstance(data, dict) or not isinstance(data.get('routers'), dict):
+                    self.errors.append(f"clients.{client}.routers: field required (object)")
+                else:
+                    for name, router in data['routers'].items():
+                        self.add_client_router(client, name, router)
+
+    def finish(self) -> List[str]:
+        """
+        Resolve the cross-references and return every error found.
+        """
+        errors = self.errors
+        if not self.has_global:
+            errors.append("clients.global: field required (ip_range of the client links)")
+        for (a, b), balance in self.links.items():
+            # The side with the extra interfaces is the one to blame
+            router, neighbor = (a, b) if balance > 0 else (b, a)
+            if neighbor not in self.routers:
+                errors.append(f"{self._location(router)}: neighbor {neighbor} is not defined")
+            else:
+                errors.append(
+                    f"{self._location(router)}: {abs(balance)} more interface(s) towards {neighbor} "
+                    f"than from {neighbor} back to {router}"
+                )
+        for asn, clients in sorted(self.shared_asns.items()):
+            errors.append(f"clients: BGP_asn {asn} used by several clients ({', '.join(sorted(clients))})")
+        if self.provider:
+            asn = self.provider.BGP_asn
+            if asn in self.asn_clients:
+                errors.append(f"clients.{self.asn_clients[asn]}: BGP_asn {asn} is the provider ASN")
+            route_reflectors = self.provider.route_reflectors or []
+            if isinstance(route_reflectors, RouteReflectorsModel):
+                self._check_clusters(route_reflectors)
+            else:
+                for rr in [route_reflectors] if isinstance(route_reflectors, str) else route_reflectors:
+                    self._check_provider_router(rr, "provider.route_reflectors")
+            if self.provider.ospf:
+                self._check_areas(self.provider.ospf)
+        return errors
+
+    def _check_provider_router(self, name: str, location: str) -> None:
+        if name not in self.routers or self.routers[name] is not None:
+            self.errors.append(f"{location}: {name} is not a provider router")
+
+    def _check_areas(self, settings: OspfModel) -> None:
+        area_of: Dict[str, int] = {}
+        for area, routers in settings.areas.items():
+            location = f"provider.ospf.areas.{area}"
+            for router in routers:
+                self._check_provider_router(router, location)
+                if area_of.setdefault(router, area) != area:
+                    self.errors.append(f"{location}: {router} already in area {area_of[router]}")
+
+    def _check_clusters(self, settings: RouteReflectorsModel) -> None:
+        errors = self.errors
+        if settings.fanout is not None and settings.redundancy is not None and settings.redundancy >= settings.fanout:
+            errors.append("provider.route_reflectors: redundancy must be lower than fanout")
+        cluster_of: Dict[str, int] = {}
+        parents: Dict[int, Optional[int]] = {}
+        for i, cluster in enumerate(settings.clusters):
+            location = f"provider.route_reflectors.clusters.{i}"
+            reflectors = [cluster.reflectors] if isinstance(cluster.reflectors, str) else cluster.reflectors
+            if not reflectors:
+                errors.append(f"{location}.reflectors: at least one reflector required")
+            for rr in reflectors:
+                self._check_provider_router(rr, f"{location}.reflectors")
+                if cluster_of.setdefault(rr, i) != i:
+                    errors.append(f"{location}.reflectors: {rr} already reflects for cluster {cluster_of[rr]}")
+            for client in cluster.clients:
+                self._check_provider_router(client, f"{location}.clients")
+            if cluster.cluster_id is not None:
+                if cluster.cluster_id in parents:
+                    errors.append(f"{location}.cluster_id: {cluster.cluster_id} used by several clusters")
+                parents[cluster.cluster_id] = cluster.parent
+        for i, cluster in enumerate(settings.clusters):
+            # Follow the parents up to a top level cluster
+            seen = {cluster.cluster_id}
+            parent = cluster.parent
+            while parent is not None:
+                if parent not in parents:
+                    errors.append(f"provider.route_reflectors.clusters.{i}.parent: cluster {parent} is not defined")
+                    break
+                if parent in seen:
+                    errors.append(f"provider.route_reflectors.clusters.{i}.parent: clusters form a cycle")
+                    break
+                seen.add(parent)
+                parent = parents[parent]
+
+
+def validate_intention(intention: Any) -> None:
+    """
+    Raise an IntentionError listing every problem of the intention.
+    """
+    validator = IntentionValidator()
+    validator.add_intention(intention)
+    errors = validator.finish()
+    if errors:
+        raise IntentionError(errors)
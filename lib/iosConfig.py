@@ -0,0 +1,157 @@
+from typing import Dict, List
+
+# Lines which only move the CLI around and are not part of the configuration
+IGNORED_LINES = {"enable", "end", "conf t", "configure terminal", "write memory", "exit", "exit-address-family"}
+IGNORED_PREFIXES = ("!", "Building configuration", "Current configuration")
+# Top-level sections which may be removed when they are no longer intended
+NEGATABLE_SECTIONS = ("vrf definition", "router bgp", "router ospf")
+# Commands whose key spans two words (ip address, vrf forwarding, ...)
+TWO_WORD_KEYS = {"ip", "vrf", "mpls", "bgp", "route-target", "address-family"}
+
+
+def normalize(line: str) -> str:
+    """
+    Comparison form of a config line: IOS rewrites case and spacing.
+    """
+    return " ".join(line.split()).lower()
+
+
+def line_key(line: str) -> str:
+    """
+    Command a line sets, used to tell which running lines an intended
+    section manages (ip address, neighbor, network, ...).
+    """
+    words = normalize(line).split()
+    if len(words) > 1 and words[0] == "no":
+        # A negation manages the command it negates
+        return line_key(" ".join(words[1:]))
+    if len(words) > 1 and words[0] in TWO_WORD_KEYS:
+        return " ".join(words[:2])
+    return words[0] if words else ""
+
+
+def line_identity(line: str) -> str:
+    """
+    Object a line applies to: adding a line with the same identity as a stale
+    one replaces it, so the stale line does not need to be negated first.
+    """
+    words = normalize(line).split()
+    if words and words[0] == "neighbor":
+        return " ".join(words[:2])
+    return line_key(line)
+
+
+class ConfigSection:
+    """
+    Node of an IOS configuration tree: a command line and its indented children.
+    """
+
+    __slots__ = ("line", "children")
+
+    def __init__(self, line: str = ""):
+        self.line = line
+        self.children: Dict[str, "ConfigSection"] = {}
+
+    def add(self, line: str) -> "ConfigSection":
+        key = normalize(line)
+        if key not in self.children:
+            self.children[key] = ConfigSection(line.strip())
+        else:
+            # Sections split in several blocks (e.g. router bgp) are merged at
+            # their last position, after whatever the later block depends on
+            self.children[key] = self.children.pop(key)
+        return self.children[key]
+
+    def lines(self, depth: int = 0) -> List[str]:
+        """
+        Flatten the section back into indented CLI lines.
+        """
+        out = [" " * depth + self.line]
+        for child in self.children.values():
+            out += child.lines(depth + 1)
+        if self.children:
+            out.append(" " * (depth + 1) + "exit")
+        return out
+
+
+def parse_config(text: str) -> ConfigSection:
+    """
+    Parse a rendered or running configuration into a section tree based on
+    indentation, dropping comments and navigation commands.
+    """
+    root = ConfigSection()
+    stack = [(-1, root)]
+    for raw in text.splitlines():
+        stripped = raw.strip()
+        if not stripped or stripped.startswith(IGNORED_PREFIXES) or stripped in IGNORED_LINES:
+            continue
+        depth = len(raw) - len(raw.lstrip(" "))
+        while stack[-1][0] >= depth:
+            stack.pop()
+        stack.append((depth, stack[-1][1].add(stripped)))
+    return root
+
+
+def diff_sections(running: ConfigSection, intended: ConfigSection, top_level: bool = False) -> List[str]:
+    """
+    Commands turning `running` into `intended` for the children of one
+    section: stale managed lines are negated first, then missing lines added.
+    """
+    intended_keys = {line_key(child.line) for child in intended.children.values()}
+    # Commands the intended section sets, as opposed to negates
+    set_keys = {line_key(child.line) for key, child in intended.children.items() if not key.startswith("no ")}
+    negations: List[str] = []
+    additions: List[str] = []
+    replaced = set()
+
+    for key, child in intended.children.items():
+        if key in running.children:
+            sub = diff_sections(running.children[key], child)
+            if sub:
+                additions += [child.line] + [" " + cmd for cmd in sub] + [" exit"]
+        elif key.startswith("no "):
+            # "no shutdown" est satisfait si "shutdown" n'apparait pas
+            if key[3:] in running.children:
+                additions.append(child.line)
+        else:
+            additions += child.lines()
+            if not child.children:
+                replaced.add(line_identity(child.line))
+
+    for key, child in running.children.items():
+        if key in intended.children or line_key(child.line) not in intended_keys:
+            continue
+        if top_level and not key.startswith(NEGATABLE_SECTIONS):
+            continue
+        if not child.children and line_identity(child.line) in replaced:
+            continue
+        if key.startswith("no "):
+            # "no ip address" goes away once the intended "ip address" is set
+            if line_key(child.line) not in set_keys:
+                negations.append(child.line[3:])
+        elif f"no {key}" not in intended.children:
+            # An intended "no shutdown" is already added as is
+            negations.append(f"no {child.line}")
+
+    return negations + additions
+
+
+def config_delta(running_text: str, intended_text: str) -> List[str]:
+    """
+    Minimal list of configuration-mode commands to apply the intended
+    configuration on a device currently running `running_text`.
+    """
+    return diff_sections(parse_config(running_text), parse_config(intended_text), top_level=True)
+
+
+def startup_config(config_text: str) -> str:
+    """
+    Rendered configuration as a startup-config file: the top-level commands
+    only meant to move the console CLI around (enable, conf t, write memory,
+    ...) are dropped, a single `end` closes the file.
+    """
+    lines = [
+        line for line in config_text.splitlines()
+        if line[:1].isspace() or line.strip() not in IGNORED_LINES
+    ]
+    return "\n".join(lines).rstrip() + "\nend\n"
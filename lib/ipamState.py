@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+
+class IpamState:
+    """
+    Persisted IPAM assignments (link -> subnet, device -> loopback) so that
+    re-running the generator keeps every existing address where it was.
+    """
+
+    def __init__(self, links: Dict[str, Dict[str, Any]] = None, loopbacks: Dict[str, str] = None):
+        # "dev1|dev2" -> {"hosts": [dev1, dev2], "zone": zone, "subnet": cidr}
+        self.links = links or {}
+        # device -> loopback address
+        self.loopbacks = loopbacks or {}
+
+    @staticmethod
+    def link_key(d1: str, d2: str) -> str:
+        return "|".join(sorted((d1, d2)))
+
+    @classmethod
+    def load(cls, path: Path) -> "IpamState":
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls()
+        return cls(data.get('links'), data.get('loopbacks'))
+
+    def save(self, path: Path) -> None:
+        with open(path, 'w') as f:
+            json.dump({'links': self.links, 'loopbacks': self.loopbacks}, f, indent=4, sort_keys=True)
+
+    def collect_links(self, keys: Iterable[str]) -> None:
+        """
+        Forget the links which are no longer in the topology.
+        """
+        keys = set(keys)
+        for key in [k for k in self.links if k not in keys]:
+            del self.links[key]
+
+    def collect_loopbacks(self, devices: Iterable[str]) -> None:
+        """
+        Forget the loopbacks of devices which are no longer in the topology.
+        """
+        devices = set(devices)
+        for name in [n for n in self.loopbacks if n not in devices]:
+            del self.loopbacks[name]
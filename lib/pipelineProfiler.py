@@ -0,0 +1,106 @@
+import cProfile
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import re
+from time import perf_counter, process_time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+
+class PipelineProfiler:
+    """
+    Per-stage instrumentation of the generation pipeline: wall and CPU time,
+    traced memory peak and net allocation of the stage (tracemalloc) and,
+    optionally, one cProfile dump per stage.
+
+    A disabled profiler makes `stage()` a no-op, so the pipeline can always
+    be written against a profiler.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = True, cprofile_dir: Optional[Path] = None):
+        self.enabled = enabled
+        self.trace_memory = trace_memory
+        self.cprofile_dir = Path(cprofile_dir) if cprofile_dir else None
+        self.stages: List[Dict[str, Any]] = []
+        self._started_tracing = False
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        profile = None
+        if self.cprofile_dir:
+            self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+            profile = cProfile.Profile()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+
+        wall_start, cpu_start = perf_counter(), process_time()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+            record = {
+                'stage': name,
+                'wall_s': perf_counter() - wall_start,
+                'cpu_s': process_time() - cpu_start,
+            }
+            if self.trace_memory:
+                current, peak = tracemalloc.get_traced_memory()
+                # Absolute peak since tracing started, including data kept from earlier stages
+                record['peak_mem_mb'] = peak / 2 ** 20
+                record['mem_delta_mb'] = (current - mem_start) / 2 ** 20
+            if profile:
+                slug = re.sub(r"\W+", "_", name).strip("_").lower()
+                path = self.cprofile_dir / f"{len(self.stages):02d}_{slug}.prof"
+                profile.dump_stats(str(path))
+                record['cprofile'] = str(path)
+            self.stages.append(record)
+
+    def close(self) -> None:
+        """
+        Stop memory tracing if this profiler started it.
+        """
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self) -> Dict[str, Any]:
+        total = {
+            'wall_s': sum(s['wall_s'] for s in self.stages),
+            'cpu_s': sum(s['cpu_s'] for s in self.stages),
+        }
+        if self.trace_memory and self.stages:
+            total['peak_mem_mb'] = max(s['peak_mem_mb'] for s in self.stages)
+        return {'stages': self.stages, 'total': total}
+
+    def save(self, path: Path) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=4)
+
+    def summary(self) -> str:
+        """
+        Human readable table of the recorded stages.
+        """
+        report = self.report()
+        total_wall = report['total']['wall_s'] or 1
+        header = f"{'Stage':<28}{'Wall (s)':>10}{'CPU (s)':>10}{'%':>7}"
+        if self.trace_memory:
+            header += f"{'Peak (MB)':>11}"
+        lines = [header, "-" * len(header)]
+        for s in report['stages'] + [dict(report['total'], stage='Total')]:
+            line = f"{s['stage']:<28}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}{100 * s['wall_s'] / total_wall:>7.1f}"
+            if self.trace_memory:
+                line += f"{s.get('peak_mem_mb', 0):>11.2f}"
+            lines.append(line)
+        return "\n".join(lines)
@@ -1,11 +1,189 @@
-from ipaddress import ip_network
+from heapq import heappop, heappush
+from ipaddress import IPv4Network, ip_network
+from typing import List
+
+from lib.addressing import HOSTMASKS, Prefix
+
+
+class SubnetExhaustedError(Exception):
+    """Raised when the allocator has no free block left for a request."""
+
+
+def prefix_for_hosts(hosts: int) -> int:
+    """
+    Return the longest prefix length able to fit the given number of hosts.
+    """
+    prefix = 30
+    while (2 ** (32 - prefix)) - 2 < hosts:
+        prefix -= 1
+    return prefix
+
 
 class SubnetAllocator:
+    """
+    Buddy allocator over the integer address range of `base_network`.
+
+    Free blocks are kept per prefix length in a min-heap (lowest address first)
+    backed by a set used for membership and lazy deletion, so allocate, reserve
+    and release are O(log n) and never rescan already allocated space.
+    """
+
     def __init__(self, base_network="10.0.0.0/8"):
         self.base_network = base_network
-        self.reserved_subnets = []
+        base = ip_network(base_network)
+        self._base_addr = int(base.network_address)
+        self._base_prefix = base.prefixlen
+        self._heaps = {prefix: [] for prefix in range(self._base_prefix, 33)}
+        self._free = {prefix: set() for prefix in range(self._base_prefix, 33)}
+        self._allocated = {}  # address -> prefix length
+        self._push_free(self._base_addr, self._base_prefix)
+
+    @property
+    def reserved_subnets(self) -> list:
+        return [IPv4Network((addr, prefix)) for addr, prefix in sorted(self._allocated.items())]
+
+    def _push_free(self, addr: int, prefix: int) -> None:
+        self._free[prefix].add(addr)
+        heappush(self._heaps[prefix], addr)
+
+    def _pop_free(self, prefix: int):
+        heap, free = self._heaps[prefix], self._free[prefix]
+        while heap:
+            addr = heappop(heap)
+            if addr in free:
+                free.remove(addr)
+                return addr
+        return None
+
+    def _check_prefix(self, prefix: int) -> None:
+        if not 0 <= prefix <= 32:
+            raise ValueError(f"Invalid prefix length /{prefix}")
+        if prefix < self._base_prefix:
+            raise SubnetExhaustedError(f"No space left in {self.base_network} for a /{prefix}")
+
+    def allocate(self, prefix: int) -> IPv4Network:
+        """
+        Allocate the lowest free block of the given prefix length.
+        """
+        self._check_prefix(prefix)
+        # Smallest free block able to hold the request
+        for order in range(prefix, self._base_prefix - 1, -1):
+            addr = self._pop_free(order)
+            if addr is not None:
+                break
+        else:
+            raise SubnetExhaustedError(f"No space left in {self.base_network} for a /{prefix}")
+
+        # Split it down, keeping the lower half and freeing the upper buddies
+        for order in range(order + 1, prefix + 1):
+            self._push_free(addr + (1 << (32 - order)), order)
+
+        self._allocated[addr] = prefix
+        return IPv4Network((addr, prefix))
+
+    def allocate_many(self, prefix: int, count: int) -> List[int]:
+        """
+        Allocate `count` blocks of the given prefix length at once and return
+        their network addresses as integers, in the order (and with the
+        resulting free blocks) of `count` successive `allocate()` calls.
+
+        A free block larger than the request is consumed as a run of
+        consecutive sub-blocks computed by arithmetic, and only what is left
+        of it is given back to the free lists.
+        """
+        self._check_prefix(prefix)
+        size = 1 << (32 - prefix)
+        addresses: List[int] = []
+        while len(addresses) < count:
+            # Smallest free block able to hold the request, as allocate()
+            for order in range(prefix, self._base_prefix - 1, -1):
+                addr = self._pop_free(order)
+                if addr is not None:
+                    break
+            else:
+                raise SubnetExhaustedError(f"No space left in {self.base_network} for a /{prefix}")
+
+            end = addr + (1 << (32 - order))
+            taken = min(count - len(addresses), (end - addr) // size)
+            run = range(addr, addr + taken * size, size)
+            addresses.extend(run)
+            self._allocated.update(dict.fromkeys(run, prefix))
+
+            # The rest of the block, split in aligned buddies
+            start = addr + taken * size
+            while start < end:
+                block_order = prefix
+                while block_order > order and not start & ((1 << (33 - block_order)) - 1) \
+                        and start + (1 << (33 - block_order)) <= end:
+                    block_order -= 1
+                self._push_free(start, block_order)
+                start += 1 << (32 - block_order)
+        return addresses
+
+    def allocate_hosts(self, hosts: int) -> IPv4Network:
+        """
+        Allocate the smallest subnet able to fit the given number of hosts.
+        """
+        return self.allocate(prefix_for_hosts(hosts))
+
+    def reserve(self, subnet) -> IPv4Network:
+        """
+        Explicitly reserve a given subnet so it is never handed out.
+        """
+        subnet = ip_network(subnet)
+        self.reserve_block(int(subnet.network_address), subnet.prefixlen)
+        return subnet
+
+    def reserve_block(self, addr: int, prefix: int) -> None:
+        """
+        `reserve()` for a block given as an integer network address and a
+        prefix length.
+        """
+        self._check_prefix(prefix)
+        if addr & HOSTMASKS[prefix]:
+            raise ValueError(f"{Prefix(addr, prefix)} has host bits set")
+        if (addr >> (32 - self._base_prefix)) != (self._base_addr >> (32 - self._base_prefix)):
+            raise ValueError(f"Subnet {Prefix(addr, prefix)} is outside of {self.base_network}")
+
+        # Find the free block containing the subnet
+        for order in range(prefix, self._base_prefix - 1, -1):
+            block = addr & ~((1 << (32 - order)) - 1)
+            if block in self._free[order]:
+                self._free[order].remove(block)
+                break
+        else:
+            raise ValueError(f"Subnet {Prefix(addr, prefix)} overlaps an already allocated subnet")
+
+        # Split it down, freeing every half that does not contain the subnet
+        for order in range(order + 1, prefix + 1):
+            half = 1 << (32 - order)
+            if addr & half:
+                self._push_free(block, order)
+                block += half
+            else:
+                self._push_free(block + half, order)
+
+        self._allocated[addr] = prefix
+
+    def release(self, subnet) -> None:
+        """
+        Give back a previously allocated or reserved subnet, merging free buddies.
+        """
+        subnet = ip_network(subnet)
+        addr = int(subnet.network_address)
+        if self._allocated.get(addr) != subnet.prefixlen:
+            raise ValueError(f"Subnet {subnet} is not allocated")
+        prefix = self._allocated.pop(addr)
+
+        while prefix > self._base_prefix:
+            buddy = addr ^ (1 << (32 - prefix))
+            if buddy not in self._free[prefix]:
+                break
+            self._free[prefix].remove(buddy)
+            addr = min(addr, buddy)
+            prefix -= 1
+        self._push_free(addr, prefix)
 
-    
     def get_subnets(self, subnets_intention=dict) -> dict:
         """
         Get the next available subnet of a specific number of hosts.
@@ -14,30 +192,15 @@ class SubnetAllocator:
         subnets_id = sorted(subnets_intention.keys(), key=lambda x: subnets_intention[x]["size"], reverse=True)
 
         for sid in subnets_id:
-            subnet_size = subnets_intention[sid]["size"]
-            # Calculate the subnet size
-            subnet_mask = 30
-            while (2 ** (32- subnet_mask)) - 2 < subnet_size:
-                subnet_mask -= 1
-
-            # Find the next available subnet
-            for subnet in ip_network(self.base_network).subnets(new_prefix=subnet_mask):
-                # Check if the subnet is already reserved
-                if not any(subnet.overlaps(reserved) for reserved in self.reserved_subnets):
-                    # Reserve the subnet
-                    self.reserved_subnets.append(subnet)
-                    subnets_intention[sid]["subnet"] = subnet
-                    break
-            else:
-                print(f"No available subnets for size {subnet_size}")
+            subnets_intention[sid]["subnet"] = self.allocate_hosts(subnets_intention[sid]["size"])
 
         return subnets_intention
 
 # Test the SubnetAllocator class
 if __name__ == "__main__":
     allocator = SubnetAllocator()
-    sizes = {"0": 2, "1": 3, "2": 9} # {subnet_id: number of hosts to fit}
+    sizes = {"0": {"size": 2}, "1": {"size": 3}, "2": {"size": 9}} # {subnet_id: number of hosts to fit}
     subnets = allocator.get_subnets(sizes)
     print("Reserved subnets:")
     for subnet_id, subnet in subnets.items():
-        print(f"Subnet ID {subnet_id}: {subnet}")
+        print(f"Subnet ID {subnet_id}: {subnet['subnet']}")
@@ -1,8 +1,41 @@
-import telnetlib
+import asyncio
+import hashlib
+import json
+from math import ceil
+import os
+from pathlib import Path
+import re
 from threading import Thread
-import time
 import sys
-from tkinter import Frame  # pour éviter l'erreur dans MessageBox si utilisé
+from typing import Any, Dict, List, Optional, Tuple
+
+from lib.iosConfig import config_delta
+
+# Telnet protocol bytes (RFC 854)
+IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+# Options we agree to: echo and suppress-go-ahead, as any console server expects
+ECHO, SGA = 1, 3
+ACCEPTED_OPTIONS = {ECHO, SGA}
+
+# IOS prompts (Router#, Router>, Router(config)#, Router(config-router-af)#, ...)
+# plus the pager and confirmation prompts that must be answered to move on.
+# Any word is accepted until the hostname is known, see prompt_re.
+PROMPT_RE = re.compile(rb"(?:^|[\r\n])([\w.\-/]+)(?:\([\w.\-/]+\))?[#>]|--More--|\[confirm\]")
+PACING_MODES = ("prompt", "fixed")
+# Asked by IOS on first boot without a startup-config
+SETUP_DIALOG = b"initial configuration dialog"
+# Minimum delay in seconds between two writes of the push checkpoint
+CHECKPOINT_INTERVAL = 2.0
+
+def prompt_re(hostnames) -> "re.Pattern[bytes]":
+    """
+    PROMPT_RE restricted to the prompts of the given hostnames, so that
+    show outputs such as "r>i10.0.0.0/24" in a BGP table are not taken
+    for a prompt.
+    """
+    names = b"|".join(re.escape(name) for name in sorted(hostnames, key=len, reverse=True))
+    return re.compile(rb"(?:^|[\r\n])(" + names + rb")(?:\([\w.\-/]+\))?[#>]|--More--|\[confirm\]")
+
 
 def clear_lines(n):
         for _ in range(n):
@@ -10,50 +43,353 @@ def clear_lines(n):
             sys.stdout.write('\x1b[2K')  # Clear entire line
 
 class TelnetClient:
-    def __init__(self, host, port=23, timeout=10):
+    """
+    Minimal asyncio telnet client for router consoles.
+
+    Option negotiation is limited to accepting ECHO/SGA and refusing anything
+    else, which is all the GNS3 console servers require.
+
+    With `pacing="prompt"` the next line is sent as soon as the router prompt
+    comes back (up to `window` lines in flight), `pacing="fixed"` keeps the
+    legacy read-until-# plus 100 ms sleep per line.
+    """
+
+    def __init__(self, host, port=23, timeout=10, pacing="prompt", window=1, resume_from=0):
+        if pacing not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode '{pacing}', expected one of {PACING_MODES}")
         self.host = host
         self.port = port
         self.timeout = timeout
-        self.connection = None
+        self.pacing = pacing
+        self.window = max(1, window)
+        self.reader = None
+        self.writer = None
         self.done = False
+        self.started = False
+        self.unchanged = False
+        self.completed = False
+        self.probing = False
+        self.ready = None
+        # Number of config commands acknowledged by the console (see config_commands)
+        self.acked = 0
+        self.resume_from = resume_from
+        self._buffer = bytearray()
+        self._pending = b""  # incomplete IAC sequence carried between reads
+        self._answered = set()
+        # Hostnames the prompts are matched on, learnt by wake_up and from
+        # the hostname commands sent
+        self.hostnames = set()
+        self._prompt_re = PROMPT_RE
 
-    def connect(self):
+    @property
+    def connection(self):
+        return self.writer
+
+    async def connect(self):
         try:
-            self.connection = telnetlib.Telnet(self.host, self.port, self.timeout)
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
             # print(f"Connected to {self.host}:{self.port}")
         except Exception as e:
             print(f"Failed to connect to {self.host}:{self.port} - {e}")
 
-    def send_command(self, command):
-        if self.connection:
+    def _negotiate(self, data: bytes) -> bytes:
+        """
+        Strip telnet commands from `data`, answering option negotiations.
+        Returns the payload bytes.
+        """
+        data = self._pending + data
+        self._pending = b""
+        payload = bytearray()
+        i, n = 0, len(data)
+        while i < n:
+            byte = data[i]
+            if byte != IAC:
+                payload.append(byte)
+                i += 1
+                continue
+            if i + 1 >= n:
+                self._pending = data[i:]
+                break
+            cmd = data[i + 1]
+            if cmd == IAC:  # escaped 0xFF
+                payload.append(IAC)
+                i += 2
+            elif cmd in (DO, DONT, WILL, WONT):
+                if i + 2 >= n:
+                    self._pending = data[i:]
+                    break
+                self._answer(cmd, data[i + 2])
+                i += 3
+            elif cmd == SB:
+                end = data.find(bytes((IAC, SE)), i + 2)
+                if end < 0:
+                    self._pending = data[i:]
+                    break
+                i = end + 2
+            else:
+                i += 2
+        return bytes(payload)
+
+    def _answer(self, cmd: int, option: int) -> None:
+        if (cmd, option) in self._answered:
+            return
+        self._answered.add((cmd, option))
+        if cmd == DO:
+            reply = WILL if option == SGA else WONT
+        elif cmd == WILL:
+            reply = DO if option in ACCEPTED_OPTIONS else DONT
+        else:
+            return
+        self.writer.write(bytes((IAC, reply, option)))
+
+    async def read_until(self, expected: bytes, timeout=None) -> bytes:
+        """
+        Read until `expected` is seen or the timeout expires, like telnetlib.
+        Returns what was read, including `expected` if found.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            idx = self._buffer.find(expected)
+            if idx >= 0:
+                idx += len(expected)
+                data = bytes(self._buffer[:idx])
+                del self._buffer[:idx]
+                return data
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self._fill(remaining):
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                return data
+
+    async def _fill(self, timeout) -> bool:
+        try:
+            chunk = await asyncio.wait_for(self.reader.read(4096), timeout)
+        except asyncio.TimeoutError:
+            return False
+        if not chunk:
+            raise ConnectionError(f"Connection to {self.host}:{self.port} closed")
+        self._buffer += self._negotiate(chunk)
+        return True
+
+    def read_very_eager(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+    async def send_command(self, command):
+        if self.writer:
             try:
-                self.connection.write(command.encode('ascii') + b"\r\n")
-                self.connection.read_until(b"#", timeout=self.timeout)
-                response = self.connection.read_very_eager().decode('ascii')
-                return response
-            except Exception as e:
+                self.writer.write(command.encode('ascii') + b"\r\n")
+                await self.writer.drain()
+                response = await self.read_until(b"#", timeout=self.timeout)
+                response += self.read_very_eager()
+                return response.decode('ascii', errors='replace')
+            except (OSError, ConnectionError):
                 # print(f"Failed to send command '{command}' - {e}")
                 return None
         else:
             print("No connection established.")
             return None
 
+    async def wait_prompts(self, count=1, timeout=None, partial=False) -> str:
+        """
+        Read until `count` prompts have been seen, answering pagers and
+        confirmations on the way. Returns the output read.
+        Raises asyncio.TimeoutError if fewer prompts came back in time, unless
+        `partial` is set (draining, probing), in which case whatever was read
+        is returned.
+        """
+        output = await self._read_prompts(count, timeout, partial)
+        return output.decode('ascii', errors='replace')
+
+    async def _read_prompts(self, count, timeout, partial) -> bytes:
+        """
+        wait_prompts on the raw console bytes, to match them against
+        PROMPT_RE and SETUP_DIALOG whatever the console printed.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        output = bytearray()
+        seen = 0
+        while seen < count:
+            match = self._prompt_re.search(self._buffer)
+            if match:
+                output += self._buffer[:match.end()]
+                del self._buffer[:match.end()]
+                token = match.group()
+                if token == b"--More--":
+                    self.writer.write(b" ")
+                elif token == b"[confirm]":
+                    self.writer.write(b"\r")
+                else:
+                    seen += 1
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await self._fill(remaining):
+                if partial:
+                    # Keep what follows the last prompt, e.g. the setup dialog question
+                    output += self._buffer
+                    self._buffer.clear()
+                    break
+                raise asyncio.TimeoutError(f"{self.host}:{self.port} answered {seen} of {count} prompts")
+        return bytes(output)
+
+    async def send_lines(self, lines) -> str:
+        """
+        Send a batch of lines at once and wait for one prompt per line.
+        Raises asyncio.TimeoutError if the console does not answer them all.
+        """
+        for line in lines:
+            words = line.split()
+            if len(words) == 2 and words[0] == "hostname":
+                # The prompts that follow may already show the new hostname
+                self.learn_hostname(words[1].encode('ascii'))
+        self.writer.write(b"".join(line.encode('ascii') + b"\r\n" for line in lines))
+        await self.writer.drain()
+        return await self.wait_prompts(len(lines))
+
+    def learn_hostname(self, hostname: bytes):
+        self.hostnames.add(hostname)
+        self._prompt_re = prompt_re(self.hostnames)
+
+    def _learn_prompt(self, output: bytes):
+        """
+        Learn the hostname of the last prompt in `output`.
+        """
+        names = [match.group(1) for match in PROMPT_RE.finditer(output) if match.group(1)]
+        if names:
+            self.learn_hostname(names[-1])
+
+    async def wake_up(self, attempts=3) -> bool:
+        """
+        Press return until the console shows a prompt, and learn the
+        hostname it shows.
+        """
+        for _ in range(attempts):
+            self.writer.write(b"\r\n")
+            await self.writer.drain()
+            try:
+                output = await self._read_prompts(1, self.timeout / attempts, partial=False)
+            except asyncio.TimeoutError:
+                continue
+            self._learn_prompt(output)
+            # Drain the extra prompts a console may print for the same return
+            await self.wait_prompts(count=sys.maxsize, timeout=0.2, partial=True)
+            return True
+        return False
+
+    async def wait_ready(self, timeout=300, interval=2.0) -> bool:
+        """
+        Wait until the console accepts connections and answers with a prompt,
+        i.e. the router has finished booting. The connection is kept open
+        for the push.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            try:
+                if not self.writer:
+                    self.reader, self.writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), interval
+                    )
+                self.writer.write(b"\r\n")
+                await self.writer.drain()
+                output = await self._read_prompts(1, interval, partial=True)
+                if SETUP_DIALOG in output:
+                    self.writer.write(b"no\r\n")
+                    await self.writer.drain()
+                elif PROMPT_RE.search(output):
+                    self._learn_prompt(output)
+                    await self.wait_prompts(count=sys.maxsize, timeout=0.2, partial=True)
+                    return True
+            except (OSError, asyncio.TimeoutError):
+                # Node not started yet, or its console server not listening
+                self.close()
+                self.reader = self.writer = None
+                await asyncio.sleep(interval)
+        return False
+
     def close(self):
-        if self.connection:
-            self.connection.close()
+        if self.writer:
+            self.writer.close()
             #print("Connection closed.")
 
-    def push_configuration(self, config_commands: str):
+    async def fetch_running_config(self) -> str:
+        """
+        Return the output of `show running-config`, without paging.
+        """
+        await self.send_lines(["enable", "end", "terminal length 0"])
+        self.writer.write(b"show running-config\r\n")
+        await self.writer.drain()
+        output = await self.read_until(b"\nend", timeout=max(self.timeout, 30))
+        await self.wait_prompts(1)
+        return output.decode('ascii', errors='replace')
+
+    async def run_commands(self, commands: List[str]) -> Dict[str, str]:
+        """
+        Run exec-mode commands and return the output of each one, without the
+        echoed command nor the final prompt. The connection is kept open to
+        be reused by the next call.
+        """
+        if not self.writer:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+            await self.wake_up()
+            await self.send_lines(["enable", "end", "terminal length 0"])
+        outputs = {}
+        for command in commands:
+            self.writer.write(command.encode('ascii') + b"\r\n")
+            await self.writer.drain()
+            output = await self.wait_prompts(1, timeout=max(self.timeout, 30))
+            # First line is the echo, last one the prompt
+            outputs[command] = "\n".join(output.replace("\r", "").split("\n")[1:-1])
+        return outputs
+
+    async def delta_configuration(self, config_commands: str) -> str:
+        """
+        Compare the rendered configuration with the running one and return
+        only the commands to apply, wrapped to enter and save the config.
+        Returns an empty string when the device is already up to date.
+        """
+        await self._wake_up_or_fail()
+        running = await self.fetch_running_config()
+        commands = config_delta(running, config_commands)
+        if not commands:
+            return ""
+        return "\n".join(["end", "conf t", *commands, "end", "write memory"])
+
+    async def push_configuration(self, config_commands: str, delta: bool = False):
         self.done = False
-        if not self.connection:
-            self.connect()
-        if self.connection:
+        if not self.writer:
+            await self.connect()
+        if self.writer:
             try:
-                self.send_command("\n\n")
-                for command in config_commands.splitlines():
-                    self.send_command(command.strip())
-                    time.sleep(0.1)
-                    #self.send_command("")
+                if delta:
+                    # The delta is recomputed from the running-config, no need to resume
+                    config_commands = await self.delta_configuration(config_commands)
+                    self.unchanged = not config_commands
+                    self.resume_from = 0
+                commands = config_commands_of(config_commands)
+                preamble, start = resume_plan(commands, self.resume_from)
+                self.acked = start
+                if self.unchanged:
+                    pass
+                elif self.pacing == "prompt":
+                    await self._push_adaptive(commands, preamble, start)
+                else:
+                    await self.send_command("\n\n")
+                    for command in preamble:
+                        await self._send_fixed(command.strip())
+                    for i in range(start, len(commands)):
+                        await self._send_fixed(commands[i].strip())
+                        self.acked = i + 1
+                self.completed = True
             except Exception as e:
                 #print(f"Failed to push configuration - {e}")
                 pass
@@ -64,32 +400,295 @@ class TelnetClient:
             self.done = True
             print("No connection established. An error might have occurred.")
 
+    async def _wake_up_or_fail(self):
+        if not await self.wake_up():
+            raise asyncio.TimeoutError(f"No prompt on {self.host}:{self.port}")
+
+    async def _send_fixed(self, command: str):
+        """
+        Legacy pacing: send `command`, read until # and sleep 100 ms.
+        Raises if the console did not come back with a prompt.
+        """
+        response = await self.send_command(command)
+        if response is None:
+            raise ConnectionError(f"Connection to {self.host}:{self.port} lost")
+        if "#" not in response:
+            raise asyncio.TimeoutError(f"{self.host}:{self.port} did not answer '{command}'")
+        await asyncio.sleep(0.1)
+
+    async def _push_adaptive(self, commands: List[str], preamble: List[str], start: int):
+        # A window only counts as acked once its prompts are back: send_lines
+        # raises otherwise and the push stays incomplete in the journal
+        await self._wake_up_or_fail()
+        if preamble:
+            await self.send_lines([line.strip() for line in preamble])
+        for i in range(start, len(commands), self.window):
+            window = commands[i:i + self.window]
+            await self.send_lines([line.strip() for line in window])
+            self.acked = i + len(window)
+
+
+def config_commands_of(config: str) -> List[str]:
+    """
+    Lines of a configuration actually sent to the console, indentation kept:
+    blank lines and comments only bring the prompt back.
+    """
+    return [line.rstrip() for line in config.splitlines() if line.strip() and not line.strip().startswith("!")]
+
+
+def resume_plan(commands: List[str], acked: int) -> Tuple[List[str], int]:
+    """
+    Where to continue a push whose first `acked` commands were acknowledged.
+
+    Returns the preamble to replay (up to `conf t`, to get back to the root of
+    the configuration tree) and the index of the last top-level command at or
+    before `acked`: a section is always re-entered from its header. Commands
+    after the final `end` run in exec mode, so they restart from that `end`.
+    """
+    stripped = [line.strip() for line in commands]
+    conf = next((i + 1 for i, line in enumerate(stripped) if line in ("conf t", "configure terminal")), 0)
+    if acked <= conf:
+        return [], 0
+    restart = min(acked, len(commands))
+    ends = [i for i, line in enumerate(stripped) if line == "end" and i >= conf]
+    if ends and restart > ends[-1]:
+        restart = ends[-1]
+    while restart > conf and restart < len(commands) and commands[restart][:1].isspace():
+        restart -= 1
+    return commands[:conf], restart
+
+
+def config_hash(config: str) -> str:
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()
+
+
+def build_waves(devices: Dict[str, Any]) -> List[List[str]]:
+    """
+    Order the nodes of devices.json in push waves: backbone and route
+    reflectors first (IGP, LDP and MP-BGP core), then edges (VRFs), then clients.
+    """
+    waves: List[List[str]] = [[], [], []]
+    for name, dev in {**devices.get('provider', {}), **devices.get('clients', {})}.items():
+        if dev.get('role') == 'backbone' or dev.get('is_route_reflector'):
+            waves[0].append(name)
+        elif dev.get('role') == 'edge':
+            waves[1].append(name)
+        else:
+            waves[2].append(name)
+    return waves
+
 
 class SessionManager:
-    def __init__(self):
+    """
+    Drives every console session from a single asyncio event loop running in a
+    background thread, with at most `concurrency` sessions open at once.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 64,
+        pacing: str = "prompt",
+        window: int = 1,
+        delta: bool = False,
+        checkpoint: Optional[Path] = None,
+        resume: bool = False,
+        ready_timeout: Optional[float] = None
+    ):
         self.sessions = {}
         self.loading_states = "⣾⣽⣻⢿⡿⣟⣯⣷"
         self.loader_index = 0
-        self.threads = []
+        self.tasks = {}
+        self.scheduler = None
+        # Connections kept open to run show commands (verification)
+        self.shells: Dict[str, TelnetClient] = {}
         self.has_printed = 0
+        self.concurrency = concurrency
+        self.pacing = pacing
+        self.window = window
+        self.delta = delta
+        # When set, wait for each console to show a prompt before pushing
+        self.ready_timeout = ready_timeout
+        # Journal of the push progress: node -> {hash, acked, done}. It is
+        # always loaded to know which configurations reached the routers,
+        # partial pushes only continue with `resume`
+        self.checkpoint = Path(checkpoint) if checkpoint else None
+        self.resume = resume
+        self.journal: Dict[str, Dict[str, Any]] = {}
+        if self.checkpoint and self.checkpoint.exists():
+            with open(self.checkpoint, 'r') as f:
+                self.journal = json.load(f)
+        self._hashes: Dict[str, str] = {}
+        self._finished = 0
+        self._last_save = 0.0
+        self.loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._thread = Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
 
-    def push_configuration(self, name, host, port, config_commands):
-        client = TelnetClient(host, port)
+    async def _run(self, name, client, config_commands):
+        coro = client.push_configuration(config_commands, delta=self.delta)
+        try:
+            if self.ready_timeout is not None:
+                # Probing only holds an idle connection, not a push slot
+                client.probing = True
+                client.ready = await client.wait_ready(self.ready_timeout)
+                client.probing = False
+                if not client.ready:
+                    client.close()
+                    return
+            async with self._semaphore:
+                client.started = True
+                return await coro
+        finally:
+            coro.close()  # never awaited if cancelled while queued
+            client.done = True
+            self.save_checkpoint(name)
+
+    def _journal_entry(self, name, config_commands) -> Optional[Dict[str, Any]]:
+        entry = self.journal.get(name)
+        if entry and entry.get('hash') == config_hash(config_commands):
+            return entry
+        return None
+
+    def is_pushed(self, name, config_commands) -> bool:
+        """
+        Whether the checkpoint records this exact configuration as fully pushed.
+        """
+        entry = self._journal_entry(name, config_commands)
+        return bool(entry and entry.get('done'))
+
+    def _new_session(self, name, host, port, config_commands) -> TelnetClient:
+        entry = self._journal_entry(name, config_commands)
+        client = TelnetClient(
+            host, port, pacing=self.pacing, window=self.window,
+            resume_from=entry['acked'] if entry and self.resume else 0
+        )
         self.sessions[name] = client
-        thread = Thread(target=client.push_configuration, args=(config_commands,))
-        self.threads.append(thread)
-        thread.start()
+        self._hashes[name] = config_hash(config_commands)
+        return client
+
+    def save_checkpoint(self, name: Optional[str] = None, force: bool = False):
+        """
+        Record the progress of the finished session `name` in the journal.
+        The checkpoint file is rewritten at most every CHECKPOINT_INTERVAL
+        seconds, and once every session is finished or when `force` is set.
+        """
+        if not self.checkpoint:
+            return
+        if name is not None:
+            self._finished += 1
+            client = self.sessions[name]
+            if client.started:
+                self.journal[name] = {
+                    'hash': self._hashes[name],
+                    # Delta pushes count the delta commands, not the lines of
+                    # the config the hash refers to: they restart from scratch
+                    'acked': 0 if self.delta else client.acked,
+                    'done': client.completed,
+                }
+        now = self.loop.time()
+        if not force and self._finished < len(self.sessions) and now - self._last_save < CHECKPOINT_INTERVAL:
+            return
+        self._last_save = now
+        tmp = self.checkpoint.with_suffix(".tmp")
+        with open(tmp, 'w') as f:
+            json.dump(self.journal, f, indent=4)
+        os.replace(tmp, self.checkpoint)
+
+    def record_pushed(self, name, config_commands):
+        """
+        Journal a configuration delivered outside of the console sessions
+        (startup-config upload) as fully pushed.
+        """
+        self.journal[name] = {
+            'hash': config_hash(config_commands),
+            'acked': len(config_commands_of(config_commands)),
+            'done': True,
+        }
+
+    def push_configuration(self, name, host, port, config_commands):
+        client = self._new_session(name, host, port, config_commands)
+        self.tasks[name] = asyncio.run_coroutine_threadsafe(self._run(name, client, config_commands), self.loop)
+
+    async def _run_shell(self, name, host, port, commands) -> Optional[Dict[str, str]]:
+        client = self.shells.get(name)
+        if client is None:
+            client = self.shells[name] = TelnetClient(host, port, pacing=self.pacing)
+        async with self._semaphore:
+            try:
+                return await client.run_commands(commands)
+            except (OSError, asyncio.TimeoutError):
+                client.close()
+                del self.shells[name]
+                return None
+
+    def run_commands(self, jobs: Dict[str, Tuple[str, int, List[str]]]) -> Dict[str, Dict[str, str]]:
+        """
+        Run show commands on every node concurrently, jobs being name ->
+        (host, port, commands). Returns the outputs of the nodes whose
+        console answered, by command.
+        """
+        async def run_all():
+            results = await asyncio.gather(*(self._run_shell(name, *job) for name, job in jobs.items()))
+            return {name: result for name, result in zip(jobs, results) if result is not None}
+
+        return asyncio.run_coroutine_threadsafe(run_all(), self.loop).result()
+
+    async def _run_waves(self, waves, overlap):
+        tasks = []
+        try:
+            previous = []
+            for wave in waves:
+                # Start the wave once enough of the previous one has completed
+                needed = ceil(overlap * len(previous))
+                while sum(task.done() for task in previous) < needed:
+                    await asyncio.wait([t for t in previous if not t.done()], return_when=asyncio.FIRST_COMPLETED)
+                previous = [asyncio.create_task(self._run(*session)) for session in wave]
+                tasks += previous
+            await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    def push_waves(self, waves: List[List[Tuple[str, str, int, str]]], overlap: float = 1.0):
+        """
+        Push waves of (name, host, port, config) one after the other, each
+        wave being started once `overlap` (0 to 1) of the previous one has
+        completed. Sessions stay bounded by the concurrency limit.
+        """
+        waves = [
+            [(name, self._new_session(name, host, port, config), config) for name, host, port, config in wave]
+            for wave in waves if wave
+        ]
+        self.scheduler = asyncio.run_coroutine_threadsafe(
+            self._run_waves(waves, min(max(overlap, 0.0), 1.0)), self.loop
+        )
 
     def all_done(self):
         return all(session.done for session in self.sessions.values())
-    
-    def terminate_all(self):
-        """Forcefully terminate all sessions."""
+
+    async def _cancel_all(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        # Let the sessions unwind, so that their progress gets journaled
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Sessions of waves not started yet never reach their own save
+        self.save_checkpoint(force=True)
         for session in self.sessions.values():
             if session.connection:
-                session.connection.close()
+                session.close()
+
+    def terminate_all(self, timeout=5):
+        """Forcefully terminate all sessions."""
+        try:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self.loop).result(timeout)
+        except Exception:
+            pass
         self.sessions.clear()
-        self.threads.clear()
+        self.tasks.clear()
+        self.scheduler = None
 
     def status(self, flush=False):
         if flush and self.has_printed > 0:
@@ -105,14 +704,35 @@ class SessionManager:
             short_name = name.split(".")[0]  # Juste le nom court ou IP partielle
             if session.done:
                 done += 1
-                lines.append(f"{short_name:<8} \033[92m✓ pushed\033[0m")
-            else:
+                if session.ready is False:
+                    lines.append(f"{short_name:<8} \033[91m✗ not ready\033[0m")
+                elif session.unchanged:
+                    lines.append(f"{short_name:<8} \033[92m✓ up to date\033[0m")
+                elif not session.completed:
+                    lines.append(f"{short_name:<8} \033[91m✗ failed\033[0m")
+                else:
+                    lines.append(f"{short_name:<8} \033[92m✓ pushed\033[0m")
+            elif session.started:
                 lines.append(f"{short_name:<8} \033[94m{loading_state} pushing...\033[0m")
+            elif session.probing:
+                lines.append(f"{short_name:<8} \033[93m{loading_state} booting...\033[0m")
+            else:
+                lines.append(f"{short_name:<8} \033[90m… waiting\033[0m")
 
+        self.has_printed = len(lines) + 1
         lines = "\n".join(lines)
         print(f"{lines}\n{done}/{len(self.sessions)} nodes completed.")
-        self.has_printed = len(lines) + 2
 
     def wait_all(self):
-        for t in self.threads:
-            t.join()
+        for task in [*self.tasks.values(), *([self.scheduler] if self.scheduler else [])]:
+            try:
+                task.result()
+            except Exception:
+                pass
+
+    def close(self):
+        """Stop the event loop once every session is finished."""
+        for client in self.shells.values():
+            self.loop.call_soon_threadsafe(client.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
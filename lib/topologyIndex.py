@@ -0,0 +1,50 @@
+from typing import Dict, List, Tuple
+
+from lib.deviceModel import Interface, Link, Subnet, Topology
+
+
+class TopologyIndex:
+    """
+    Lookup tables over the device model, built once and shared by every
+    pipeline stage so that neighbor, subnet and link lookups are dict accesses.
+
+    The index keeps references to the model objects, so interfaces added or
+    updated in place by later stages (loopbacks, IPs) are seen through it.
+    """
+
+    def __init__(self, topology: Topology):
+        self.topology = topology
+
+        # (device id, neighbor id) -> interfaces of device facing neighbor
+        self.neighbor_interfaces: Dict[Tuple[int, int], List[Interface]] = {}
+        for device in topology:
+            for interface in device.interfaces:
+                for nbr in interface.neighbors:
+                    self.neighbor_interfaces.setdefault((device.id, nbr), []).append(interface)
+
+        # subnet_id -> link
+        self.links: Dict[int, Link] = {}
+        # subnet_id -> (interfaces of link.a, interfaces of link.b)
+        self.endpoints: Dict[int, Tuple[List[Interface], List[Interface]]] = {}
+
+    def interfaces_towards(self, device: int, neighbor: int) -> List[Interface]:
+        """
+        Interfaces of `device` connected to `neighbor`.
+        """
+        return self.neighbor_interfaces.get((device, neighbor), [])
+
+    def index_subnets(self, links: List[Link]) -> None:
+        """
+        Index the allocated links and the interfaces at both ends of each
+        link by subnet id.
+        """
+        for link in links:
+            if link.subnet is not None:
+                self.links[link.subnet.id] = link
+                self.endpoints[link.subnet.id] = (
+                    self.interfaces_towards(link.a, link.b),
+                    self.interfaces_towards(link.b, link.a),
+                )
+
+    def subnet(self, sid: int) -> Subnet:
+        return self.links[sid].subnet
@@ -4,10 +4,15 @@ import os
 import json
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from gns3fy import Project
 
+from lib.intentionStream import iter_intention
+from lib.intentionValidator import IntentionError, validate_intention
+from lib.pipelineProfiler import PipelineProfiler
+from lib.subnetAllocator import SubnetExhaustedError
 from tools.generate_config import generate_configs
 
 
@@ -17,10 +22,20 @@ os.chdir(PATH)
 
 from lib.fileDialog import FileDialog
 from lib.ui import ProjectSelector, MessageBox
-from lib.telnetClient import SessionManager
+from lib.telnetClient import SessionManager, build_waves
+from lib.gns3Client import Gns3Client
+from lib.iosConfig import startup_config
 from lib.argParser import parse_args
 
-from tools.files_management import CONFIG_DIR, CURRENT_DIR
+from tools.verification import verify_deployment, format_report
+from tools.files_management import CONFIG_DIR, CURRENT_DIR, PROFILE_FILE, push_checkpoint_file
+
+GNS3_URL = "http://localhost:3080"
+
+
+def print_intention_errors(error: IntentionError) -> None:
+    print(f"The intention file is invalid ({len(error.errors)} errors):")
+    print("\n".join(f"  {message}" for message in error.errors))
 
 
 if __name__ == "__main__":
@@ -59,26 +74,67 @@ if __name__ == "__main__":
         print(f"File {selected_file} does not exist. Exiting.")
         exit()
     
-    # Vérifier si le fichier est un fichier JSON*
-    try:
-        with open(selected_file, "r") as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error reading JSON file: {e}. Please check the file format.")
-        exit()
+    if args.stream:
+        # Lecture routeur par routeur, validée au fil de la génération
+        data = iter_intention(selected_file)
+    else:
+        # Vérifier si le fichier est un fichier JSON*
+        try:
+            with open(selected_file, "r") as f:
+                data = json.load(f)
+        except json.JSONDecodeError as e:
+            print(f"Error reading JSON file: {e}. Please check the file format.")
+            exit()
+
+        # Validation du fichier d'intention, avant toute génération
+        try:
+            validate_intention(data)
+        except IntentionError as e:
+            print_intention_errors(e)
+            exit()
 
-    # TODO: Validation du fichier d'intention
+    # Instrumentation des étapes de génération
+    profiler = None
+    if args.profile or args.cprofile:
+        profiler = PipelineProfiler(cprofile_dir=args.cprofile)
 
     # Générer les configurations à partir du fichier d'intention
     try:
-        config_files: dict[str, Path] = generate_configs(data)
+        unchanged: set[str] = set()
+        config_files: dict[str, Path] = generate_configs(
+            data,
+            incremental=args.incremental,
+            unchanged=unchanged,
+            reset_ipam=args.reset_ipam,
+            render_backend=args.render_backend,
+            render_workers=args.workers,
+            profiler=profiler
+        )
+    except json.JSONDecodeError as e:
+        print(f"Error reading JSON file: {e}. Please check the file format.")
+        exit()
+    except IntentionError as e:
+        print_intention_errors(e)
+        exit()
     except KeyError as e:
         print(f"An Error occured: KeyError: {e}. Please check the intention file.")
         print("A relation in the intention file might be missing or corrupted.")
         exit()
+    except SubnetExhaustedError as e:
+        print(f"An Error occured: {e}. Please check the IP ranges of the intention file.")
+        exit()
 
     print(f"Configurations saved to {CONFIG_DIR}.")
 
+    if profiler:
+        profiler.close()
+        report_file = PROFILE_FILE if args.profile in (None, True) else Path(args.profile)
+        profiler.save(report_file)
+        print(profiler.summary())
+        print(f"Profiling report saved to {report_file}.")
+    if args.incremental:
+        print(f"{len(config_files) - len(unchanged)} configurations updated, {len(unchanged)} unchanged.")
+
     # Open the file explorer to the config directory
     if args.opendir:
         os.startfile(str(CONFIG_DIR))
@@ -90,7 +146,7 @@ if __name__ == "__main__":
     if args.push:
         print("Pushing configurations to GNS3.")
 
-        selector = ProjectSelector(url="http://localhost:3080", user="admin", cred="admin")
+        selector = ProjectSelector(url=GNS3_URL, user="admin", cred="admin")
 
         if args.push is True:
             project: Project = selector.get_project()
@@ -98,45 +154,118 @@ if __name__ == "__main__":
             project: Project = selector.get_project(args.push)
         
         if project:
-            # Make sure the project is running
-            if not project.status == "running":
-                project.open()
-                print(f"Opened project \"{project.name}\".")
+            with Gns3Client(url=GNS3_URL, user="admin", cred="admin", pool_size=args.start_batch) as gns3:
+                # Make sure the project is opened
+                project_infos = gns3.project(project.project_id)
+                if project_infos['status'] != "opened":
+                    gns3.open_project(project.project_id)
+                    print(f"Opened project \"{project_infos['name']}\".")
 
-            # Make sure all nodes are up
-            project.start_nodes()
+                # Get all the nodes in the project
+                nodes = gns3.nodes(project.project_id)
 
-            # Get all the nodes in the project
-            nodes = project.nodes
-            
-            # Push the configurations using the SessionManager
-            session_manager = SessionManager()
-            print(f"Pushing configurations to {len(nodes)} nodes.")
-            #print("\n" * 10)
-            for node in nodes:
-                node_name = node.name
-                node_host = node.console_host
-                node_port = node.console
-                config_file = config_files.get(node_name)
-                if not config_file or not config_file.exists():
-                    print(f"Missing config for {node_name}")
-                    continue
-                if not node_host or not node_port:
-                    print(f"Missing host/port for {node_name}")
-                    continue
-                session_manager.push_configuration(node_name, node_host, node_port, config_file.read_text())
+                # The push journal tells which configurations already reached the routers
+                session_manager = SessionManager(
+                    concurrency=args.concurrency,
+                    pacing=args.pacing,
+                    window=args.window,
+                    delta=args.delta,
+                    checkpoint=push_checkpoint_file(project.project_id),
+                    resume=args.resume,
+                    ready_timeout=args.ready_timeout if args.ready_timeout > 0 else None
+                )
+                # An unchanged configuration is only skipped once journaled as pushed
+                delivered = {
+                    name for name in unchanged
+                    if config_files[name].exists() and session_manager.is_pushed(name, config_files[name].read_text())
+                }
+
+                # Upload the startup-configs and reload the nodes, the others fall back to the console
+                uploaded = set()
+                if args.delivery == "upload":
+                    targets = [
+                        node for node in nodes
+                        if node['name'] in config_files and node['name'] not in delivered and gns3.startup_config_path(node)
+                    ]
+                    configs = {node['name']: startup_config(config_files[node['name']].read_text()) for node in targets}
+                    print(f"Uploading {len(targets)} startup-configs.")
+                    errors = gns3.deploy_startup_configs(project.project_id, targets, configs, args.start_batch)
+                    for node_name, error in errors.items():
+                        print(f"Failed to upload {node_name}, falling back to the console: {error}")
+                    uploaded = set(configs) - set(errors)
+                    for node_name in uploaded:
+                        session_manager.record_pushed(node_name, config_files[node_name].read_text())
+                    session_manager.save_checkpoint(force=True)
+                    print(f"{len(uploaded)} nodes reloaded with their startup-config.")
+                    nodes = gns3.nodes(project.project_id)
+
+                # Start the nodes in the background, each push waits for its console prompt
+                starter = ThreadPoolExecutor(max_workers=1)
+                node_starts = starter.submit(gns3.start_nodes, project.project_id, nodes, args.start_batch)
+                starter.shutdown(wait=False)
             
-            while not session_manager.all_done():
-                try:
+                # Push the configurations using the SessionManager
+                print(f"Pushing configurations to {len(nodes) - len(uploaded)} nodes.")
+                #print("\n" * 10)
+                jobs = {}
+                for node in nodes:
+                    node_name = node['name']
+                    node_host, node_port = gns3.console_address(node)
+                    config_file = config_files.get(node_name)
+                    if not config_file or not config_file.exists():
+                        print(f"Missing config for {node_name}")
+                        continue
+                    if node_name in delivered:
+                        print(f"Skipping {node_name}: configuration unchanged")
+                        continue
+                    if node_name in uploaded:
+                        continue
+                    if not node_host or not node_port:
+                        print(f"Missing host/port for {node_name}")
+                        continue
+                    config = config_file.read_text()
+                    if args.resume and session_manager.is_pushed(node_name, config):
+                        print(f"Skipping {node_name}: already pushed")
+                        continue
+                    jobs[node_name] = (node_host, node_port, config)
+
+                if args.no_waves:
+                    for node_name, (node_host, node_port, config) in jobs.items():
+                        session_manager.push_configuration(node_name, node_host, node_port, config)
+                else:
+                    # Coeur (IGP, LDP, RR) d'abord, puis les PE, puis les CE
+                    with open(CONFIG_DIR / 'devices.json', 'r') as f:
+                        waves = build_waves(json.load(f))
+                    placed = {name for wave in waves for name in wave}
+                    waves.append([name for name in jobs if name not in placed])
+                    session_manager.push_waves(
+                        [[(name, *jobs[name]) for name in wave if name in jobs] for wave in waves],
+                        overlap=args.wave_overlap
+                    )
+
+                while not session_manager.all_done():
+                    try:
+                        session_manager.status(flush=True)
+                        time.sleep(0.1)
+                    except KeyboardInterrupt:
+                        session_manager.terminate_all()
+                        print("Terminating all sessions...")
+                        sys.exit(0)
+                else:
                     session_manager.status(flush=True)
-                    time.sleep(0.1)
-                except KeyboardInterrupt:
-                    session_manager.terminate_all()
-                    print("Terminating all sessions...")
-                    sys.exit(0)
-            else:
-                session_manager.status(flush=True)
-            print("All configurations pushed.")
+                for node_name, error in node_starts.result().items():
+                    print(f"Failed to start {node_name}: {error}")
+                print("All configurations pushed.")
+
+                # Check the adjacencies, sessions, VRF prefixes and CE pings on every node
+                if args.verify:
+                    print(f"Verifying the deployment (timeout {args.verify_timeout:.0f}s).")
+                    with open(CONFIG_DIR / 'devices.json', 'r') as f:
+                        devices = json.load(f)
+                    consoles = {node['name']: gns3.console_address(node) for node in nodes if node.get('console')}
+                    report = verify_deployment(session_manager, devices, consoles, timeout=args.verify_timeout)
+                    print(format_report(report))
+                session_manager.close()
         else:
             print("No project selected. Exiting.")
     
@@ -0,0 +1,74 @@
+from ipaddress import IPv4Network, collapse_addresses, ip_interface
+import random
+import unittest
+
+from lib.addressing import Prefix, collapse_prefixes, parse_mask, parse_prefix
+
+
+def reference(prefixes):
+    return [
+        Prefix(int(network.network_address), network.prefixlen)
+        for network in collapse_addresses(IPv4Network((prefix.network, prefix.length)) for prefix in prefixes)
+    ]
+
+
+class CollapsePrefixesTest(unittest.TestCase):
+
+    def test_examples(self):
+        cases = [
+            ["10.0.0.0/30", "10.0.0.4/30"],
+            ["10.0.0.0/25", "10.0.0.128/26", "10.0.0.192/26"],
+            ["10.0.0.4/30", "10.0.0.8/30"],
+            ["10.0.0.0/24", "10.0.0.64/26", "10.0.1.0/24"],
+            ["192.168.0.3/32", "192.168.0.2/32", "192.168.0.1/32", "192.168.0.0/32"],
+            ["10.0.0.5/30", "10.0.0.1/30"],
+            ["0.0.0.0/1", "128.0.0.0/1"],
+            [],
+        ]
+        for cidrs in cases:
+            with self.subTest(cidrs=cidrs):
+                prefixes = [parse_prefix(cidr) for cidr in cidrs]
+                self.assertEqual(collapse_prefixes(prefixes), reference(prefixes))
+
+    def test_random_prefixes(self):
+        rng = random.Random(1)
+        for _ in range(300):
+            # Links and loopbacks of a small range, so that many of them merge
+            prefixes = [
+                Prefix(0x0A000000 | rng.randrange(1 << 10), rng.choice((24, 26, 29, 30, 30, 30, 31, 32)))
+                for _ in range(rng.randrange(1, 60))
+            ]
+            with self.subTest(prefixes=[str(prefix) for prefix in prefixes]):
+                self.assertEqual(collapse_prefixes(prefixes), reference(prefixes))
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_parse_prefix(self):
+        for cidr in ("10.0.0.5/30", "0.0.0.0/0", "255.255.255.255/32", "172.16.4.1/24"):
+            with self.subTest(cidr=cidr):
+                interface = ip_interface(cidr)
+                self.assertEqual(
+                    parse_prefix(cidr),
+                    Prefix(int(interface.ip), interface.network.prefixlen),
+                )
+        self.assertEqual(parse_prefix("10.0.0.5/30").network, int(ip_interface("10.0.0.5/30").network.network_address))
+
+    def test_parse_prefix_rejects_invalid(self):
+        for cidr in ("10.0.0.0", "10.0.0.0/33", "10.0.0.0/-1", "10.0.0/24", "10.0.0.256/24", "10.0.0.0/ 24", "10.0.0.0/٣"):
+            with self.subTest(cidr=cidr), self.assertRaises(ValueError):
+                parse_prefix(cidr)
+
+    def test_parse_mask(self):
+        for length in range(33):
+            with self.subTest(length=length):
+                self.assertEqual(parse_mask(str(IPv4Network((0, length)).netmask)), length)
+
+    def test_parse_mask_rejects_non_contiguous(self):
+        for mask in ("255.0.255.0", "255.255.255.253", "0.255.255.255", "255.255.254.1", "255.255.255", "256.0.0.0"):
+            with self.subTest(mask=mask), self.assertRaises(ValueError):
+                parse_mask(mask)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from benchmarks.topology_generator import generate_intention
+from lib.intentionStream import iter_intention
+from lib.intentionValidator import IntentionError, IntentionValidator, validate_intention
+from tools.devices_management import collect_devices
+
+
+def base_intention():
+    # P1, P2, PE1, PE2, CE1 (client C1) on PE1 and CE2 (client C2) on PE2
+    return generate_intention(p_count=2, pe_count=2, ce_per_pe=1, client_count=2)
+
+
+def undefined_neighbor(intention):
+    intention['provider']['routers']['PE1']['interfaces']['GigabitEthernet9/0'] = "P9"
+
+
+def unbalanced_link(intention):
+    intention['provider']['routers']['PE1']['interfaces']['GigabitEthernet9/0'] = "P1"
+
+
+def self_link(intention):
+    intention['provider']['routers']['PE1']['interfaces']['GigabitEthernet9/0'] = "PE1"
+
+
+def shared_asn(intention):
+    clients = intention['clients']
+    clients['C2']['routers']['CE2']['BGP_asn'] = clients['C1']['routers']['CE1']['BGP_asn']
+
+
+def provider_asn(intention):
+    intention['clients']['C1']['routers']['CE1']['BGP_asn'] = intention['provider']['BGP_asn']
+
+
+def client_reflector(intention):
+    intention['provider']['route_reflectors'] = ["P1", "CE1"]
+
+
+def cluster_cycle(intention):
+    intention['provider']['route_reflectors'] = {'clusters': [
+        {'reflectors': "P1", 'cluster_id': 1, 'parent': 2},
+        {'reflectors': "P2", 'cluster_id': 2, 'parent': 1},
+    ]}
+
+
+def router_in_two_areas(intention):
+    intention['provider']['ospf'] = {'areas': {"1": ["PE1"], "2": ["PE1", "PE2"]}}
+
+
+# Mutation of the base intention -> the only error it must raise
+CASES = {
+    undefined_neighbor: "provider.routers.PE1: neighbor P9 is not defined",
+    unbalanced_link: "provider.routers.PE1: 1 more interface(s) towards P1 than from P1 back to PE1",
+    self_link: "provider.routers.PE1: interface connected to the router itself",
+    shared_asn: "clients: BGP_asn 64512 used by several clients (C1, C2)",
+    provider_asn: "clients.C1: BGP_asn 100 is the provider ASN",
+    client_reflector: "provider.route_reflectors: CE1 is not a provider router",
+    cluster_cycle: "provider.route_reflectors.clusters.0.parent: clusters form a cycle",
+    router_in_two_areas: "provider.ospf.areas.2: PE1 already in area 1",
+}
+
+
+def errors_of(intention):
+    try:
+        validate_intention(intention)
+    except IntentionError as e:
+        return e.errors
+    return []
+
+
+def streamed_errors_of(intention):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "intention.json"
+        path.write_text(json.dumps(intention))
+        try:
+            collect_devices(iter_intention(path, chunk_size=64), IntentionValidator())
+        except IntentionError as e:
+            return e.errors
+    return []
+
+
+class IntentionValidatorTest(unittest.TestCase):
+
+    def test_valid_intention(self):
+        self.assertEqual(errors_of(base_intention()), [])
+
+    def test_errors(self):
+        for mutate, error in CASES.items():
+            with self.subTest(mutate.__name__):
+                intention = base_intention()
+                mutate(intention)
+                errors = errors_of(intention)
+                # A cycle is reported from each of its clusters
+                self.assertEqual(errors[:1], [error])
+                self.assertTrue(all(other.endswith("clusters form a cycle") for other in errors[1:]), errors)
+
+    def test_invalid_fields(self):
+        intention = base_intention()
+        intention['provider']['loopback_range'] = "192.168.0.0/33"
+        intention['clients']['C1']['routers']['CE1']['BGP_advertized_networks'] = ["10.0.0.1/24"]
+        errors = errors_of(intention)
+        self.assertEqual(
+            [error.split(":")[0] for error in errors],
+            ["provider.loopback_range", "clients.C1.routers.CE1.BGP_advertized_networks.0"],
+        )
+
+    def test_streaming_reports_same_errors(self):
+        for mutate in [None, *CASES]:
+            with self.subTest(mutate.__name__ if mutate else "valid"):
+                intention = base_intention()
+                if mutate:
+                    mutate(intention)
+                self.assertEqual(sorted(streamed_errors_of(intention)), sorted(errors_of(intention)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+
+from lib.iosConfig import config_delta
+
+# show running-config of a freshly booted c7200, before any push
+STOCK_RUNNING = """Building configuration...
+
+Current configuration : 1042 bytes
+!
+version 15.2
+service timestamps debug datetime msec
+service timestamps log datetime msec
+!
+hostname R1
+!
+boot-start-marker
+boot-end-marker
+!
+no aaa new-model
+no ip icmp rate-limit unreachable
+ip cef
+!
+no ip domain lookup
+no ipv6 cef
+!
+interface FastEthernet0/0
+ no ip address
+ shutdown
+ duplex full
+!
+interface GigabitEthernet1/0
+ no ip address
+ shutdown
+ negotiation auto
+!
+interface GigabitEthernet2/0
+ no ip address
+ shutdown
+ negotiation auto
+!
+ip forward-protocol nd
+no ip http server
+no ip http secure-server
+!
+control-plane
+!
+line con 0
+ stopbits 1
+line aux 0
+ stopbits 1
+line vty 0 4
+ login
+!
+end
+"""
+
+INTENDED = """enable
+end
+conf t
+
+hostname PE1
+
+interface GigabitEthernet1/0
+ ip address 10.0.0.6 255.255.255.252
+ no shutdown
+ exit
+
+interface GigabitEthernet2/0
+ ip address 10.0.0.14 255.255.255.252
+ no shutdown
+ exit
+
+interface loopback0
+ ip address 192.168.0.3 255.255.255.255
+ no shutdown
+ exit
+
+router ospf 1
+ network 10.0.0.0 0.0.0.15 area 0
+ network 192.168.0.3 0.0.0.0 area 0
+ exit
+
+end
+write memory
+"""
+
+
+def interface_commands(delta, name):
+    start = delta.index(f"interface {name}")
+    end = delta.index(" exit", start)
+    return delta[start + 1:end]
+
+
+class ConfigDeltaTest(unittest.TestCase):
+
+    def test_stock_running_config(self):
+        delta = config_delta(STOCK_RUNNING, INTENDED)
+        for name, address in (("GigabitEthernet1/0", "10.0.0.6"), ("GigabitEthernet2/0", "10.0.0.14")):
+            commands = interface_commands(delta, name)
+            self.assertEqual(commands, [f" ip address {address} 255.255.255.252", " no shutdown"])
+        self.assertNotIn(" ip address", delta)
+        self.assertIn("hostname PE1", delta)
+        self.assertIn("router ospf 1", delta)
+        # Unmanaged defaults are left alone
+        self.assertFalse(any("ip http" in command or "FastEthernet0/0" in command for command in delta))
+
+    def test_applied_config_has_no_delta(self):
+        running = STOCK_RUNNING.replace("hostname R1", "hostname PE1")
+        for name, address in (("GigabitEthernet1/0", "10.0.0.6"), ("GigabitEthernet2/0", "10.0.0.14")):
+            running = running.replace(
+                f"interface {name}\n no ip address\n shutdown\n",
+                f"interface {name}\n ip address {address} 255.255.255.252\n",
+            )
+        running = running.replace(
+            "ip forward-protocol nd\n",
+            "interface loopback0\n ip address 192.168.0.3 255.255.255.255\n!\n"
+            "router ospf 1\n network 10.0.0.0 0.0.0.15 area 0\n network 192.168.0.3 0.0.0.0 area 0\n!\n"
+            "ip forward-protocol nd\n",
+        )
+        self.assertEqual(config_delta(running, INTENDED), [])
+
+    def test_negation_kept_when_intended(self):
+        running = "interface GigabitEthernet1/0\n no ip address\n shutdown\n"
+        intended = "interface GigabitEthernet1/0\n no ip address\n no shutdown\n exit\n"
+        self.assertEqual(
+            config_delta(running, intended),
+            ["interface GigabitEthernet1/0", " no shutdown", " exit"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
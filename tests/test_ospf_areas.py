@@ -0,0 +1,96 @@
+from ipaddress import IPv4Address, IPv4Network
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from benchmarks.topology_generator import generate_intention
+from tools.generate_config import generate_configs
+
+
+def generated_devices(p_count, pe_count, ospf):
+    """
+    Provider routers of devices.json for a synthetic intention.
+    """
+    intention = generate_intention(p_count=p_count, pe_count=pe_count, ce_per_pe=1, client_count=3)
+    intention['provider']['ospf'] = ospf
+    with tempfile.TemporaryDirectory() as out_dir:
+        generate_configs(intention, reset_ipam=True, render_backend="inline", config_dir=Path(out_dir))
+        return json.loads((Path(out_dir) / "devices.json").read_text())['provider']
+
+
+def interface_areas(dev):
+    """
+    Area of each interface running OSPF, from the network statements.
+    """
+    blocks = [
+        (IPv4Network((subnet['address'], 32 - bin(int(IPv4Address(subnet['wildcard_mask']))).count("1"))), subnet['area'])
+        for subnet in dev['ospf_subnets']
+    ]
+    areas = {}
+    for name, interface in dev['interfaces'].items():
+        if interface['type'] in ('backbone', 'loopback'):
+            matches = [area for block, area in blocks if IPv4Address(interface['ip_address']) in block]
+            assert len(matches) == 1, (dev['hostname'], name, matches)
+            areas[name] = matches[0]
+    return areas
+
+
+class OspfAreasTest(unittest.TestCase):
+
+    def check_areas(self, devices):
+        """
+        Check the area design and return the routers of each area.
+        """
+        areas = {name: interface_areas(dev) for name, dev in devices.items()}
+        members = {}
+        links = {}
+        for name, dev in devices.items():
+            members.setdefault(areas[name]['loopback0'], set()).add(name)
+            for if_name, area in areas[name].items():
+                for neighbor in dev['interfaces'][if_name]['neighbors']:
+                    links.setdefault(area, {}).setdefault(name, set()).add(neighbor)
+
+        for area, routers in members.items():
+            if area == 0:
+                continue
+            # Every area has an ABR in area 0
+            abrs = [name for name, by_interface in areas.items() if {0, area} <= set(by_interface.values())]
+            self.assertTrue(abrs, f"area {area} has no ABR")
+            # and its links join its routers and ABRs in a single piece
+            graph = links[area]
+            seen, todo = set(), [next(iter(routers))]
+            while todo:
+                node = todo.pop()
+                if node not in seen:
+                    seen.add(node)
+                    todo.extend(graph.get(node, ()))
+            self.assertTrue(routers <= seen, f"area {area} is split")
+            self.assertTrue(set(abrs) & seen, f"area {area} does not reach area 0")
+        return members
+
+    def test_auto_areas(self):
+        for p_count, pe_count, area_size in ((12, 40, 8), (24, 80, 10), (40, 200, 30)):
+            with self.subTest(p_count=p_count, pe_count=pe_count, area_size=area_size):
+                members = self.check_areas(generated_devices(p_count, pe_count, {'area_size': area_size}))
+                self.assertGreater(len(members), 1)
+                for area, routers in members.items():
+                    if area:
+                        self.assertLessEqual(len(routers), area_size, f"area {area}")
+
+    def test_small_backbone_stays_in_area_0(self):
+        members = self.check_areas(generated_devices(4, 6, {'area_size': 20}))
+        self.assertEqual(list(members), [0])
+
+    def test_explicit_areas(self):
+        members = self.check_areas(generated_devices(6, 12, {'areas': {"1": ["PE1", "PE2"], "2": ["PE5", "PE6"]}}))
+        self.assertEqual(members[1], {"PE1", "PE2"})
+        self.assertEqual(members[2], {"PE5", "PE6"})
+
+    def test_single_area(self):
+        members = self.check_areas(generated_devices(6, 12, None))
+        self.assertEqual(list(members), [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
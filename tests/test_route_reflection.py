@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from benchmarks.topology_generator import generate_intention
+from tools.generate_config import generate_configs
+
+
+def generated_devices(p_count, pe_count, route_reflectors):
+    """
+    Provider routers of devices.json for a synthetic intention.
+    """
+    intention = generate_intention(p_count=p_count, pe_count=pe_count, ce_per_pe=1, client_count=3)
+    intention['provider']['route_reflectors'] = route_reflectors
+    with tempfile.TemporaryDirectory() as out_dir:
+        generate_configs(intention, reset_ipam=True, render_backend="inline", config_dir=Path(out_dir))
+        return json.loads((Path(out_dir) / "devices.json").read_text())['provider']
+
+
+class RouteReflectionTest(unittest.TestCase):
+
+    def check_sessions(self, devices, fanout):
+        names = {dev['interfaces']['loopback0']['ip_address']: name for name, dev in devices.items()}
+        peers = {name: {names[ip]: conf['route_reflector_client'] for ip, conf in dev['iBGP_neighbors'].items()}
+                 for name, dev in devices.items()}
+        reflectors = {name for name, dev in devices.items() if dev['is_route_reflector']}
+        edges = [name for name, dev in devices.items() if dev['role'] == 'edge']
+
+        for name, sessions in peers.items():
+            if fanout is not None:
+                self.assertLessEqual(len(sessions), fanout, name)
+            for peer in sessions:
+                self.assertIn(name, peers[peer], f"{name} -> {peer} is one-way")
+                if sessions[peer]:
+                    self.assertIn(name, reflectors, f"{name} reflects to {peer}")
+        for pe in edges:
+            # A PE only talks to its reflectors, which all see it as a client
+            self.assertTrue(peers[pe], pe)
+            for rr in peers[pe]:
+                self.assertTrue(peers[rr][pe], f"{pe} is not a client of {rr}")
+
+        # Top level: reflectors that are nobody's clients, meshed across clusters
+        clients = {peer for sessions in peers.values() for peer, is_client in sessions.items() if is_client}
+        top = sorted(reflectors - clients)
+        self.assertTrue(top)
+        for a in top:
+            for b in top:
+                if a != b and devices[a]['cluster_id'] != devices[b]['cluster_id']:
+                    self.assertIn(b, peers[a], f"top-level reflectors {a} and {b} are not peered")
+        return top
+
+    def test_hierarchy(self):
+        devices = generated_devices(24, 80, {'fanout': 16, 'redundancy': 2})
+        top = self.check_sessions(devices, 16)
+        # PEs did not fit under a single level of clusters
+        self.assertLess(len(top), sum(dev['is_route_reflector'] for dev in devices.values()))
+        self.assertEqual(len({devices[rr]['cluster_id'] for rr in top}) * 2, len(top))
+
+    def test_single_level(self):
+        devices = generated_devices(12, 80, {})
+        self.check_sessions(devices, 64)
+        reflectors = [dev for dev in devices.values() if dev['is_route_reflector']]
+        self.assertEqual(len({dev['cluster_id'] for dev in reflectors}) * 2, len(reflectors))
+
+    def test_full_mesh_when_fanout_allows(self):
+        devices = generated_devices(4, 12, {'fanout': 16})
+        self.assertFalse(any(dev['is_route_reflector'] for dev in devices.values()))
+        edges = {name for name, dev in devices.items() if dev['role'] == 'edge'}
+        for name in edges:
+            self.assertEqual(len(devices[name]['iBGP_neighbors']), len(edges) - 1)
+
+    def test_explicit_clusters(self):
+        devices = generated_devices(8, 20, {'fanout': 16, 'clusters': [
+            {'reflectors': ["P1", "P2"], 'cluster_id': 10},
+            {'reflectors': ["P3"], 'cluster_id': 11, 'parent': 10, 'clients': ["PE1", "PE2"]},
+            {'reflectors': ["P5"], 'cluster_id': 12, 'parent': 10},
+        ]})
+        top = self.check_sessions(devices, 16)
+        self.assertEqual(top, ["P1", "P2"])
+        self.assertEqual({devices[rr]['cluster_id'] for rr in ("P1", "P2", "P3", "P5")}, {10, 11, 12})
+
+    def test_legacy_list(self):
+        devices = generated_devices(4, 12, ["P1", "P2"])
+        top = self.check_sessions(devices, None)
+        self.assertEqual(top, ["P1", "P2"])
+        self.assertIsNone(devices["P1"]['cluster_id'])
+
+
+if __name__ == "__main__":
+    unittest.main()
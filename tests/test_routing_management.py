@@ -0,0 +1,97 @@
+from ipaddress import IPv4Address, IPv4Interface, IPv4Network
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from benchmarks.topology_generator import generate_intention
+from tools.generate_config import generate_configs
+from tools.ospf_areas import link_area
+
+
+def generated_devices(p_count, pe_count, ospf):
+    """
+    Provider routers of devices.json for a synthetic intention.
+    """
+    intention = generate_intention(p_count=p_count, pe_count=pe_count, ce_per_pe=2, client_count=3)
+    intention['provider']['ospf'] = ospf
+    with tempfile.TemporaryDirectory() as out_dir:
+        generate_configs(intention, reset_ipam=True, render_backend="inline", config_dir=Path(out_dir))
+        return json.loads((Path(out_dir) / "devices.json").read_text())['provider']
+
+
+def statement_blocks(dev):
+    return [
+        (IPv4Network((subnet['address'], 32 - bin(int(IPv4Address(subnet['wildcard_mask']))).count("1"))), subnet['area'])
+        for subnet in dev['ospf_subnets']
+    ]
+
+
+class OspfStatementsTest(unittest.TestCase):
+
+    def check_statements(self, devices):
+        # Area of each router (its loopback) and of each backbone link
+        names = sorted(devices)
+        ids = {name: i for i, name in enumerate(names)}
+        areas = {}
+        for name, dev in devices.items():
+            loopback = IPv4Address(dev['interfaces']['loopback0']['ip_address'])
+            areas[ids[name]] = next(area for block, area in statement_blocks(dev) if loopback in block)
+        links = {}
+        for name, dev in devices.items():
+            for interface in dev['interfaces'].values():
+                if interface['type'] == 'backbone':
+                    subnet = IPv4Interface(f"{interface['ip_address']}/{interface['subnet_mask']}").network
+                    links[subnet] = link_area(areas, ids[name], ids[interface['neighbors'][0]])
+
+        for name, dev in devices.items():
+            blocks = statement_blocks(dev)
+            for block, area in blocks:
+                # A collapsed block never takes in a link of another area
+                for subnet, link in links.items():
+                    if subnet.subnet_of(block):
+                        self.assertEqual(link, area, f"{name}: {block} area {area} covers {subnet} of area {link}")
+            for if_name, interface in dev['interfaces'].items():
+                address = IPv4Address(interface['ip_address'])
+                matches = [area for block, area in blocks if address in block]
+                if interface['type'] == 'client':
+                    self.assertEqual(matches, [], f"{name} {if_name} runs OSPF towards a client")
+                elif interface['type'] == 'backbone':
+                    subnet = IPv4Interface(f"{address}/{interface['subnet_mask']}").network
+                    self.assertEqual(matches, [links[subnet]], f"{name} {if_name}")
+
+        # Summaries of the ABRs: only links of their area, at least two of them
+        for name, dev in devices.items():
+            for summary in dev['ospf_ranges']:
+                block = IPv4Network(f"{summary['address']}/{summary['mask']}")
+                covered = [subnet for subnet in links if subnet.subnet_of(block)]
+                self.assertGreater(len(covered), 1, f"{name}: range {block}")
+                for subnet in covered:
+                    self.assertEqual(links[subnet], summary['area'], f"{name}: range {block} covers {subnet}")
+        return links
+
+    def test_collapsed_statements(self):
+        for p_count, pe_count, area_size in ((12, 40, 8), (24, 80, 10), (40, 200, 30)):
+            with self.subTest(p_count=p_count, pe_count=pe_count, area_size=area_size):
+                links = self.check_statements(generated_devices(p_count, pe_count, {'area_size': area_size}))
+                self.assertGreater(len(set(links.values())), 1)
+
+    def test_statements_collapse(self):
+        devices = generated_devices(24, 80, {'area_size': 10})
+        statements = sum(len(dev['ospf_subnets']) for dev in devices.values())
+        interfaces = sum(
+            interface['type'] in ('backbone', 'loopback')
+            for dev in devices.values() for interface in dev['interfaces'].values()
+        )
+        self.assertLess(statements, interfaces)
+
+    def test_explicit_areas(self):
+        self.check_statements(generated_devices(6, 12, {'areas': {"1": ["PE1", "PE2"], "2": ["PE5", "PE6"]}}))
+
+    def test_single_area(self):
+        links = self.check_statements(generated_devices(6, 12, None))
+        self.assertEqual(set(links.values()), {0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+from ipaddress import IPv4Network
+import unittest
+
+from lib.subnetAllocator import SubnetAllocator, SubnetExhaustedError
+
+
+def free_blocks(allocator: SubnetAllocator) -> dict:
+    return {prefix: sorted(free) for prefix, free in allocator._free.items() if free}
+
+
+class AllocateManyTest(unittest.TestCase):
+
+    def assert_same_as_allocate(self, setup, prefix, count):
+        one_by_one, bulk = SubnetAllocator("10.0.0.0/16"), SubnetAllocator("10.0.0.0/16")
+        setup(one_by_one)
+        setup(bulk)
+        expected = [int(one_by_one.allocate(prefix).network_address) for _ in range(count)]
+        self.assertEqual(bulk.allocate_many(prefix, count), expected)
+        self.assertEqual(free_blocks(bulk), free_blocks(one_by_one))
+        self.assertEqual(bulk.reserved_subnets, one_by_one.reserved_subnets)
+        # The free lists keep handing out the same blocks afterwards
+        self.assertEqual(bulk.allocate(27), one_by_one.allocate(27))
+
+    def test_empty_allocator(self):
+        self.assert_same_as_allocate(lambda allocator: None, 30, 1000)
+
+    def test_fragmented_allocator(self):
+        def setup(allocator):
+            allocator.allocate(30)
+            allocator.allocate(24)
+            allocator.reserve("10.0.7.0/25")
+            allocator.allocate(29)
+            allocator.release("10.0.1.0/24")
+
+        for prefix, count in ((30, 1), (30, 77), (29, 300), (26, 10)):
+            with self.subTest(prefix=prefix, count=count):
+                self.assert_same_as_allocate(setup, prefix, count)
+
+    def test_whole_range(self):
+        allocator = SubnetAllocator("10.0.0.0/24")
+        self.assertEqual(len(allocator.allocate_many(30, 64)), 64)
+        self.assertEqual(free_blocks(allocator), {})
+        with self.assertRaises(SubnetExhaustedError):
+            allocator.allocate_many(30, 1)
+
+
+class ReserveReleaseTest(unittest.TestCase):
+
+    def test_release_merges_buddies(self):
+        allocator = SubnetAllocator("10.0.0.0/24")
+        allocator.reserve_block(int(IPv4Network("10.0.0.64/26").network_address), 26)
+        allocator.reserve("10.0.0.200/30")
+        self.assertEqual(allocator.allocate(26), IPv4Network("10.0.0.0/26"))
+        allocator.release("10.0.0.0/26")
+        allocator.release("10.0.0.200/30")
+        allocator.release("10.0.0.64/26")
+        self.assertEqual(free_blocks(allocator), {24: [int(IPv4Network("10.0.0.0/24").network_address)]})
+        self.assertEqual(allocator.allocate(24), IPv4Network("10.0.0.0/24"))
+
+    def test_release_unknown_subnet(self):
+        allocator = SubnetAllocator("10.0.0.0/24")
+        allocator.allocate(26)
+        with self.assertRaises(ValueError):
+            allocator.release("10.0.0.0/27")
+
+    def test_exhaustion(self):
+        allocator = SubnetAllocator("10.0.0.0/28")
+        allocator.allocate(29)
+        allocator.allocate(30)
+        with self.assertRaises(SubnetExhaustedError):
+            allocator.allocate(29)
+        with self.assertRaises(SubnetExhaustedError):
+            allocator.allocate(27)
+        self.assertEqual(allocator.allocate(30), IPv4Network("10.0.0.12/30"))
+        with self.assertRaises(SubnetExhaustedError):
+            allocator.allocate_hosts(2)
+
+    def test_overlapping_reserve(self):
+        allocator = SubnetAllocator("10.0.0.0/24")
+        allocator.reserve("10.0.0.0/26")
+        allocator.allocate(30)
+        for subnet in ("10.0.0.0/26", "10.0.0.32/27", "10.0.0.0/24", "10.0.0.64/30"):
+            with self.subTest(subnet=subnet), self.assertRaises(ValueError):
+                allocator.reserve(subnet)
+
+    def test_out_of_range_reserve(self):
+        allocator = SubnetAllocator("10.0.0.0/24")
+        for subnet in ("10.0.1.0/30", "192.168.0.0/24", "9.255.255.252/30"):
+            with self.subTest(subnet=subnet), self.assertRaises(ValueError):
+                allocator.reserve(subnet)
+        with self.assertRaises(ValueError):
+            allocator.reserve_block(int(IPv4Network("10.0.0.0/24").network_address) + 1, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
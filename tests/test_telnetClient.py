@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from lib.telnetClient import TelnetClient
+
+# show bgp vpnv4 unicast all on a PE, with a RIB-failure and a suppressed route
+BGP_TABLE = (
+    b"show bgp vpnv4 unicast all\r\n"
+    b"BGP table version is 9, local router ID is 192.168.0.3\r\n"
+    b"Status codes: s suppressed, d damped, h history, * valid, > best, i - internal,\r\n"
+    b"              r RIB-failure, S Stale, m multipath, b backup-path, f RT-Filter,\r\n"
+    b"\r\n"
+    b"     Network          Next Hop            Metric LocPrf Weight Path\r\n"
+    b"Route Distinguisher: 100:1 (default for vrf CLIENT_1_VRF)\r\n"
+    b"r>i10.0.0.0/24      192.168.0.4              0    100      0 65001 i\r\n"
+    b"s>  10.0.1.0/24      172.16.0.2               0             0 65001 i\r\n"
+    b" *>  10.0.2.0/24      172.16.0.2               0             0 65001 i\r\n"
+    b"PE1#"
+)
+
+
+class FakeWriter:
+    def __init__(self):
+        self.sent = bytearray()
+
+    def write(self, data):
+        self.sent += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def console(data: bytes) -> TelnetClient:
+    """
+    Client whose console has already sent `data`.
+    """
+    client = TelnetClient("127.0.0.1", timeout=0.1)
+    client.reader = asyncio.StreamReader()
+    client.reader.feed_data(data)
+    client.writer = FakeWriter()
+    return client
+
+
+class ReadPromptsTest(unittest.TestCase):
+
+    def test_bgp_table_is_not_a_prompt(self):
+        async def run():
+            client = console(BGP_TABLE)
+            client.learn_hostname(b"PE1")
+            return await client._read_prompts(1, 0.1, partial=False)
+
+        self.assertEqual(asyncio.run(run()), BGP_TABLE)
+
+    def test_wake_up_learns_hostname(self):
+        async def run():
+            client = console(b"\r\nPE1#")
+            await client.wake_up()
+            client.reader.feed_data(BGP_TABLE)
+            return client.hostnames, await client._read_prompts(1, 0.1, partial=False)
+
+        hostnames, output = asyncio.run(run())
+        self.assertEqual(hostnames, {b"PE1"})
+        self.assertEqual(output, BGP_TABLE)
+
+    def test_hostname_command_changes_prompt(self):
+        async def run():
+            client = console(b"\r\nRouter(config)#")
+            await client.wake_up()
+            client.reader.feed_data(b"hostname PE1\r\nPE1(config)#interface loopback0\r\nPE1(config-if)#")
+            await client.send_lines(["hostname PE1", "interface loopback0"])
+            return client.writer.sent
+
+        self.assertTrue(asyncio.run(run()).endswith(b"hostname PE1\r\ninterface loopback0\r\n"))
+
+    def test_missing_prompt_raises(self):
+        async def run():
+            client = console(b"\r\nPE1#")
+            await client.wake_up()
+            client.reader.feed_data(b"interface loopback0\r\nPE1(config-if)#")
+            await client.send_lines(["interface loopback0", " no shutdown"])
+
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from collections import deque
+from math import ceil
+from typing import Dict, List, Optional, Sequence, Set
+
+from lib.deviceModel import Topology
+
+# Distance des routeurs hors de la composante du backbone
+UNREACHABLE = 1 << 30
+
+
+def backbone_graph(topology: Topology) -> Dict[int, List[int]]:
+    """
+    Voisins provider de chaque routeur provider, par ses interfaces backbone.
+    """
+    graph: Dict[int, List[int]] = {device_id: [] for device_id in topology.provider_ids}
+    for device in topology.provider_devices:
+        for interface in device.interfaces:
+            if interface.type == 'backbone':
+                graph[device.id].extend(interface.neighbors)
+    return graph
+
+
+def distances(
+    graph: Dict[int, List[int]],
+    sources: Sequence[int],
+    parents: Optional[Dict[int, int]] = None
+) -> Dict[int, int]:
+    """
+    Nombre de sauts depuis les sources (parcours en largeur). Le
+    prédécesseur de chaque routeur est noté dans `parents` s'il est fourni.
+    """
+    dist = dict.fromkeys(sources, 0)
+    queue = deque(sources)
+    while queue:
+        node = queue.popleft()
+        hops = dist[node] + 1
+        for nbr in graph[node]:
+            if nbr not in dist:
+                dist[nbr] = hops
+                if parents is not None:
+                    parents[nbr] = node
+                queue.append(nbr)
+    return dist
+
+
+def center(graph: Dict[int, List[int]], members: List[int]) -> int:
+    """
+    Milieu du plus long chemin entre deux membres, trouvé par double balayage:
+    le membre le plus éloigné d'un membre quelconque est une extrémité.
+    """
+    dist = distances(graph, [members[0]])
+    start = max(members, key=lambda m: dist.get(m, -1))
+    parents: Dict[int, int] = {}
+    dist = distances(graph, [start], parents)
+    node = max(members, key=lambda m: dist.get(m, -1))
+    for _ in range(dist[node] // 2):
+        node = parents[node]
+    return node
+
+
+def assign_nearest(members: List[int], by_group: List[Dict[int, int]], capacities: List[int]) -> List[List[int]]:
+    """
+    Rattache chaque membre au groupe le plus proche qui a encore de la
+    place, les paires les plus proches d'abord. Quand tous les groupes sont
+    pleins, le membre rejoint le plus proche malgré tout.
+    """
+    groups: List[List[int]] = [[] for _ in by_group]
+    assigned: Set[int] = set()
+    pairs = sorted(
+        (dist.get(member, UNREACHABLE), g, position)
+        for g, dist in enumerate(by_group)
+        for position, member in enumerate(members)
+    )
+    for _, g, position in pairs:
+        if position not in assigned and len(groups[g]) < capacities[g]:
+            groups[g].append(position)
+            assigned.add(position)
+    for position, member in enumerate(members):
+        if position not in assigned:
+            g = min(range(len(by_group)), key=lambda g: by_group[g].get(member, UNREACHABLE))
+            groups[g].append(position)
+    # Ordre de l'intention dans chaque groupe
+    return [[members[position] for position in sorted(group)] for group in groups]
+
+
+def group_around_sites(graph: Dict[int, List[int]], members: List[int], count: int) -> List[List[int]]:
+    """
+    Répartit les membres en `count` groupes de proche en proche autour de
+    sites choisis les plus éloignés possible les uns des autres.
+    """
+    dist = distances(graph, [members[0]])
+    sites = [max(members, key=lambda m: dist.get(m, UNREACHABLE))]
+    by_site = [distances(graph, sites)]
+    nearest = dict(by_site[0])
+    while len(sites) < count:
+        site = max(members, key=lambda m: nearest.get(m, UNREACHABLE))
+        sites.append(site)
+        by_site.append(distances(graph, [site]))
+        for node, hops in by_site[-1].items():
+            if hops < nearest.get(node, UNREACHABLE):
+                nearest[node] = hops
+    size = ceil(len(members) / count)
+    return assign_nearest(members, by_site, [size] * count)
+
+
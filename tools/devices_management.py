@@ -1,119 +1,199 @@
-from typing import Dict, Any, List, Tuple, Union
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 
-from tools.network_managment import CIDR_to_network
+from lib.addressing import parse_address, parse_mask, parse_prefix
+from lib.deviceModel import Device, Interface, Topology
+from lib.intentionValidator import IntentionError, IntentionValidator
 
-def merge_and_tag_devices(
-    provider_devices: Dict[str, Any],
-    clients: Dict[str, Any],
+def _route_reflectors(route_reflector_list: Union[List[str], str, Dict[str, Any], None]) -> List[str]:
+    if isinstance(route_reflector_list, str):
+        return [route_reflector_list]
+    if isinstance(route_reflector_list, list):
+        return route_reflector_list
+    if isinstance(route_reflector_list, dict):
+        # Réflecteurs des clusters explicites, les autres sont placés au routage
+        return [
+            rr
+            for cluster in route_reflector_list.get('clusters', [])
+            for rr in _route_reflectors(cluster.get('reflectors'))
+        ]
+    return []
+
+
+def parse_interface(if_name: str, conf: Any, topology: Topology) -> Interface:
+    """
+    Interface du modèle à partir de sa forme dans l'intention: nom du
+    voisin, liste de voisins ou dict (neighbors, subnet_id, ip_address,
+    subnet_mask).
+    """
+    if isinstance(conf, dict):
+        # conserve champs existants
+        neighbors = conf.get('neighbors', [])
+        address, mask = conf.get('ip_address'), conf.get('subnet_mask')
+        return Interface(
+            if_name,
+            tuple(topology.id_of(nbr) for nbr in (neighbors if isinstance(neighbors, list) else [neighbors])),
+            subnet_id=conf.get('subnet_id'),
+            address=parse_address(address) if address else None,
+            prefixlen=parse_mask(mask) if mask else None
+        )
+    # chaine ou liste
+    nbrs = conf if isinstance(conf, list) else [conf]
+    return Interface(if_name, tuple(topology.id_of(nbr) for nbr in nbrs))
+
+
+def normalize_device_interfaces(details: Dict[str, Any], topology: Topology) -> List[Interface]:
+    """
+    Interfaces du modèle d'un routeur de l'intention, les interfaces non
+    gérées ('unmanaged_interfaces' des clients) comprises.
+    """
+    interfaces = {
+        if_name: parse_interface(if_name, conf, topology)
+        for if_name, conf in details.get('interfaces', {}).items()
+    }
+    for if_name, cidr in details.get('unmanaged_interfaces', {}).items():
+        prefix = parse_prefix(cidr)
+        interfaces[if_name] = Interface(if_name, subnet_id=-1, address=prefix.address, prefixlen=prefix.length)
+    return list(interfaces.values())
+
+
+def add_provider_device(topology: Topology, router: str, details: Dict[str, Any]) -> Device:
+    """
+    Ajoute un routeur provider au modèle. Son rôle définitif (edge ou
+    backbone) est donné par tag_provider_devices, une fois tous ses voisins connus.
+    """
+    device = topology.add(router, role='backbone')
+    device.interfaces = normalize_device_interfaces(details, topology)
+    return device
+
+
+def add_client_device(topology: Topology, client_name: str, router: str, details: Dict[str, Any]) -> Device:
+    """
+    Ajoute un routeur client au modèle: rôle, hostname, client et réseaux annoncés.
+    """
+    device = topology.add(router, role='client', BGP_asn=details.get('BGP_asn'), client=client_name)
+    device.interfaces = normalize_device_interfaces(details, topology)
+    device.advertised_networks = [parse_prefix(cidr) for cidr in details.get('BGP_advertized_networks', [])]
+    return device
+
+
+def tag_provider_devices(
+    topology: Topology,
     provider_asn: int,
-    route_reflector_list: Union[List[str], str, None]
-) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    route_reflector_list: Union[List[str], str, Dict[str, Any], None]
+) -> None:
     """
-    Sépare et tague les devices :
-        - role: 'backbone' | 'edge' | 'client'
+    Tague les devices du provider:
+        - role: 'edge' si un voisin n'est pas un routeur provider, 'backbone' sinon
         - is_route_reflector: True si dans la liste
-        - hostname, BGP_asn
+        - BGP_asn
     """
-    # 1. On normalise la liste des RRs
-    if isinstance(route_reflector_list, str):
-        rr_list = [route_reflector_list]
-    elif isinstance(route_reflector_list, list):
-        rr_list = route_reflector_list
-    else:
-        rr_list = []
-
-    # 2. Tag des provider
-    for name, details in provider_devices.items():
-        # rôle edge/backbone
+    rr_list = _route_reflectors(route_reflector_list)
+    topology.provider_asn = provider_asn
+    for device in topology.provider_devices:
         is_edge = any(
-            nbr not in provider_devices
-            for iface in details.get('interfaces', {}).values()
-            for nbr in (iface if isinstance(iface, list) else [iface])
+            not topology.is_provider(nbr)
+            for interface in device.interfaces
+            for nbr in interface.neighbors
         )
-        details['role']                = 'edge' if is_edge else 'backbone'
-        details['hostname']            = name
-        details['BGP_asn']             = provider_asn
-        details['is_route_reflector'] = name in rr_list
+        device.role               = 'edge' if is_edge else 'backbone'
+        device.BGP_asn            = provider_asn
+        device.is_route_reflector = device.name in rr_list
+
+
+def build_topology(provider: Dict[str, Any], clients: Dict[str, Any]) -> Topology:
+    """
+    Convertit l'intention chargée en modèle et tague les devices
+    (role 'backbone' | 'edge' | 'client', route reflectors, BGP_asn).
+    """
+    topology = Topology()
+    for name, details in provider['routers'].items():
+        add_provider_device(topology, name, details)
 
-    # 3. Extraction et tag des clients
-    client_routers: Dict[str, Any] = {}
     for client_name, c_data in clients.items():
         if client_name == 'global':
             continue
         for router, r_details in c_data.get('routers', {}).items():
-            r_details['role']     = 'client'
-            r_details['hostname'] = router
-            r_details['client']   = client_name
-            client_routers[router] = r_details
-
-    return provider_devices, client_routers
-
-def normalize_interfaces(devices: Dict[str, Any]) -> None:
-    """
-    Unifie tous les formats d'interface en dict avec clefs:
-    neighbors (list[str]), subnet_id, ip_address, subnet_mask
-    Modifie in-place.
-    """
-    for dev_name, dev in devices.items():
-        new_if = {}
-        for if_name, conf in dev.get('interfaces', {}).items():
-            if isinstance(conf, dict):
-                # conserve champs existants
-                neighbors = conf.get('neighbors', [])
-                new_if[if_name] = {
-                    'neighbors': neighbors if isinstance(neighbors, list) else [neighbors],
-                    'subnet_id': conf.get('subnet_id'),
-                    'ip_address': conf.get('ip_address'),
-                    'subnet_mask': conf.get('subnet_mask')
-                }
-            else:
-                # chaine ou liste
-                nbrs = conf if isinstance(conf, list) else [conf]
-                new_if[if_name] = {
-                    'neighbors': nbrs,
-                    'subnet_id': None,
-                    'ip_address': None,
-                    'subnet_mask': None
-                }
-        dev['interfaces'] = new_if
-
-        if dev["role"] == "client":
-            for iface_name, network in dev.get('unmanaged_interfaces', {}).items():
-                network = CIDR_to_network(network)
-                dev['interfaces'][iface_name] = {
-                    'neighbors': [],
-                    'subnet_id': -1,
-                    'ip_address': network['address'],
-                    'subnet_mask': network['mask']
-                }
-
-
-def tag_interface_types(
-    provider_devices: Dict[str, Any],
-    client_devices: Dict[str, Any]
-) -> None:
+            add_client_device(topology, client_name, router, r_details)
+
+    tag_provider_devices(topology, provider['BGP_asn'], provider.get('route_reflectors'))
+    return topology
+
+
+def _accepted(validator: IntentionValidator, add, *args) -> bool:
+    # Un routeur invalide n'est pas normalisé, l'erreur sera remontée par le validator
+    errors = len(validator.errors)
+    add(*args)
+    return len(validator.errors) == errors
+
+
+def collect_devices(
+    events: Iterable[Tuple[Any, ...]],
+    validator: Optional[IntentionValidator] = None
+) -> Tuple[Dict[str, Any], Topology, Dict[str, Any]]:
     """
-    Ajoute champ 'type' à chaque interface après normalisation.
+    Construit le modèle à partir d'un flux d'évènements d'intention
+    (lib.intentionStream.iter_intention), sans jamais charger l'intention
+    entière: chaque routeur est converti dès sa lecture, les provider tagués
+    une fois tous connus (le rôle edge dépend des voisins). Les évènements
+    sont aussi passés au `validator` s'il est fourni.
+
+    Retourne (paramètres provider, modèle, paramètres 'global' des clients).
     """
-    all_provs = set(provider_devices)
-    for dev, details in provider_devices.items():
-        for if_name, if_conf in details['interfaces'].items():
-            if if_name == 'loopback0':
-                if_conf['type'] = 'loopback'
-            else:
-                zone = 'backbone' if all(n in all_provs for n in if_conf['neighbors']) else 'client'
-                if_conf['type'] = zone
-                # Si c'est un lien vers un client, récupérer le nom du client
-                if zone == 'client':
-                    for c_dev, c_details in client_devices.items():
-                        if c_dev in if_conf['neighbors']:
-                            if_conf['client'] = c_details['client']
-                            break
-
-    for dev, details in client_devices.items():
-        for if_name, if_conf in details['interfaces'].items():
-            if if_name == 'loopback0':
-                if_conf['type'] = 'loopback'
+    provider: Dict[str, Any] = {}
+    global_settings: Dict[str, Any] = {}
+    topology = Topology()
+
+    for event in events:
+        kind = event[0]
+        if kind == 'provider':
+            provider[event[1]] = event[2]
+        elif kind == 'provider_router':
+            _, name, details = event
+            if validator and not _accepted(validator, validator.add_provider_router, name, details):
+                continue
+            add_provider_device(topology, name, details)
+        elif kind == 'global':
+            global_settings = event[1]
+            if validator:
+                validator.add_global(global_settings)
+        elif kind == 'client_router':
+            _, client_name, router, details = event
+            if validator and not _accepted(validator, validator.add_client_router, client_name, router, details):
+                continue
+            add_client_device(topology, client_name, router, details)
+
+    if validator:
+        validator.add_provider(provider)
+        errors = validator.finish()
+        if errors:
+            raise IntentionError(errors)
+
+    tag_provider_devices(topology, provider['BGP_asn'], provider.get('route_reflectors'))
+    return provider, topology, global_settings
+
+
+def tag_interface_types(topology: Topology) -> None:
+    """
+    Renseigne le type de chaque interface après normalisation.
+    """
+    for device in topology.provider_devices:
+        for interface in device.interfaces:
+            if interface.name == 'loopback0':
+                interface.type = 'loopback'
+                continue
+            zone = 'backbone' if all(topology.is_provider(n) for n in interface.neighbors) else 'client'
+            interface.type = zone
+            # Si c'est un lien vers un client, récupérer le nom du client
+            if zone == 'client':
+                for nbr in interface.neighbors:
+                    if topology.is_client(nbr):
+                        interface.client = topology.devices[nbr].client
+                        break
+
+    for device in topology.client_devices:
+        for interface in device.interfaces:
+            if interface.name == 'loopback0':
+                interface.type = 'loopback'
             else:
                 # On suppose que les clients n'ont que des liens vers le provider
-                if_conf['type'] = 'provider'
+                interface.type = 'provider'
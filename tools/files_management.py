@@ -1,15 +1,47 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from hashlib import sha256
+from ipaddress import IPv4Address, IPv4Interface, IPv4Network
 import json
+import os
 from pathlib import Path
-from typing import Dict, Any
+from traceback import format_exc
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
 
 from jinja2 import Environment, FileSystemLoader
 
+from lib.deviceModel import Topology
+
 
 PATH = Path(__file__).parent.parent.resolve()
 CONFIG_DIR = PATH / "data" / "configs"
+HASHES_FILE = CONFIG_DIR / "hashes.json"
+IPAM_STATE_FILE = CONFIG_DIR / "ipam_state.json"
+PROFILE_FILE = CONFIG_DIR / "profile.json"
 TEMPLATES_DIR = PATH / "templates"
 CURRENT_DIR = Path.cwd()
-ENV = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), keep_trailing_newline=True) # Charger le répertoire des templates
+RENDER_BACKENDS = ("thread", "process", "inline")
+
+def finalize(value: Any) -> Any:
+    """
+    Convertit à l'affichage les objets adresse du modèle en chaînes, ce qui
+    permet de rendre les templates directement sur les dicts en mémoire.
+    """
+    if isinstance(value, (IPv4Address, IPv4Network, IPv4Interface)):
+        return str(value)
+    return value
+
+def make_environment() -> Environment:
+    # Charger le répertoire des templates
+    return Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), keep_trailing_newline=True, finalize=finalize)
+
+ENV = make_environment()
+
+def push_checkpoint_file(project_id: str) -> Path:
+    """
+    Journal du push d'un projet GNS3: les routeurs d'un autre projet n'ont
+    rien reçu, même si leur configuration n'a pas changé.
+    """
+    return CONFIG_DIR / f"push_checkpoint_{project_id}.json"
 
 def load_intention(path: Path) -> Dict[str, Any]:
     """
@@ -18,7 +50,12 @@ def load_intention(path: Path) -> Dict[str, Any]:
     with open(path, 'r') as f:
         return json.load(f)
 
-def render_and_write(device: str, details: Dict[str, Any], templates: Dict[str, str]) -> Path:
+def render_and_write(
+    device: str,
+    details: Dict[str, Any],
+    templates: Dict[str, str],
+    config_dir: Path = CONFIG_DIR
+) -> Path:
     """
     Rend et écrit la configuration pour un device donné selon son rôle.
     Retourne le chemin du fichier généré.
@@ -29,12 +66,144 @@ def render_and_write(device: str, details: Dict[str, Any], templates: Dict[str,
     if not tmpl:
         raise ValueError(f"No template found for role '{details['role']}' in device '{device}'.")
 
-    # Passage en json-serializable
-    to_render = json.loads(json.dumps(details, default=str))
-    config_text = tmpl.render(to_render)
+    # Rendu direct sur le modèle, les adresses sont converties par finalize()
+    config_text = tmpl.render(details)
 
     # Ecriture fichier
-    path = CONFIG_DIR / f"{device}.cfg"
+    path = config_dir / f"{device}.cfg"
     with open(path, 'w') as f:
         f.write(config_text)
     return path
+
+def init_render_worker(templates: Dict[str, str]) -> None:
+    """
+    Initialise l'environnement Jinja dans un worker et précompile les templates,
+    pour ne pas avoir à les transmettre ni à les recompiler à chaque device.
+    """
+    global ENV
+    ENV = make_environment()
+    for template in set(templates.values()):
+        ENV.get_template(template)
+
+def render_chunk(
+    chunk: Iterable[Tuple[str, Dict[str, Any]]],
+    templates: Dict[str, str],
+    config_dir: Path = CONFIG_DIR
+) -> List[Tuple[str, Optional[Path], Optional[str]]]:
+    """
+    Rend un lot de devices. Retourne (device, chemin, erreur) pour chacun,
+    une erreur n'interrompant pas le rendu du reste du lot.
+    """
+    results = []
+    for device, details in chunk:
+        try:
+            results.append((device, render_and_write(device, details, templates, config_dir), None))
+        except Exception as e:
+            results.append((device, None, f"{e}\n{format_exc()}"))
+    return results
+
+def render_all(
+    devices: Mapping[str, Dict[str, Any]],
+    templates: Dict[str, str],
+    backend: str = "thread",
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    config_dir: Path = CONFIG_DIR
+) -> Dict[str, Path]:
+    """
+    Rend et écrit les configurations de tous les devices.
+    - backend 'thread': pool de threads (I/O), 'process': pool de processus
+      (rendu Jinja en parallèle sur tous les coeurs), 'inline': sans pool.
+    - workers: nombre de workers, par défaut le nombre de CPU.
+    - chunk_size: devices par tâche, pour amortir le coût de transfert.
+    """
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend '{backend}', expected one of {RENDER_BACKENDS}")
+
+    names = list(devices)
+    workers = workers or os.cpu_count() or 1
+    if not chunk_size:
+        # Environ 4 lots par worker pour équilibrer la charge
+        chunk_size = max(1, -(-len(names) // (workers * 4)))
+    chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+
+    def items(chunk: List[str]) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        # Les contextes d'un mapping paresseux (DeviceContexts) ne sont
+        # construits qu'au moment du rendu de leur device
+        return ((name, devices[name]) for name in chunk)
+
+    if backend == "inline" or not names:
+        results = [result for chunk in chunks for result in render_chunk(items(chunk), templates, config_dir)]
+    else:
+        executor: Executor
+        if backend == "process":
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=init_render_worker, initargs=(templates,))
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+        with executor:
+            futures = [
+                # Un lot envoyé à un processus doit être sérialisable
+                executor.submit(render_chunk, list(items(chunk)) if backend == "process" else items(chunk), templates, config_dir)
+                for chunk in chunks
+            ]
+            results = [result for future in as_completed(futures) for result in future.result()]
+
+    config_files: Dict[str, Path] = {}
+    for device, path, error in results:
+        if error:
+            print(f"Error generating config for {device}: {error}")
+        else:
+            config_files[device] = path
+    return config_files
+
+
+def _write_object(f, members: Iterable[Tuple[str, Any]], level: int) -> None:
+    """
+    Écrit un objet JSON membre par membre, indenté comme json.dump(indent=4)
+    à la profondeur `level`.
+    """
+    pad = "    " * (level + 1)
+    first = True
+    for key, value in members:
+        f.write("{\n" if first else ",\n")
+        f.write(f"{pad}{json.dumps(key)}: " + json.dumps(value, indent=4, default=str).replace("\n", "\n" + pad))
+        first = False
+    f.write("{}" if first else "\n" + "    " * level + "}")
+
+def export_devices(topology: Topology, path: Path) -> None:
+    """
+    Écrit devices.json à partir du modèle, device par device: chaque device
+    est exporté puis sérialisé seul, sans construire les dicts de toute la
+    topologie. Le contenu est celui de json.dump(indent=4) sur
+    {'provider': ..., 'clients': ..., 'subnets': ...}.
+    """
+    with open(path, 'w') as f:
+        f.write("{\n")
+        for section, devices in (('provider', topology.provider_devices), ('clients', topology.client_devices)):
+            f.write(f'    "{section}": ')
+            _write_object(f, ((device.name, topology.export(device)) for device in devices), 1)
+            f.write(",\n")
+        f.write('    "subnets": ' + json.dumps(topology.export_links(), indent=4).replace("\n", "\n    ") + "\n}")
+
+
+def load_hashes(path: Path = HASHES_FILE) -> Dict[str, str]:
+    """
+    Charge les empreintes des configurations générées lors du dernier rendu.
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_hashes(hashes: Dict[str, str], path: Path = HASHES_FILE) -> None:
+    with open(path, 'w') as f:
+        json.dump(hashes, f, indent=4, sort_keys=True)
+
+def device_hash(details: Dict[str, Any], template: str) -> str:
+    """
+    Empreinte des entrées du rendu d'un device: son contexte et la source du template.
+    """
+    digest = sha256(json.dumps(details, sort_keys=True, default=str).encode())
+    digest.update(ENV.loader.get_source(ENV, template)[0].encode())
+    return digest.hexdigest()
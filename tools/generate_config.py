@@ -1,74 +1,119 @@
 
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import json
 from pathlib import Path
 from pprint import pprint
-from traceback import format_exc
-from typing import Any, Dict
-
-from tools.devices_management import merge_and_tag_devices, normalize_interfaces, tag_interface_types
-from tools.files_management import CONFIG_DIR, render_and_write
+from typing import Any, Dict, Iterable, Optional, Set, Union
+
+from lib.intentionStream import IntentionEvent
+from lib.intentionValidator import IntentionValidator
+from lib.ipamState import IpamState
+from lib.pipelineProfiler import PipelineProfiler
+from lib.topologyIndex import TopologyIndex
+from tools.devices_management import build_topology, collect_devices, tag_interface_types
+from tools.files_management import CONFIG_DIR, HASHES_FILE, IPAM_STATE_FILE, device_hash, export_devices, load_hashes, render_all, save_hashes
 from tools.network_managment import add_loopback_interfaces, allocate_link_subnets, assign_ips_on_subnets, build_l2_links, format_client_BGP_networks
+from tools.ospf_areas import plan_ospf_areas
 from tools.routing_management import collect_routing_info
 
 
-def generate_configs(intention: Dict[str, Dict[str, Any]]) -> Path:
-    provider_int = intention['provider']
-    clients_int = intention['clients']
-
-    # 1. Tag les types de routeurs (backbone, edge, client)
-    prov_devs, cli_devs = merge_and_tag_devices(
-        provider_int['routers'],
-        clients_int,
-        provider_int['BGP_asn'],
-        provider_int.get('route_reflectors')
-    )
+def generate_configs(
+    intention: Union[Dict[str, Dict[str, Any]], Iterable[IntentionEvent]],
+    incremental: bool = False,
+    unchanged: Optional[Set[str]] = None,
+    reset_ipam: bool = False,
+    render_backend: str = "thread",
+    render_workers: Optional[int] = None,
+    profiler: Optional[PipelineProfiler] = None,
+    config_dir: Path = CONFIG_DIR
+) -> Dict[str, Path]:
+    """
+    Génère les configurations de tous les devices de l'intention.
+    L'intention est soit le dictionnaire chargé du fichier, soit le flux
+    d'évènements de lib.intentionStream.iter_intention: les routeurs sont
+    alors tagués, normalisés et validés au fil de la lecture.
+    En mode incrémental, les devices dont le contexte de rendu et le template
+    n'ont pas changé depuis le dernier rendu ne sont pas réécrits et sont
+    ajoutés à `unchanged`.
+    Les adresses allouées sont conservées d'un lancement à l'autre dans
+    l'état IPAM, sauf si `reset_ipam` est demandé.
+    Le rendu est fait par `render_backend` ('thread', 'process' ou 'inline')
+    avec `render_workers` workers (par défaut le nombre de CPU).
+    Chaque étape est mesurée par `profiler` s'il est fourni.
+    Les fichiers sont écrits dans `config_dir`.
+    """
+    if unchanged is None:
+        unchanged = set()
+    if profiler is None:
+        profiler = PipelineProfiler(enabled=False)
 
-    # 2. Normalisation des interfaces
-    normalize_interfaces(prov_devs)
-    normalize_interfaces(cli_devs)
+    # Creation du répertoire de configuration s'il n'existe pas
+    config_dir.mkdir(parents=True, exist_ok=True)
+    hashes_file = config_dir / HASHES_FILE.name
+    ipam_state_file = config_dir / IPAM_STATE_FILE.name
+
+    # État IPAM des lancements précédents
+    ipam_state = IpamState() if reset_ipam else IpamState.load(ipam_state_file)
+
+    streaming = not isinstance(intention, dict)
+    if streaming:
+        # 1. Lecture, validation, conversion et tag au fil du flux
+        with profiler.stage("1. Tagging"):
+            provider_int, topology, global_int = collect_devices(intention, IntentionValidator())
+            clients_int = {'global': global_int}
+    else:
+        provider_int = intention['provider']
+        clients_int = intention['clients']
+
+        # 1. Conversion vers le modèle et tag des types de routeurs (backbone, edge, client)
+        with profiler.stage("1. Tagging"):
+            topology = build_topology(provider_int, clients_int)
+
+    # 2. Index de la topologie partagé par toutes les étapes suivantes
+    # (les interfaces sont normalisées lors de la conversion)
+    with profiler.stage("2. Normalisation"):
+        index = TopologyIndex(topology)
 
     # 3. Loopbacks sur les PE
-    add_loopback_interfaces(prov_devs, provider_int['loopback_range'])
+    with profiler.stage("3. Loopbacks"):
+        add_loopback_interfaces(topology, provider_int['loopback_range'], ipam_state)
 
     # 4. Tagger les types de liens (client: client <-> provider, provider: provider <-> provider)
-    tag_interface_types(prov_devs, cli_devs)
+    with profiler.stage("4. Interface types"):
+        tag_interface_types(topology)
 
     # 5. L2 links
-    l2_links = build_l2_links(prov_devs, cli_devs)
-
-    # 6. IPAM: allocation et assignation
-    ipam_ranges = {
-        'provider': provider_int['ip_range'],
-        'client': clients_int['global']['ip_range']
-    }
-    subnets_info = allocate_link_subnets(l2_links, ipam_ranges)
-    # fusion devices for assign
-    all_devs = {**prov_devs, **cli_devs}
-    assign_ips_on_subnets(all_devs, subnets_info)
+    with profiler.stage("5. L2 links"):
+        l2_links = build_l2_links(topology)
+
+    # 6. IPAM: allocation et assignation, les liens de chaque aire OSPF
+    # dans un même bloc pour pouvoir les résumer
+    with profiler.stage("6. IPAM"):
+        areas = plan_ospf_areas(topology, provider_int.get('ospf'))
+        ipam_ranges = {
+            'provider': provider_int['ip_range'],
+            'client': clients_int['global']['ip_range']
+        }
+        links = allocate_link_subnets(topology, l2_links, ipam_ranges, ipam_state, areas)
+        ipam_state.save(ipam_state_file)
+        index.index_subnets(links)
+        assign_ips_on_subnets(index)
 
     # 7. Collecte OSPF/BGP
-    collect_routing_info(
-        prov_devs,
-        provider_int['BGP_asn'],
-        cli_devs, 
-        subnets_info
+    with profiler.stage("7. Routing"):
+        collect_routing_info(
+            topology, provider_int['BGP_asn'], index,
+            provider_int.get('route_reflectors'), areas
         )
-    
-    # 8. Formattage des réseau diffusés par les clients via BGP
-    format_client_BGP_networks(cli_devs)
-
-    # 9. Export des configurations
-    all_devices = {
-        'provider': prov_devs, 
-        'clients': cli_devs, 
-        'subnets': subnets_info,
-    }
-    out = CONFIG_DIR / 'devices.json'
-    with open(out, 'w') as f:
-        json.dump(all_devices, f, indent=4, default=str)
-    
+
+    # 8. Vérification des réseaux diffusés par les clients via BGP
+    with profiler.stage("8. BGP networks"):
+        format_client_BGP_networks(topology)
+
+    # 9. Export des configurations, device par device
+    contexts = topology.contexts()
+    with profiler.stage("9. JSON export"):
+        export_devices(topology, config_dir / 'devices.json')
+
     # 10. Rendu des configurations
     templates = {
         'client': 'client_edge.j2',
@@ -77,22 +122,34 @@ def generate_configs(intention: Dict[str, Dict[str, Any]]) -> Path:
     }
     config_files: Dict[str, Path] = {}
 
-    # Creation du répertoire de configuration s'il n'existe pas
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-
-    # pprint(prov_devs["PE1"])
+    # Rendu incrémental: on ne garde que les devices dont les entrées ont changé
+    to_render = contexts
+    if incremental:
+        with profiler.stage("10a. Hashing"):
+            previous = load_hashes(hashes_file)
+            hashes = {
+                device.name: device_hash(topology.export(device), templates[device.role])
+                for device in topology
+            }
+            changed = []
+            for name in contexts:
+                path = config_dir / f"{name}.cfg"
+                if previous.get(name) == hashes[name] and path.exists():
+                    config_files[name] = path
+                    unchanged.add(name)
+                else:
+                    changed.append(name)
+            to_render = contexts.subset(changed)
+    else:
+        # Les empreintes ne décrivent plus les fichiers qui vont être réécrits
+        hashes_file.unlink(missing_ok=True)
 
     # Rendu et écriture des configurations en parallèle
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {
-            executor.submit(render_and_write, name, details, templates): name
-            for name, details in {**prov_devs, **cli_devs}.items()
-        }
-        for future in as_completed(futures):
-            try:
-                device_name = futures[future]
-                config_files[device_name] = future.result()
-            except Exception as e:
-                print(f"Error generating config for {device_name}: {e}\n{format_exc()}")
-    
-    return config_files
\ No newline at end of file
+    with profiler.stage("10. Rendering"):
+        config_files.update(render_all(to_render, templates, render_backend, render_workers, config_dir=config_dir))
+
+    if incremental:
+        # Un device en erreur devra être rendu à nouveau au prochain lancement
+        save_hashes({name: h for name, h in hashes.items() if name in config_files}, hashes_file)
+
+    return config_files
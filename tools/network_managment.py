@@ -1,138 +1,190 @@
-from ipaddress import IPv4Network
-from typing import Dict, Any, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from lib.subnetAllocator import SubnetAllocator
+from lib.addressing import HOSTMASKS, Prefix, format_address, parse_prefix
+from lib.deviceModel import Interface, Link, Subnet, Topology
+from lib.ipamState import IpamState
+from lib.subnetAllocator import SubnetAllocator, SubnetExhaustedError, prefix_for_hosts
+from lib.topologyIndex import TopologyIndex
+from tools.ospf_areas import link_area
 
 
-def CIDR_to_network(cidr: str) -> str:
+def build_l2_links(topology: Topology) -> List[Link]:
     """
-    Convertit un CIDR en masque de sous-réseau.
+    Liste des liens L2 (dev1, dev2, zone), un par paire de voisins.
     """
-    try:
-        address, mask = cidr.split('/')
-        mask = "1" * int(mask) + "0" * (32 - int(mask))
-        mask_str = '.'.join(str(int(mask[i:i + 8], 2)) for i in range(0, 32, 8))
-        return {
-            "address": address,
-            "mask": mask_str,
-            "cidr": cidr
-        }
-    except ValueError as e:
-        raise ValueError(f"Invalid CIDR notation: {cidr}") from e
-
-def build_l2_links(
-    provider_devices: Dict[str, Any],
-    client_routers: Dict[str, Any]
-) -> List[Tuple[str, str, str]]:
-    """
-    Liste de liens L2: (dev1, dev2, zone)
-    """
-    edges: List[Tuple[str, str, str]] = []
+    links: List[Link] = []
     seen = set()
-    all_devices = {**provider_devices, **client_routers}
-    for dev, details in all_devices.items():
-        for if_name, if_conf in details.get('interfaces', {}).items():
-            for nbr in if_conf['neighbors']:
-                key = frozenset({dev, nbr})
-                if dev == nbr or key in seen:
+    for device in topology:
+        for interface in device.interfaces:
+            for nbr in interface.neighbors:
+                key = (device.id, nbr) if device.id < nbr else (nbr, device.id)
+                if device.id == nbr or key in seen:
                     continue
+                if topology.devices[nbr] is None:
+                    raise KeyError(topology.names[nbr])
                 seen.add(key)
-                zone = 'provider' if dev in provider_devices and nbr in provider_devices else 'client'
-                edges.append((dev, nbr, zone))
-    return edges
+                zone = 'provider' if topology.is_provider(device.id) and topology.is_provider(nbr) else 'client'
+                links.append(Link(device.id, nbr, zone))
+    return links
+
+def _reserve_stored(allocator: SubnetAllocator, subnet: str) -> Optional[Prefix]:
+    """
+    Réserve un sous-réseau issu de l'état IPAM, s'il est toujours valide dans la plage.
+    """
+    try:
+        prefix = parse_prefix(subnet)
+        allocator.reserve_block(*prefix)
+        return prefix
+    except ValueError:
+        return None
 
 def add_loopback_interfaces(
-    provider_devices: Dict[str, Any],
-    loopback_range: str
+    topology: Topology,
+    loopback_range: str,
+    state: Optional[IpamState] = None
 ) -> None:
     """
-    Ajoute loopback0 aux devices role 'edge'.
+    Ajoute loopback0 aux devices du provider.
+    Les loopbacks déjà présentes dans l'état IPAM sont conservées, les
+    autres sont allouées toutes ensemble (allocate_many).
     """
-    allocated = set()
-    for name, dev in provider_devices.items():
-        for addr in IPv4Network(loopback_range).hosts():
-            if addr not in allocated:
-                allocated.add(addr)
-                dev['interfaces']['loopback0'] = {
-                    'neighbors': [],
-                    'subnet_id': None,
-                    'ip_address': str(addr),
-                    'subnet_mask': '255.255.255.255',
-                    'type': 'loopback'
-                }
-                break
+    state = state if state is not None else IpamState()
+    provider_devices = topology.provider_devices
+    state.collect_loopbacks(device.name for device in provider_devices)
+
+    allocator = SubnetAllocator(loopback_range)
+    network = parse_prefix(loopback_range)
+    broadcast = network.network | HOSTMASKS[network.length]
+    if network.length < 31:
+        # Adresse réseau exclue, comme avec hosts()
+        allocator.reserve_block(network.network, 32)
+
+    loopbacks: Dict[int, int] = {}
+    for device in provider_devices:
+        stored = state.loopbacks.get(device.name)
+        if stored:
+            reserved = _reserve_stored(allocator, f"{stored}/32")
+            if reserved:
+                loopbacks[device.id] = reserved.address
+            else:
+                del state.loopbacks[device.name]
+
+    new = [device for device in provider_devices if device.id not in loopbacks]
+    addresses = allocator.allocate_many(32, len(new))
+    if network.length < 31 and broadcast in addresses:
+        raise SubnetExhaustedError(f"No space left in {loopback_range} for a loopback")
+    for device, address in zip(new, addresses):
+        loopbacks[device.id] = address
+        state.loopbacks[device.name] = format_address(address)
+
+    for device in provider_devices:
+        device.set_interface(Interface('loopback0', type='loopback', address=loopbacks[device.id], prefixlen=32))
 
 def allocate_link_subnets(
-    l2_links: List[Tuple[str, str, str]],
-    ipam_ranges: Dict[str, str]
-) -> List[Tuple[str, str, str, IPv4Network, int]]:
+    topology: Topology,
+    l2_links: List[Link],
+    ipam_ranges: Dict[str, str],
+    state: Optional[IpamState] = None,
+    areas: Optional[Dict[int, int]] = None
+) -> List[Link]:
     """
     Alloue un sous-réseau par lien L2.
-    Retourne une liste de tuples (dev1, dev2, zone, subnet, id).
+    Les liens déjà présents dans l'état IPAM gardent leur sous-réseau, seuls
+    les nouveaux liens sont alloués, en un appel à allocate_many par zone et
+    par aire OSPF (`areas`, aire 0 par défaut) pour que les liens d'une aire
+    forment un bloc contigu, et les liens supprimés sont oubliés.
+    Retourne les liens alloués, dans l'ordre de leurs hôtes, qui forment
+    aussi `topology.links`.
+    Lève SubnetExhaustedError si une plage d'adresses est épuisée.
     """
+    state = state if state is not None else IpamState()
+    names = topology.names
+    keys = [IpamState.link_key(names[link.a], names[link.b]) for link in l2_links]
+    state.collect_links(keys)
+
     allocators = {zone: SubnetAllocator(cidr) for zone, cidr in ipam_ranges.items()}
-    subnets_info: List[Tuple[str, str, str, IPv4Network, int]] = []
-    for idx, (d1, d2, zone) in enumerate(l2_links):
-        allocator = allocators.get(zone)
-        if not allocator:
+
+    # Réservation des sous-réseaux connus
+    subnets: Dict[str, Prefix] = {}
+    for key, link in zip(keys, l2_links):
+        stored = state.links.get(key)
+        if not stored:
             continue
-        # intention taille 2 hôtes
-        intention = {0: {'hosts': [d1, d2], 'size': 2, 'subnet': None}}
-        allocated = allocator.get_subnets(intention)
-        subnet = allocated[0]['subnet']
-        subnets_info.append((d1, d2, zone, subnet, idx))
-    return subnets_info
-
-def assign_ips_on_subnets(
-    devices: Dict[str, Any],
-    subnets_info: List[Tuple[str, str, str, IPv4Network, int]]
-) -> None:
+        allocator = allocators.get(link.zone)
+        reserved = (
+            stored.get('zone') == link.zone and 'id' in stored and allocator
+            and _reserve_stored(allocator, stored['subnet'])
+        )
+        if reserved:
+            subnets[key] = reserved
+        else:
+            del state.links[key]
+
+    # Les identifiants de sous-réseau sont stables eux aussi
+    next_id = max((stored['id'] for stored in state.links.values()), default=-1) + 1
+
+    # Nouveaux liens, numérotés dans l'ordre des liens et alloués par zone et par aire
+    areas = areas or {}
+    pending: Dict[Tuple[str, int], List[str]] = {}
+    for key, link in zip(keys, l2_links):
+        if link.zone in allocators and key not in state.links:
+            state.links[key] = {
+                'id': next_id,
+                'hosts': [names[link.a], names[link.b]],
+                'zone': link.zone,
+            }
+            next_id += 1
+            area = link_area(areas, link.a, link.b) if link.zone == 'provider' else 0
+            pending.setdefault((link.zone, area), []).append(key)
+
+    # Lien point à point: 2 hôtes
+    prefix = prefix_for_hosts(2)
+    for (zone, _), zone_keys in sorted(pending.items()):
+        for key, address in zip(zone_keys, allocators[zone].allocate_many(prefix, len(zone_keys))):
+            subnets[key] = Prefix(address, prefix)
+            state.links[key]['subnet'] = str(subnets[key])
+
+    allocated: List[Link] = []
+    for key, link in zip(keys, l2_links):
+        if key not in subnets:
+            continue
+        stored = state.links[key]
+        # L'ordre des hôtes est celui de la première allocation
+        h1, h2 = stored['hosts']
+        link.a, link.b = topology.ids[h1], topology.ids[h2]
+        link.subnet = Subnet(stored['id'], *subnets[key], link.zone)
+        allocated.append(link)
+    topology.links = allocated
+    return allocated
+
+def assign_ips_on_subnets(index: TopologyIndex) -> None:
     """
-    Assigne IPs et masque aux interfaces en fonction des subnets_info,
-    et renseigne 'subnet_id', 'ip_address', 'subnet_mask' dans devices.
+    Assigne IPs et masque aux interfaces des deux extrémités de chaque lien
+    indexé et y renseigne le 'subnet_id': les deux premiers hôtes du
+    sous-réseau, calculés depuis son adresse.
     """
-    for d1, d2, _, subnet, sid in subnets_info:
-        hosts = [d1, d2]
-        assigned = {}
-        for ip in subnet.hosts():
-            if len(assigned) < 2:
-                assigned[hosts[len(assigned)]] = ip
-            else:
-                break
-        # assignation sur chaque interface
-        for dev, peer in ((d1, d2), (d2, d1)):
-            for if_name, if_conf in devices[dev]['interfaces'].items():
-                if peer in if_conf['neighbors']:
-                    if_conf['subnet_id'] = sid
-                    if_conf['ip_address'] = str(assigned[dev])
-                    if_conf['subnet_mask'] = str(subnet.netmask)
-        hosts = [d1, d2]
-        assigned = {}
-        for ip in subnet.hosts():
-            if len(assigned) < 2:
-                assigned[hosts[len(assigned)]] = ip
-            else:
-                break
-        # assignation sur chaque interface
-        for dev, peer in ((d1, d2), (d2, d1)):
-            for if_name, if_conf in devices[dev]['interfaces'].items():
-                if peer in if_conf['neighbors']:
-                    if_conf['subnet_id'] = sid
-                    if_conf['ip_address'] = str(assigned[dev])
-                    if_conf['subnet_mask'] = str(subnet.netmask)
-
-def format_client_BGP_networks(
-    client_routers: Dict[str, Any],
-) -> None:
+    for sid, (a_side, b_side) in index.endpoints.items():
+        subnet = index.links[sid].subnet
+        # Les /31 et /32 n'ont pas d'adresse de réseau à sauter
+        first = subnet.network + 1 if subnet.prefixlen < 31 else subnet.network
+        for interfaces, address in ((a_side, first), (b_side, first + 1)):
+            for interface in interfaces:
+                interface.subnet_id = sid
+                interface.address = address
+                interface.prefixlen = subnet.prefixlen
+
+def format_client_BGP_networks(topology: Topology) -> None:
     """
-    Formate les réseaux BGP des clients.
-    Convertit les réseaux CIDR en dictionnaire avec adresse, masque et CIDR.
+    Vérifie les réseaux BGP annoncés par les clients: un réseau dont les
+    bits d'hôte ne sont pas nuls n'est pas annoncé, un réseau en double
+    n'est annoncé qu'une fois. Les réseaux ne sont pas agrégés: une
+    instruction `network` n'annonce que le préfixe exact présent en table.
     """
-    for name, dev in client_routers.items():
-        for i in range(len(dev['BGP_advertized_networks'])):
-            cidr = dev['BGP_advertized_networks'][i]
-            try:
-                network_info = CIDR_to_network(cidr)
-                dev['BGP_advertized_networks'][i] = network_info
-            except ValueError as e:
-                print(f"Error processing BGP network {cidr} for device {name}: {e}")
+    for device in topology.client_devices:
+        networks: Dict[Prefix, None] = {}
+        for prefix in device.advertised_networks:
+            if prefix.is_network:
+                networks[prefix] = None
+            else:
+                print(f"Error processing BGP network {prefix} for device {device.name}: has host bits set")
+        device.advertised_networks = list(networks)
@@ -0,0 +1,116 @@
+from collections import deque
+from itertools import islice
+from typing import Any, Dict, List, Optional
+
+from lib.deviceModel import Topology
+from tools.backbone_graph import backbone_graph, center, distances
+
+
+def link_area(areas: Dict[int, int], a: int, b: int) -> int:
+    """
+    Aire d'un lien backbone entre `a` et `b`: celle de ses extrémités, l'aire
+    non backbone quand il rejoint l'aire 0, la plus petite entre deux aires
+    non backbone.
+    """
+    area_a, area_b = areas.get(a, 0), areas.get(b, 0)
+    if not area_a or not area_b:
+        return area_a or area_b
+    return min(area_a, area_b)
+
+
+def _auto_areas(topology: Topology, graph: Dict[int, List[int]], area_size: int) -> Dict[int, int]:
+    """
+    L'aire 0 part des `area_size` premiers routeurs d'un parcours en largeur
+    depuis le centre du backbone. Les autres routeurs forment des arbres
+    enracinés sur un voisin de l'aire 0; la racine d'un arbre de plus de
+    `area_size` routeurs rejoint l'aire 0, qui reste connexe, et ses
+    sous-arbres deviennent des arbres. Les arbres voisins sont ensuite
+    regroupés en aires connexes d'au plus `area_size` routeurs, qui touchent
+    donc toutes l'aire 0. Les routeurs hors de la composante du centre
+    restent dans l'aire 0.
+    """
+    providers = topology.provider_ids
+    if len(providers) <= area_size:
+        return {}
+    core = set(islice(distances(graph, [center(graph, providers)]), area_size))
+
+    # Forêt du parcours en largeur depuis l'aire 0
+    parent: Dict[int, int] = {}
+    distances(graph, list(core), parent)
+    order = [node for node in parent if node not in core]
+    children: Dict[int, List[int]] = {}
+    size = dict.fromkeys(order, 1)
+    for node in reversed(order):
+        if parent[node] not in core:
+            size[parent[node]] += size[node]
+            children.setdefault(parent[node], []).append(node)
+    roots = [node for node in order if parent[node] in core]
+    kept = set()
+    while roots:
+        root = roots.pop()
+        if size[root] > area_size:
+            core.add(root)
+            roots.extend(children.get(root, ()))
+        else:
+            kept.add(root)
+    tree: Dict[int, int] = {}
+    for node in order:
+        if node not in core:
+            tree[node] = node if node in kept else tree[parent[node]]
+
+    # Deux arbres sont voisins s'ils sont reliés ou touchent le même routeur de
+    # l'aire 0, qui aura alors des interfaces dans l'aire qui les regroupe
+    sizes: Dict[int, int] = {root: size[root] for root in tree.values()}
+    adjacent: Dict[int, Dict[int, None]] = {}
+    attached: Dict[int, Dict[int, None]] = {}
+    for node, root in tree.items():
+        for nbr in graph[node]:
+            other = tree.get(nbr)
+            if other is None:
+                attached.setdefault(nbr, {})[root] = None
+            elif other != root:
+                adjacent.setdefault(root, {})[other] = None
+    for roots_here in attached.values():
+        chain = list(roots_here)
+        for a, b in zip(chain, chain[1:]):
+            adjacent.setdefault(a, {})[b] = None
+            adjacent.setdefault(b, {})[a] = None
+
+    # Une aire croît d'arbre voisin en arbre voisin tant qu'elle n'est pas pleine
+    tree_area: Dict[int, int] = {}
+    area = 0
+    for start in sizes:
+        if start in tree_area:
+            continue
+        area += 1
+        tree_area[start] = area
+        filled = sizes[start]
+        frontier = deque(adjacent.get(start, ()))
+        while frontier:
+            root = frontier.popleft()
+            if root in tree_area or filled + sizes[root] > area_size:
+                continue
+            tree_area[root] = area
+            filled += sizes[root]
+            frontier.extend(adjacent.get(root, ()))
+    return {node: tree_area[root] for node, root in tree.items()}
+
+
+def plan_ospf_areas(topology: Topology, ospf: Optional[Dict[str, Any]]) -> Dict[int, int]:
+    """
+    Aire OSPF des routeurs provider hors de l'aire 0, selon `ospf` de l'intention:
+        - `areas`: routeurs de chaque aire, les autres étant dans l'aire 0
+        - `area_size`: découpage automatique du backbone en aires d'au plus
+          `area_size` routeurs
+        - absent: une seule aire 0
+    """
+    settings = ospf or {}
+    if settings.get('areas'):
+        return {
+            topology.id_of(router): int(area)
+            for area, routers in settings['areas'].items()
+            for router in routers if int(area)
+        }
+    if settings.get('area_size'):
+        return _auto_areas(topology, backbone_graph(topology), settings['area_size'])
+    return {}
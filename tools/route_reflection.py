@@ -0,0 +1,221 @@
+from heapq import nsmallest
+from math import ceil
+from typing import Any, Dict, List, Optional, Set, Union
+
+from lib.deviceModel import ReflectorCluster, Topology
+from tools.backbone_graph import UNREACHABLE, assign_nearest, backbone_graph, center, distances, group_around_sites
+
+# Sessions iBGP par routeur et réflecteurs par cluster quand l'intention ne les précise pas
+DEFAULT_FANOUT = 64
+DEFAULT_REDUNDANCY = 2
+
+
+def _pick_reflectors(
+    graph: Dict[int, List[int]],
+    clients: List[int],
+    candidates: Set[int],
+    count: int
+) -> List[int]:
+    """
+    Les `count` candidats les plus proches du centre des clients, les mieux
+    connectés d'abord à distance égale.
+    """
+    dist = distances(graph, [center(graph, clients)])
+    reflectors = nsmallest(count, candidates, key=lambda n: (dist.get(n, UNREACHABLE), -len(graph[n]), n))
+    candidates.difference_update(reflectors)
+    return reflectors
+
+
+def _cluster_count(members: int, fanout: int, redundancy: int) -> int:
+    """
+    Nombre de clusters pour `members` routeurs: le plus petit dont les
+    réflecteurs tiennent en full mesh, sinon le plus petit possible et les
+    réflecteurs sont à leur tour clients d'un niveau supérieur.
+    """
+    least = ceil(members / (fanout - redundancy))
+    count = least
+    while (count - 1) * redundancy < fanout:
+        if ceil(members / count) + (count - 1) * redundancy <= fanout:
+            return count
+        count += 1
+    return least
+
+
+def _auto_clusters(
+    topology: Topology,
+    graph: Dict[int, List[int]],
+    edges: List[int],
+    fanout: int,
+    redundancy: int
+) -> List[ReflectorCluster]:
+    """
+    Place les réflecteurs sur les routeurs backbone, niveau par niveau,
+    jusqu'à ce que les réflecteurs du dernier niveau tiennent en full mesh.
+    """
+    clusters: List[ReflectorCluster] = []
+    candidates = {device.id for device in topology.provider_devices if device.role != 'edge'}
+    members = edges
+    # Clients de chaque membre et taille de son cluster (ses pairs en full mesh en sont exclus)
+    load = dict.fromkeys(members, 0)
+    own = dict.fromkeys(members, 1)
+    while members and max(load[m] + len(members) - own[m] for m in members) > fanout:
+        count = _cluster_count(len(members), fanout, redundancy)
+        if count * redundancy >= len(members) or count * redundancy > len(candidates):
+            print(
+                f"Warning: not enough backbone routers for {count * redundancy} route reflectors, "
+                f"iBGP full mesh kept between {len(members)} routers"
+            )
+            break
+        next_members: List[int] = []
+        for clients in group_around_sites(graph, members, count):
+            reflectors = _pick_reflectors(graph, clients, candidates, redundancy)
+            clusters.append(ReflectorCluster(len(clusters) + 1, reflectors, clients))
+            for rr in reflectors:
+                load[rr] = len(clients)
+                own[rr] = len(reflectors)
+            next_members.extend(reflectors)
+        members = next_members
+    return clusters
+
+
+def _explicit_clusters(
+    topology: Topology,
+    graph: Dict[int, List[int]],
+    edges: List[int],
+    settings: List[Dict[str, Any]],
+    fanout: int
+) -> List[ReflectorCluster]:
+    """
+    Clusters de l'intention. Les réflecteurs d'un cluster avec `parent` sont
+    clients du cluster parent, et les PE d'aucun cluster sont rattachés au
+    cluster le plus proche.
+    """
+    clusters = [
+        ReflectorCluster(
+            conf.get('cluster_id'),
+            [topology.id_of(rr) for rr in ([conf['reflectors']] if isinstance(conf['reflectors'], str) else conf['reflectors'])],
+            [topology.id_of(client) for client in conf.get('clients', [])],
+        )
+        for conf in settings
+    ]
+    # cluster-id des clusters sans identifiant
+    used = {cluster.id for cluster in clusters}
+    free_ids = (i for i in range(1, len(clusters) + len(used) + 1) if i not in used)
+    for cluster in clusters:
+        if cluster.id is None:
+            cluster.id = next(free_ids)
+
+    by_id = {cluster.id: cluster for cluster in clusters}
+    parents = [by_id[conf['parent']] if conf.get('parent') is not None else None for conf in settings]
+    for cluster, parent in zip(clusters, parents):
+        if parent is not None:
+            parent.clients.extend(cluster.reflectors)
+
+    placed = {device_id for cluster in clusters for device_id in cluster.reflectors + cluster.clients}
+    unplaced = [pe for pe in edges if pe not in placed]
+    # Les PE rejoignent les clusters du niveau le plus bas
+    leaves = [
+        (cluster, parent) for cluster, parent in zip(clusters, parents)
+        if not any(other is cluster for other in parents)
+    ]
+    if unplaced and leaves:
+        top = sum(len(cluster.reflectors) for cluster, parent in zip(clusters, parents) if parent is None)
+        capacities = [
+            fanout - len(cluster.clients) - (len(parent.reflectors) if parent else top - len(cluster.reflectors))
+            for cluster, parent in leaves
+        ]
+        groups = assign_nearest(unplaced, [distances(graph, cluster.reflectors) for cluster, _ in leaves], capacities)
+        for (cluster, _), clients in zip(leaves, groups):
+            cluster.clients.extend(clients)
+    return clusters
+
+
+def plan_route_reflection(
+    topology: Topology,
+    route_reflectors: Union[List[str], str, Dict[str, Any], None]
+) -> List[ReflectorCluster]:
+    """
+    Clusters de route reflection selon `route_reflectors` de l'intention:
+        - nom ou liste de réflecteurs: un seul cluster sans cluster-id dont
+          tous les PE sont clients
+        - dict avec `clusters`: clusters explicites, hiérarchie par `parent`
+        - absent ou dict sans `clusters`: réflecteurs placés automatiquement
+          si les PE ne tiennent pas en full mesh avec `fanout` sessions
+    `fanout` (sessions iBGP par routeur) et `redundancy` (réflecteurs par
+    cluster) peuvent être donnés dans le dict. Aucun cluster: full mesh.
+    """
+    edges = [device.id for device in topology.provider_devices if device.role == 'edge']
+    if isinstance(route_reflectors, (str, list)):
+        names = [route_reflectors] if isinstance(route_reflectors, str) else route_reflectors
+        reflectors = [topology.id_of(rr) for rr in names]
+        return [ReflectorCluster(None, reflectors, edges)] if reflectors else []
+
+    settings = route_reflectors or {}
+    fanout = settings.get('fanout') or DEFAULT_FANOUT
+    # Au plus la moitié des sessions d'un réflecteur vers ses propres réflecteurs
+    redundancy = max(1, min(settings.get('redundancy') or DEFAULT_REDUNDANCY, (fanout - 1) // 2))
+    graph = backbone_graph(topology)
+    if settings.get('clusters'):
+        clusters = _explicit_clusters(topology, graph, edges, settings['clusters'], fanout)
+    else:
+        clusters = _auto_clusters(topology, graph, edges, fanout, redundancy)
+
+    for cluster in clusters:
+        for rr in cluster.reflectors:
+            device = topology.devices[rr]
+            device.is_route_reflector = True
+            device.cluster_id = cluster.id
+    return clusters
+
+
+def _fanout(route_reflectors: Union[List[str], str, Dict[str, Any], None]) -> Optional[int]:
+    if isinstance(route_reflectors, (str, list)):
+        return None
+    return (route_reflectors or {}).get('fanout') or DEFAULT_FANOUT
+
+
+def assign_ibgp_peers(topology: Topology, clusters: List[ReflectorCluster]) -> None:
+    """
+    Sessions iBGP des routeurs provider: chaque réflecteur avec ses clients,
+    et full mesh entre les réflecteurs du niveau supérieur (hors réflecteurs
+    d'un même cluster), ou entre les PE sans route reflection.
+    """
+    devices = topology.devices
+    # Côté réflecteur d'abord, pour garder l'ordre des clients
+    for cluster in clusters:
+        for rr in cluster.reflectors:
+            peers = devices[rr].ibgp_peers
+            for client in cluster.clients:
+                if client != rr:
+                    peers[client] = True
+    for cluster in clusters:
+        for rr in cluster.reflectors:
+            for client in cluster.clients:
+                if client != rr:
+                    devices[client].ibgp_peers.setdefault(rr, False)
+
+    if clusters:
+        clients = {client for cluster in clusters for client in cluster.clients}
+        top = [cluster.reflectors for cluster in clusters if not clients.intersection(cluster.reflectors)]
+    else:
+        top = [[device.id] for device in topology.provider_devices if device.role == 'edge']
+    mesh = [(device_id, group) for group in top for device_id in group]
+    for device_id, group in mesh:
+        peers = devices[device_id].ibgp_peers
+        for peer, peer_group in mesh:
+            if peer_group is not group:
+                peers.setdefault(peer, False)
+
+
+def check_fanout(topology: Topology, route_reflectors: Union[List[str], str, Dict[str, Any], None]) -> None:
+    """
+    Signale les routeurs qui dépassent le nombre de sessions iBGP permis
+    (clusters explicites trop chargés, backbone trop petit). La liste de
+    réflecteurs historique n'a pas de limite.
+    """
+    fanout = _fanout(route_reflectors)
+    if fanout is None:
+        return
+    for device in topology.provider_devices:
+        if len(device.ibgp_peers) > fanout:
+            print(f"Warning: {device.name} has {len(device.ibgp_peers)} iBGP sessions, more than the fan-out of {fanout}")
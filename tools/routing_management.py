@@ -1,123 +1,115 @@
-from ipaddress import IPv4Network
-from typing import Dict, Any, Tuple, List
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Set, Union
+
+from lib.addressing import Prefix, collapse_prefixes
+from lib.deviceModel import VRF, Topology
+from lib.topologyIndex import TopologyIndex
+from tools.ospf_areas import link_area
+from tools.route_reflection import assign_ibgp_peers, check_fanout, plan_route_reflection
+
+
+def _covering(blocks: List[Prefix], starts: List[int], prefix: Prefix) -> Prefix:
+    """
+    Bloc de `blocks` (triés, disjoints) qui contient `prefix`.
+    """
+    return blocks[bisect_right(starts, prefix.address) - 1]
 
 
 def collect_routing_info(
-    provider_devices: Dict[str, Any],
+    topology: Topology,
     provider_asn: int,
-    client_routers: Dict[str, Any],
-    subnets_info: List[Tuple[str, str, str, IPv4Network, int]]
+    index: TopologyIndex,
+    route_reflectors: Union[List[str], str, Dict[str, Any], None] = None,
+    areas: Optional[Dict[int, int]] = None
 ) -> None:
+    provider_devices = topology.provider_devices
+    areas = areas or {}
+
+    # Liens de chaque aire OSPF (routeurs absents de `areas`: aire 0) regroupés
+    # en blocs: un bloc ne contient que des liens de son aire, un `network`
+    # du bloc active donc OSPF sur toutes les interfaces du routeur dans l'aire
+    area_links: Dict[int, List[Prefix]] = {}
+    for link in topology.links:
+        if link.zone == 'provider' and link.subnet is not None:
+            area_links.setdefault(link_area(areas, link.a, link.b), []).append(link.subnet.prefix)
+    blocks: Dict[int, List[Prefix]] = {}
+    starts: Dict[int, List[int]] = {}
+    # Résumés annoncés par les ABR: seuls ceux d'au moins deux liens raccourcissent
+    # les annonces. Les loopbacks ne sont jamais résumées: LDP et MP-BGP ont besoin des /32
+    summaries: Dict[int, List[Prefix]] = {}
+    for area, prefixes in area_links.items():
+        blocks[area] = collapse_prefixes(prefixes)
+        starts[area] = [block.address for block in blocks[area]]
+        links = set(prefixes)
+        summaries[area] = [block for block in blocks[area] if block not in links]
+    attached: Set[int] = set()
+
     # OSPF/MPLS pour provider
-    for name, dev in provider_devices.items():
-        ospf_list: List[Dict[str, str]] = []
+    for dev in provider_devices:
+        home = areas.get(dev.id, 0)
+        networks: Dict[Prefix, int] = {}
         mpls_list: List[str] = []
-        for if_name, if_conf in dev['interfaces'].items():
-            if if_conf['type'] == 'loopback':
-                ospf_list.append({'address': if_conf['ip_address'], 'wildcard_mask': '0.0.0.0'})
-            elif if_conf['type'] == 'backbone':
+        for interface in dev.interfaces:
+            if interface.type == 'loopback':
+                networks[Prefix(interface.address, 32)] = home
+            elif interface.type == 'backbone':
                 # On suppose que les interfaces backbone sont MPLS
-                sid = if_conf['subnet_id']
-                subnet = next(s for (_,_,_,s,sid_) in subnets_info if sid_ == sid)
-                ospf_list.append({'address': str(subnet.network_address), 'wildcard_mask': str(subnet.hostmask)})
-                mpls_list.append(if_name)
-        dev['ospf_subnets'] = ospf_list
-        dev['mpls_interfaces'] = mpls_list
-        # Pairs iBGP
-        dev['iBGP_neighbors'] = [
-            peer_dev['interfaces']['loopback0']['ip_address']
-            for peer_dev in provider_devices.values()
-            if peer_dev['role'] == 'edge' and peer_dev['hostname'] != name
-        ]
+                area = link_area(areas, dev.id, interface.neighbors[0])
+                block = _covering(blocks[area], starts[area], index.subnet(interface.subnet_id).prefix)
+                networks[block] = area
+                mpls_list.append(interface.name)
+        dev.ospf_networks = list(networks.items())
+        dev.mpls_interfaces = mpls_list
+        dev_areas = set(networks.values())
+        if 0 in dev_areas:
+            # ABR: résumés de ses aires non backbone
+            attached.update(dev_areas)
+            dev.ospf_ranges = [
+                (area, summary) for area in sorted(dev_areas - {0}) for summary in summaries.get(area, [])
+            ]
 
-    #  iBGP et Route-Reflector
-    pe_loops = {
-        name: dev['interfaces']['loopback0']['ip_address']
-        for name, dev in provider_devices.items()
-        if dev['role'] == 'edge'
-    }
-    rr_list = [
-        name for name, dev in provider_devices.items()
-        if dev.get('is_route_reflector')
-    ]
+    for area in sorted(set(areas.values()) - attached):
+        print(f"Warning: OSPF area {area} has no ABR connected to area 0")
 
-    for name, dev in provider_devices.items():
-        if not (dev['role'] == 'edge' or dev.get('is_route_reflector')):
-            continue
-
-        if dev.get('is_route_reflector'):
-            peer_ips = [ip for peer, ip in pe_loops.items() if peer != name]
-        else:
-            if rr_list:
-                peer_ips = [
-                    provider_devices[rr]['interfaces']['loopback0']['ip_address']
-                    for rr in rr_list if rr != name
-                ]
-            else:
-                peer_ips = [ip for peer, ip in pe_loops.items() if peer != name]
-
-        ibgp = {}
-        for peer_ip in peer_ips:
-            ibgp[peer_ip] = {
-                'remote_as':              provider_asn,
-                'update_source':          'Loopback0',
-            }
-        dev['iBGP_neighbors'] = ibgp
+    #  iBGP: clusters de route reflectors, ou full mesh entre PE
+    clusters = plan_route_reflection(topology, route_reflectors)
+    assign_ibgp_peers(topology, clusters)
+    check_fanout(topology, route_reflectors)
 
     #  eBGP vers les clients
-    for dev in provider_devices.values():
-        if dev['role'] != 'edge':
+    for dev in provider_devices:
+        if dev.role != 'edge':
             continue
 
-        ebgp = {}
         rd = 1
-        dev['VRF'] = {}
-        for if_conf in dev['interfaces'].values():
-            if if_conf['type'] == 'client':
+        dev.vrfs = {}
+        dev.ebgp_neighbors = {}
+        for interface in dev.interfaces:
+            if interface.type == 'client':
                 # Trouver le client associé à l'interface
-                peer_name  = if_conf['neighbors'][0]
-                client_dev = client_routers[peer_name]
+                peer = interface.neighbors[0]
+                client_dev = topology.devices[peer]
 
                 #Récupération de l'IP de l'interface du client
                 client_if = next(
-                    ifc for ifc in client_dev['interfaces'].values()
-                    if ifc['subnet_id'] == if_conf['subnet_id']
+                    (ifc for ifc in index.interfaces_towards(peer, dev.id) if ifc.subnet_id == interface.subnet_id),
+                    None
                 )
                 if not client_if:
-                    raise ValueError(f"Client {peer_name} does not have an interface with subnet_id {if_conf['subnet_id']}")
-                if not client_if['ip_address']:
-                    raise ValueError(f"Client {peer_name} does not have an IP address assigned to subnet_id {if_conf['subnet_id']}")
-                
-                vrf_name = f"CLIENT_{client_dev['client']}_VRF"
-                ebgp[client_if['ip_address']] = {
-                    'BGP_asn': client_dev['BGP_asn'],
-                    'VRF': vrf_name,
-                }
-                dev['VRF'][client_dev["BGP_asn"]] = {
-                    'name': vrf_name,
-                    'rd': rd,
-                }
+                    raise ValueError(f"Client {client_dev.name} does not have an interface with subnet_id {interface.subnet_id}")
+                if client_if.address is None:
+                    raise ValueError(f"Client {client_dev.name} does not have an IP address assigned to subnet_id {interface.subnet_id}")
+
+                vrf = VRF(f"CLIENT_{client_dev.client}_VRF", rd, client_dev.BGP_asn)
+                dev.ebgp_neighbors[client_if.address] = vrf
+                dev.vrfs[client_dev.BGP_asn] = vrf
                 rd += 1
-        dev['eBGP_neighbors'] = ebgp
 
     # BGP des clients
-    for name, c in client_routers.items():
-        advert_nets = []
-        for net in c.get('BGP_advertized_networks', []):
-            nw = IPv4Network(net)
-            advert_nets.append({
-                'address': str(nw.network_address),
-                'mask':    str(nw.netmask)
-            })
-        c['bgp_advertise'] = advert_nets
-
-        peer_ip = next(
-            ifc['ip_address']
-            for p in provider_devices.values()
-            for ifc in p['interfaces'].values()
-            if name in ifc.get('neighbors', [])
+    for c in topology.client_devices:
+        c.ebgp_peer = next(
+            ifc.address
+            for interface in c.interfaces
+            for pe in interface.neighbors if topology.is_provider(pe)
+            for ifc in index.interfaces_towards(pe, c.id)
         )
-        c['eBGP_peer'] = {
-            'ip_address': peer_ip,
-            'BGP_asn':        provider_asn
-        }
@@ -0,0 +1,301 @@
+import re
+from time import perf_counter, sleep
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Protocoles vérifiés, dans l'ordre où ils convergent
+PROTOCOLS = ("ospf", "ldp", "bgp", "vrf", "ping")
+
+OSPF_NEIGHBOR_RE = re.compile(r"^(\d+\.\d+\.\d+\.\d+)\s+\d+\s+(\S+)\s+\S+\s+(\d+\.\d+\.\d+\.\d+)\s+(\S+)", re.M)
+LDP_PEER_RE = re.compile(r"Peer LDP Ident:\s*(\d+\.\d+\.\d+\.\d+):\d+.*?State:\s*(\w+)", re.S)
+BGP_SUMMARY_RE = re.compile(r"^(\d+\.\d+\.\d+\.\d+)\s+4\s+(\d+)(?:\s+\S+){5}\s+(\S+)\s+(\S+)\s*$", re.M)
+# Une ligne de table BGP ne porte le réseau que si elle commence par les codes de statut
+BGP_ROUTE_RE = re.compile(r"^[\s*>idhsrSmbfxac=]{0,7}(\d+\.\d+\.\d+\.\d+(?:/\d+)?)\s", re.M)
+RD_RE = re.compile(r"^Route Distinguisher: \S+(?: \(default for vrf (\S+)\))?", re.M)
+PING_RE = re.compile(r"Success rate is (\d+) percent \((\d+)/(\d+)\)")
+
+
+def parse_ospf_neighbors(output: str) -> List[Dict[str, str]]:
+    """
+    Voisins de `show ip ospf neighbor`.
+    """
+    return [
+        {'neighbor_id': nid, 'state': state.split("/")[0], 'address': address, 'interface': interface}
+        for nid, state, address, interface in OSPF_NEIGHBOR_RE.findall(output)
+    ]
+
+
+def parse_ldp_neighbors(output: str) -> List[Dict[str, str]]:
+    """
+    Pairs de `show mpls ldp neighbor`.
+    """
+    return [{'peer': peer, 'state': state} for peer, state in LDP_PEER_RE.findall(output)]
+
+
+def parse_bgp_summary(output: str) -> List[Dict[str, Any]]:
+    """
+    Voisins d'un `show ... bgp ... summary`: la dernière colonne donne le
+    nombre de préfixes reçus quand la session est établie, son état sinon.
+    """
+    records = []
+    for neighbor, asn, up_down, state in BGP_SUMMARY_RE.findall(output):
+        established = state.isdigit()
+        records.append({
+            'neighbor': neighbor,
+            'asn': int(asn),
+            'up_down': up_down,
+            'state': "Established" if established else state,
+            'prefixes': int(state) if established else None,
+        })
+    return records
+
+
+def parse_vpnv4_table(output: str) -> Dict[str, Set[str]]:
+    """
+    Préfixes de `show bgp vpnv4 unicast all` par VRF locale (les RD des
+    autres routeurs, sans VRF locale, sont ignorés).
+    """
+    prefixes: Dict[str, Set[str]] = {}
+    sections = RD_RE.split(output)
+    # split alterne: texte, vrf, texte, vrf, ...
+    for vrf, text in zip(sections[1::2], sections[2::2]):
+        if vrf:
+            prefixes.setdefault(vrf, set()).update(
+                prefix if "/" in prefix else _classful(prefix) for prefix in BGP_ROUTE_RE.findall(text)
+            )
+    return prefixes
+
+
+def _classful(address: str) -> str:
+    # IOS n'affiche pas le masque des réseaux classful
+    first = int(address.split(".")[0])
+    return f"{address}/{8 if first < 128 else 16 if first < 192 else 24}"
+
+
+def parse_ping(output: str) -> Optional[Tuple[int, int]]:
+    """
+    (réponses, envois) d'un ping, None si la sortie est incomplète.
+    """
+    match = PING_RE.search(output)
+    return (int(match.group(2)), int(match.group(3))) if match else None
+
+
+def _loopback(dev: Dict[str, Any]) -> Optional[str]:
+    loopback = dev['interfaces'].get('loopback0')
+    return loopback['ip_address'] if loopback else None
+
+
+def _lan_address(dev: Dict[str, Any]) -> Optional[str]:
+    # Adresse d'une interface non gérée (LAN annoncé) d'un CE
+    for if_conf in dev['interfaces'].values():
+        if if_conf.get('subnet_id') == -1:
+            return if_conf['ip_address']
+    return None
+
+
+def expected_state(devices: Dict[str, Any], ping_fanout: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    État attendu de chaque noeud d'après devices.json (sorties de
+    collect_routing_info): adjacences OSPF et LDP, sessions BGP, préfixes
+    des VRF sur les PE, et pings CE -> CE.
+
+    Chaque CE pinge les `ping_fanout` CE suivants de son client (succès
+    attendu) et un CE d'un autre client (échec attendu: isolation des VRF).
+    """
+    provider = devices.get('provider', {})
+    clients = devices.get('clients', {})
+    loopbacks = {name: _loopback(dev) for name, dev in provider.items()}
+    expected: Dict[str, Dict[str, Any]] = {}
+
+    # Préfixes annoncés par les CE de chaque client
+    client_prefixes: Dict[str, Set[str]] = {}
+    client_ces: Dict[str, List[str]] = {}
+    for name, dev in clients.items():
+        client_prefixes.setdefault(dev['client'], set()).update(n['cidr'] for n in dev.get('BGP_advertized_networks', []))
+        if _lan_address(dev):
+            client_ces.setdefault(dev['client'], []).append(name)
+
+    for name, dev in provider.items():
+        neighbors = {
+            nbr for if_conf in dev['interfaces'].values() if if_conf['type'] == 'backbone'
+            for nbr in if_conf['neighbors']
+        }
+        mpls_neighbors = {nbr for if_name in dev.get('mpls_interfaces', []) for nbr in dev['interfaces'][if_name]['neighbors']}
+        state: Dict[str, Any] = {
+            'ospf': {loopbacks[nbr] for nbr in neighbors if loopbacks.get(nbr)},
+            'ldp': {loopbacks[nbr] for nbr in mpls_neighbors if loopbacks.get(nbr)},
+        }
+        # Seuls les PE et les réflecteurs ont un router bgp: un routeur P peut
+        # garder dans devices.json une liste iBGP_neighbors qui n'est pas rendue
+        if dev['role'] == 'edge' or dev.get('is_route_reflector'):
+            bgp = set(dev.get('iBGP_neighbors', {})) | set(dev.get('eBGP_neighbors', {}))
+            if bgp:
+                state['bgp'] = bgp
+        if dev['role'] == 'edge' and dev.get('eBGP_neighbors'):
+            vrf_clients = {
+                interface['client'] for interface in dev['interfaces'].values() if interface['type'] == 'client'
+            }
+            state['vrf'] = {f"CLIENT_{client}_VRF": client_prefixes.get(client, set()) for client in vrf_clients}
+        expected[name] = state
+
+    others = sorted(client_ces)
+    for name, dev in clients.items():
+        state = {}
+        if dev.get('eBGP_peer'):
+            state['bgp'] = {dev['eBGP_peer']['ip_address']}
+        source = _lan_address(dev)
+        if source:
+            pings = {}
+            ces = client_ces[dev['client']]
+            position = ces.index(name)
+            for peer in [ces[(position + k) % len(ces)] for k in range(1, min(ping_fanout, len(ces) - 1) + 1)]:
+                pings[peer] = (_lan_address(clients[peer]), True)
+            foreign = [client for client in others if client != dev['client']]
+            if foreign:
+                peer = client_ces[foreign[position % len(foreign)]][0]
+                pings[peer] = (_lan_address(clients[peer]), False)
+            state['ping'] = {'source': source, 'targets': pings}
+        expected[name] = state
+    return expected
+
+
+def commands_for(state: Dict[str, Any], role: str, protocols: Set[str]) -> List[str]:
+    """
+    Commandes show / ping à lancer sur un noeud pour les protocoles restant à vérifier.
+    """
+    commands = []
+    if 'ospf' in protocols and 'ospf' in state:
+        commands.append("show ip ospf neighbor")
+    if 'ldp' in protocols and 'ldp' in state:
+        commands.append("show mpls ldp neighbor")
+    if 'bgp' in protocols and 'bgp' in state:
+        commands.append("show ip bgp summary" if role == 'client' else "show bgp vpnv4 unicast all summary")
+    if 'vrf' in protocols and 'vrf' in state:
+        commands.append("show bgp vpnv4 unicast all")
+    if 'ping' in protocols and 'ping' in state:
+        source = state['ping']['source']
+        commands += [f"ping {target} source {source} repeat 2 timeout 1" for target, _ in state['ping']['targets'].values()]
+    return commands
+
+
+def check_node(state: Dict[str, Any], role: str, outputs: Dict[str, str]) -> Dict[str, Optional[str]]:
+    """
+    Compare les sorties d'un noeud à son état attendu. Retourne, par
+    protocole vérifié, None si conforme ou la description de l'écart.
+    """
+    results: Dict[str, Optional[str]] = {}
+
+    def missing(expected: Set[str], seen: Set[str], what: str) -> Optional[str]:
+        return f"missing {what} {', '.join(sorted(expected - seen))}" if expected - seen else None
+
+    if "show ip ospf neighbor" in outputs:
+        full = {r['neighbor_id'] for r in parse_ospf_neighbors(outputs["show ip ospf neighbor"]) if r['state'] == "FULL"}
+        results['ospf'] = missing(state['ospf'], full, "OSPF adjacency with")
+    if "show mpls ldp neighbor" in outputs:
+        oper = {r['peer'] for r in parse_ldp_neighbors(outputs["show mpls ldp neighbor"]) if r['state'] == "Oper"}
+        results['ldp'] = missing(state['ldp'], oper, "LDP session with")
+    summary = "show ip bgp summary" if role == 'client' else "show bgp vpnv4 unicast all summary"
+    if summary in outputs:
+        established = {r['neighbor'] for r in parse_bgp_summary(outputs[summary]) if r['state'] == "Established"}
+        results['bgp'] = missing(state['bgp'], established, "BGP session with")
+    if "show bgp vpnv4 unicast all" in outputs:
+        table = parse_vpnv4_table(outputs["show bgp vpnv4 unicast all"])
+        gaps = [
+            f"{vrf}: {gap}" for vrf, prefixes in state['vrf'].items()
+            for gap in [missing(prefixes, table.get(vrf, set()), "prefixes")] if gap
+        ]
+        results['vrf'] = "; ".join(gaps) or None
+    if 'ping' in state and any(command.startswith("ping ") for command in outputs):
+        errors = []
+        for peer, (target, reachable) in state['ping']['targets'].items():
+            command = f"ping {target} source {state['ping']['source']} repeat 2 timeout 1"
+            result = parse_ping(outputs.get(command, ""))
+            if result is None:
+                errors.append(f"no ping result towards {peer}")
+            elif reachable and not result[0]:
+                errors.append(f"{peer} ({target}) unreachable")
+            elif not reachable and result[0]:
+                errors.append(f"{peer} ({target}) of another VRF reachable")
+        results['ping'] = "; ".join(errors) or None
+    return results
+
+
+def verify_deployment(
+    session_manager,
+    devices: Dict[str, Any],
+    consoles: Dict[str, Tuple[str, int]],
+    timeout: float = 300,
+    interval: float = 10,
+    ping_fanout: int = 3
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Vérifie le déploiement sur tous les noeuds en parallèle (sessions console
+    du SessionManager), en interrogeant de nouveau les noeuds non conformes
+    toutes les `interval` secondes jusqu'à convergence ou `timeout`.
+
+    Retourne, par protocole, s'il a convergé, le temps de convergence depuis
+    le début de la vérification et les écarts restants par noeud.
+    """
+    expected = expected_state(devices, ping_fanout)
+    roles = {name: 'client' for name in devices.get('clients', {})}
+    roles.update({name: dev['role'] for name, dev in devices.get('provider', {}).items()})
+    # Noeuds restant à vérifier, par protocole
+    pending = {
+        protocol: {name for name, state in expected.items() if protocol in state and name in consoles}
+        for protocol in PROTOCOLS
+    }
+    failures: Dict[str, Dict[str, str]] = {protocol: {} for protocol in PROTOCOLS}
+    converged_at: Dict[str, float] = {}
+    start = perf_counter()
+
+    while True:
+        jobs = {}
+        for name in set().union(*pending.values()):
+            protocols = {protocol for protocol in PROTOCOLS if name in pending[protocol]}
+            jobs[name] = (*consoles[name], commands_for(expected[name], roles[name], protocols))
+        outputs = session_manager.run_commands(jobs) if jobs else {}
+
+        for name, node_outputs in outputs.items():
+            for protocol, error in check_node(expected[name], roles[name], node_outputs).items():
+                if name not in pending[protocol]:
+                    continue
+                if error is None:
+                    pending[protocol].discard(name)
+                    failures[protocol].pop(name, None)
+                else:
+                    failures[protocol][name] = error
+        for name in jobs:
+            if name not in outputs:
+                for protocol in PROTOCOLS:
+                    if name in pending[protocol]:
+                        failures[protocol][name] = "console unreachable"
+
+        elapsed = perf_counter() - start
+        for protocol in PROTOCOLS:
+            if not pending[protocol] and protocol not in converged_at:
+                converged_at[protocol] = elapsed
+        if all(not nodes for nodes in pending.values()) or elapsed + interval > timeout:
+            break
+        sleep(interval)
+
+    return {
+        protocol: {
+            'converged': protocol in converged_at,
+            'time_s': converged_at.get(protocol),
+            'failures': failures[protocol] if protocol not in converged_at else {},
+        }
+        for protocol in PROTOCOLS
+    }
+
+
+def format_report(report: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Rapport lisible de verify_deployment.
+    """
+    lines = []
+    for protocol, result in report.items():
+        if result['converged']:
+            lines.append(f"{protocol.upper():<6} converged in {result['time_s']:.1f}s")
+        else:
+            lines.append(f"{protocol.upper():<6} NOT converged ({len(result['failures'])} nodes)")
+            lines += [f"    {name}: {error}" for name, error in sorted(result['failures'].items())]
+    return "\n".join(lines)